@@ -174,6 +174,36 @@ class AIAssistant:
         except Exception as e:
             return f"Erro ao sugerir cronograma: {str(e)}"
 
+    def analyze_forum_posts(self, posts: List[Dict]) -> Dict:
+        """Resume as discussões dos fóruns e destaca o que exige atenção"""
+        if not self.client:
+            return {"error": "Assistente IA não configurado"}
+
+        try:
+            prompt = f"""Analise as seguintes discussões dos fóruns das disciplinas:
+
+            {[f"{post.get('title', 'Sem título')} (por {post.get('author', 'Desconhecido')})" for post in posts[:30]]}
+
+            Resuma os temas principais, destaque avisos dos docentes e dúvidas
+            que possam afetar as próximas avaliações."""
+
+            model = "openai/gpt-3.5-turbo" if self.using_openrouter else "gpt-3.5-turbo"
+
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": "Você é um assistente que acompanha os fóruns de um curso a distância."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=600,
+                temperature=0.5
+            )
+
+            return {"success": True, "analysis": response.choices[0].message.content, "posts": len(posts)}
+
+        except Exception as e:
+            return {"error": f"Erro ao analisar fóruns: {str(e)}"}
+
 
 # Função auxiliar para criar instância (compatibilidade com app.py)
 def create_ai_assistant() -> AIAssistant:
@@ -29,10 +29,9 @@ moodle_password = os.environ.get("MOODLE_PASSWORD")
 # Usar as variáveis
 print(f"Chave OpenAI: {openai_api_key}")
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, g, has_app_context, jsonify, request, send_from_directory
 from flask_cors import CORS
 from datetime import datetime, timedelta
-import pytz
 import json
 import os
 from pathlib import Path
@@ -40,10 +39,24 @@ import sqlite3
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
+from calendario_semestre import hoje_lisboa, obter_calendario
+from catalogo import CatalogoDisciplinas
+from database import obter_conexao
+from eventos import publicar, stream_eventos
+from exportacao import ErroExportacao, exportar, importar, ler_tabelas
+from jobs import GestorJobs
+from lotes import ErroLote, atualizar_progresso, atualizar_tarefas, inserir_sessoes, ler_lote, resumo
+from migrations import aplicar_migracoes
+from moodle_state import KINDS as MOODLE_KINDS, MoodleState, grade_items
+from paginacao import ErroPaginacao, consultar_pagina, ler_campos, ler_limite
+from versoes import com_etag
+from progresso import calcular_progresso_disciplinas
+
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
 
 try:
-    from moodle_integration import MoodleUAB, quick_sync
+    from moodle_crawler import MoodleCrawler
+    from moodle_integration import create_moodle_client, quick_sync
 
     MOODLE_AVAILABLE = True
 except ImportError:
@@ -81,7 +94,38 @@ BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / "data"
 DB_PATH = DATA_DIR / "estudos.db"
 
+catalogo = CatalogoDisciplinas(DATA_DIR / "disciplinas.json")
+
+# Colunas expostas e chaves de ordenação das listagens paginadas
+COLUNAS_SESSOES = [
+    "id", "disciplina_id", "data", "hora_inicio", "hora_fim",
+    "duracao_minutos", "topico", "notas", "concluido", "created_at",
+]
+CHAVES_SESSOES = [("data", "DESC"), ("hora_inicio", "DESC"), ("id", "DESC")]
+
+COLUNAS_TAREFAS = [
+    "id", "disciplina_id", "titulo", "descricao", "tipo",
+    "data_entrega", "prioridade", "concluida", "created_at",
+]
+CHAVES_TAREFAS = [
+    ("COALESCE(data_entrega, '')", "ASC"),
+    ("COALESCE(prioridade, 0)", "DESC"),
+    ("id", "ASC"),
+]
+
+# Expressão SQL da data de início de cada período em /api/estatisticas
+AGRUPAMENTO_ESTATISTICAS = {
+    "day": "data",
+    "week": "date(data, 'weekday 0', '-6 days')",
+    "month": "strftime('%Y-%m-01', data)",
+}
+
+# Intervalo da sincronização Moodle periódica (minutos); 0 desativa
+MOODLE_SYNC_INTERVAL_MIN = float(os.environ.get("MOODLE_SYNC_INTERVAL_MIN", "60"))
+
+jobs = GestorJobs()
 moodle_client = None
+sessao_moodle_tentada = False
 ai_assistant = None
 folder_sync_manager = None
 copilot_agents = {
@@ -96,130 +140,34 @@ copilot_agents = {
 
 
 def init_db():
-    """Inicializa o banco de dados SQLite"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS sessoes_estudo (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            disciplina_id TEXT NOT NULL,
-            data DATE NOT NULL,
-            hora_inicio TIME NOT NULL,
-            hora_fim TIME,
-            duracao_minutos INTEGER,
-            topico TEXT,
-            notas TEXT,
-            concluido BOOLEAN DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS progresso_topicos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            disciplina_id TEXT NOT NULL,
-            topico_numero INTEGER NOT NULL,
-            progresso_percentual INTEGER DEFAULT 0,
-            ultima_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(disciplina_id, topico_numero)
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS tarefas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            disciplina_id TEXT NOT NULL,
-            titulo TEXT NOT NULL,
-            descricao TEXT,
-            tipo TEXT,
-            data_entrega DATE,
-            prioridade INTEGER DEFAULT 2,
-            concluida BOOLEAN DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS metas_diarias (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            data DATE NOT NULL UNIQUE,
-            meta_horas REAL DEFAULT 3.0,
-            horas_estudadas REAL DEFAULT 0.0,
-            disciplinas_estudadas TEXT,
-            notas TEXT
-        )
-    """)
-
-    conn.commit()
+    """Inicializa o banco de dados SQLite aplicando as migrações pendentes"""
+    conn = obter_conexao(DB_PATH)
+    aplicar_migracoes(conn)
     conn.close()
 
 
 def load_disciplinas() -> Dict:
-    """Carrega os dados das disciplinas do arquivo JSON"""
-    json_path = DATA_DIR / "disciplinas.json"
-    with open(json_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """Carrega os dados das disciplinas (cache invalidada pelo mtime do JSON)"""
+    return catalogo.dados()
 
 
 def get_db_connection():
-    """Obtém conexão com o banco de dados"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    """Obtém conexão do pool (devolvida com conn.close() ou no fim do pedido)"""
+    conn = obter_conexao(DB_PATH)
+    if has_app_context():
+        g.setdefault("conexoes_db", []).append((conn, conn.emprestimo))
     return conn
 
 
-def calcular_semana_atual() -> int:
-    """Calcula a semana atual do semestre baseado na data de Lisboa"""
-    lisboa_tz = pytz.timezone("Europe/Lisbon")
-
-    data_inicio = lisboa_tz.localize(datetime(2025, 9, 29, 0, 0, 0))
+@app.teardown_appcontext
+def devolver_conexoes(exception=None):
+    """Devolve ao pool as conexões que o pedido não fechou
 
-    hoje = datetime.now(lisboa_tz)
-
-    delta = hoje - data_inicio
-    semana = delta.days // 7
-
-    semana = max(0, min(semana, 14))
-
-    return semana
-
-
-def converter_data_portuguesa(data_str: str) -> str:
-    """Converte data no formato 'DD mês' para 'YYYY-MM-DD'"""
-    meses = {
-        "janeiro": 1,
-        "fevereiro": 2,
-        "março": 3,
-        "abril": 4,
-        "maio": 5,
-        "junho": 6,
-        "julho": 7,
-        "agosto": 8,
-        "setembro": 9,
-        "outubro": 10,
-        "novembro": 11,
-        "dezembro": 12,
-    }
-
-    if not data_str or "-" in data_str:
-        return data_str
-
-    try:
-        partes = data_str.lower().split()
-        if len(partes) == 2:
-            dia = int(partes[0])
-            mes_nome = partes[1]
-
-            if mes_nome in meses:
-                mes = meses[mes_nome]
-                ano = 2025 if mes >= 9 else 2026
-
-                return f"{ano}-{mes:02d}-{dia:02d}"
-    except:
-        pass
-
-    return data_str
+    Conexões já fechadas pelo pedido (e talvez emprestadas a outro) ficam
+    como estão: só é devolvido o empréstimo feito por este pedido.
+    """
+    for conn, emprestimo in g.pop("conexoes_db", []):
+        conn.devolver_emprestimo(emprestimo)
 
 
 # ============ INICIALIZAÇÃO DOS AGENTES COPILOT ============
@@ -294,68 +242,38 @@ def serve_static(filename):
 
 
 @app.route("/api/disciplinas", methods=["GET"])
+@com_etag(get_db_connection, tabelas=("sessoes_estudo", "tarefas"), catalogo=catalogo)
 def get_disciplinas():
     """Lista todas as disciplinas com progresso"""
     data = load_disciplinas()
     conn = get_db_connection()
 
-    # Adicionar progresso a cada disciplina
-    for disc in data["disciplinas"]:
-        disc_id = disc["id"]
-
-        # Calcular progresso baseado em tempo de estudo (pomodoros)
-        sessoes = conn.execute(
-            "SELECT COUNT(*) as total FROM sessoes_estudo WHERE disciplina_id = ?",
-            (disc_id,)
-        ).fetchone()
-
-        total_sessoes = sessoes["total"] or 0
-        total_minutos = total_sessoes * 25
-        creditos = disc.get("creditos", 6)
-
-        # Progresso de tempo
-        progresso_tempo = min((total_minutos / (creditos * 26 * 60)) * 100, 100) if total_minutos > 0 else 0
-
-        # Calcular progresso de AFs
-        afs = conn.execute(
-            """SELECT COUNT(*) as total, SUM(CASE WHEN concluida = 1 THEN 1 ELSE 0 END) as concluidas
-               FROM tarefas WHERE disciplina_id = ? AND tipo = 'forum'""",
-            (disc_id,)
-        ).fetchone()
-
-        total_afs = afs["total"] or 0
-        afs_concluidas = afs["concluidas"] or 0
-        progresso_afs = (afs_concluidas / total_afs * 100) if total_afs > 0 else 0
-
-        # Progresso final
-        if total_afs > 0:
-            progresso_final = (progresso_tempo * 0.7) + (progresso_afs * 0.3)
-        else:
-            progresso_final = progresso_tempo
-
-        disc["progresso"] = round(progresso_final, 2)
+    # Adicionar progresso a cada disciplina (cópias, o catálogo é partilhado)
+    progresso = calcular_progresso_disciplinas(conn, data["disciplinas"])
+    disciplinas = [
+        {**disc, "progresso": progresso[disc["id"]]["progresso"]}
+        for disc in data["disciplinas"]
+    ]
 
     conn.close()
-    return jsonify(data["disciplinas"])
+    return jsonify(disciplinas)
 
 
 @app.route("/api/disciplinas/<disciplina_id>", methods=["GET"])
 def get_disciplina(disciplina_id):
     """Obtém detalhes de uma disciplina específica"""
-    data = load_disciplinas()
-    disciplina = next(
-        (d for d in data["disciplinas"] if d["id"] == disciplina_id), None
-    )
+    disciplina = catalogo.por_id(disciplina_id)
     if disciplina:
         return jsonify(disciplina)
     return jsonify({"error": "Disciplina não encontrada"}), 404
 
 
 @app.route("/api/calendario", methods=["GET"])
+@com_etag(get_db_connection, catalogo=catalogo, diario=True)
 def get_calendario():
     """Retorna o calendário semanal de estudos"""
     data = load_disciplinas()
-    semana_atual = calcular_semana_atual()
+    semana_atual = obter_calendario(catalogo).semana_atual()
 
     return jsonify(
         {
@@ -370,32 +288,17 @@ def get_calendario():
 @app.route("/api/calendario/dia/<dia_semana>", methods=["GET"])
 def get_calendario_dia(dia_semana):
     """Retorna o calendário de um dia específico"""
-    data = load_disciplinas()
-    dia_lower = dia_semana.lower()
+    calendario_dia = catalogo.calendario_dia(dia_semana)
 
-    if dia_lower not in data["calendario_semanal"]:
+    if calendario_dia is None:
         return jsonify({"error": "Dia da semana inválido"}), 400
 
-    calendario_dia = data["calendario_semanal"][dia_lower]
-    disciplinas_do_dia = []
-
-    for item in calendario_dia["distribuicao"]:
-        if "disciplina" in item and item["disciplina"] not in ["REVISAO", "E_FOLIOS"]:
-            disc = next(
-                (d for d in data["disciplinas"] if d["sigla"] == item["disciplina"]),
-                None,
-            )
-            if disc:
-                disciplinas_do_dia.append(
-                    {"disciplina": disc, "horario": f"{item['inicio']} - {item['fim']}"}
-                )
-
     return jsonify(
         {
             "dia": dia_semana,
-            "horario_geral": calendario_dia["horario"],
+            "horario_geral": calendario_dia["horario_geral"],
             "distribuicao": calendario_dia["distribuicao"],
-            "disciplinas": disciplinas_do_dia,
+            "disciplinas": calendario_dia["disciplinas"],
         }
     )
 
@@ -409,20 +312,36 @@ def handle_sessoes():
         disciplina_id = request.args.get("disciplina_id")
 
         conn = get_db_connection()
-        query = "SELECT * FROM sessoes_estudo WHERE 1=1"
+        where = "1=1"
         params = []
 
         if data_inicio:
-            query += " AND data >= ?"
+            where += " AND data >= ?"
             params.append(data_inicio)
         if data_fim:
-            query += " AND data <= ?"
+            where += " AND data <= ?"
             params.append(data_fim)
         if disciplina_id:
-            query += " AND disciplina_id = ?"
+            where += " AND disciplina_id = ?"
             params.append(disciplina_id)
 
-        query += " ORDER BY data DESC, hora_inicio DESC"
+        try:
+            campos = ler_campos(request.args.get("fields"), COLUNAS_SESSOES)
+
+            # Com limit/cursor responde com uma página e o próximo cursor
+            if "limit" in request.args or "cursor" in request.args:
+                pagina = consultar_pagina(
+                    conn, "sessoes_estudo", where, params, CHAVES_SESSOES, campos,
+                    ler_limite(request.args.get("limit")), request.args.get("cursor"),
+                )
+                conn.close()
+                return jsonify(pagina)
+        except ErroPaginacao as e:
+            conn.close()
+            return jsonify({"error": str(e)}), 400
+
+        query = f"SELECT {', '.join(campos)} FROM sessoes_estudo WHERE {where}"
+        query += " ORDER BY data DESC, hora_inicio DESC, id DESC"
 
         sessoes = conn.execute(query, params).fetchall()
         conn.close()
@@ -457,6 +376,8 @@ def handle_sessoes():
         conn.commit()
         conn.close()
 
+        publicar("sessao_criada", {"id": sessao_id, "disciplina_id": dados.get("disciplina_id")})
+
         return jsonify({"id": sessao_id, "message": "Sessão criada com sucesso"}), 201
 
 
@@ -487,6 +408,8 @@ def handle_sessao(sessao_id):
         conn.commit()
         conn.close()
 
+        publicar("sessao_atualizada", {"id": sessao_id})
+
         return jsonify({"message": "Sessão atualizada com sucesso"})
 
     elif request.method == "DELETE":
@@ -494,10 +417,32 @@ def handle_sessao(sessao_id):
         conn.commit()
         conn.close()
 
+        publicar("sessao_removida", {"id": sessao_id})
+
         return jsonify({"message": "Sessão deletada com sucesso"})
 
 
+@app.route("/api/sessoes/batch", methods=["POST"])
+def criar_sessoes_lote():
+    """Cria várias sessões de estudo numa única transação"""
+    try:
+        itens = ler_lote(request.get_json(silent=True), "sessoes")
+    except ErroLote as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_db_connection()
+    resultados = inserir_sessoes(conn, itens)
+    conn.close()
+
+    corpo = resumo(resultados)
+    if corpo["ok"]:
+        publicar("sessoes_criadas", {"total": corpo["ok"]})
+
+    return jsonify(corpo)
+
+
 @app.route("/api/progresso", methods=["GET"])
+@com_etag(get_db_connection, tabelas=("progresso_topicos",))
 def get_progresso():
     """Obtém progresso geral de todas as disciplinas"""
     conn = get_db_connection()
@@ -533,9 +478,30 @@ def update_progresso(disciplina_id, topico_numero):
     conn.commit()
     conn.close()
 
+    publicar("progresso_atualizado", {"disciplina_id": disciplina_id, "topico_numero": topico_numero})
+
     return jsonify({"message": "Progresso atualizado com sucesso"})
 
 
+@app.route("/api/progresso/batch", methods=["PUT"])
+def update_progresso_lote():
+    """Atualiza o progresso de vários tópicos numa única transação"""
+    try:
+        itens = ler_lote(request.get_json(silent=True), "progresso")
+    except ErroLote as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_db_connection()
+    resultados = atualizar_progresso(conn, itens)
+    conn.close()
+
+    corpo = resumo(resultados)
+    if corpo["ok"]:
+        publicar("progresso_atualizado", {"total": corpo["ok"]})
+
+    return jsonify(corpo)
+
+
 @app.route("/api/tarefas", methods=["GET", "POST"])
 def handle_tarefas():
     """Gerencia tarefas e atividades"""
@@ -543,14 +509,30 @@ def handle_tarefas():
         conn = get_db_connection()
         concluida = request.args.get("concluida")
 
-        query = "SELECT * FROM tarefas WHERE 1=1"
+        where = "1=1"
         params = []
 
         if concluida is not None:
-            query += " AND concluida = ?"
+            where += " AND concluida = ?"
             params.append(1 if concluida.lower() == "true" else 0)
 
-        query += " ORDER BY data_entrega ASC, prioridade DESC"
+        try:
+            campos = ler_campos(request.args.get("fields"), COLUNAS_TAREFAS)
+
+            # Com limit/cursor responde com uma página e o próximo cursor
+            if "limit" in request.args or "cursor" in request.args:
+                pagina = consultar_pagina(
+                    conn, "tarefas", where, params, CHAVES_TAREFAS, campos,
+                    ler_limite(request.args.get("limit")), request.args.get("cursor"),
+                )
+                conn.close()
+                return jsonify(pagina)
+        except ErroPaginacao as e:
+            conn.close()
+            return jsonify({"error": str(e)}), 400
+
+        query = f"SELECT {', '.join(campos)} FROM tarefas WHERE {where}"
+        query += " ORDER BY data_entrega ASC, prioridade DESC, id ASC"
 
         tarefas = conn.execute(query, params).fetchall()
         conn.close()
@@ -584,6 +566,8 @@ def handle_tarefas():
         conn.commit()
         conn.close()
 
+        publicar("tarefa_criada", {"id": tarefa_id, "disciplina_id": dados.get("disciplina_id")})
+
         return jsonify({"id": tarefa_id, "message": "Tarefa criada com sucesso"}), 201
 
 
@@ -616,6 +600,11 @@ def handle_tarefa(tarefa_id):
         conn.commit()
         conn.close()
 
+        publicar(
+            "tarefa_concluida" if dados.get("concluida") else "tarefa_atualizada",
+            {"id": tarefa_id},
+        )
+
         return jsonify({"message": "Tarefa atualizada com sucesso"})
 
     elif request.method == "DELETE":
@@ -623,17 +612,43 @@ def handle_tarefa(tarefa_id):
         conn.commit()
         conn.close()
 
+        publicar("tarefa_removida", {"id": tarefa_id})
+
         return jsonify({"message": "Tarefa deletada com sucesso"})
 
 
+@app.route("/api/tarefas/batch", methods=["PATCH"])
+def atualizar_tarefas_lote():
+    """Altera várias tarefas numa única transação (só os campos enviados)"""
+    try:
+        itens = ler_lote(request.get_json(silent=True), "tarefas")
+    except ErroLote as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_db_connection()
+    resultados = atualizar_tarefas(conn, itens)
+    conn.close()
+
+    corpo = resumo(resultados)
+    if corpo["ok"]:
+        concluidas = sum(
+            1 for item, r in zip(itens, resultados) if r["success"] and item.get("concluida")
+        )
+        publicar("tarefas_atualizadas", {"total": corpo["ok"], "concluidas": concluidas})
+
+    return jsonify(corpo)
+
+
 @app.route("/api/dashboard", methods=["GET"])
+@com_etag(get_db_connection, tabelas=("sessoes_estudo", "tarefas"), catalogo=catalogo, diario=True)
 def get_dashboard():
     """Retorna dados para o dashboard principal"""
     conn = get_db_connection()
     data = load_disciplinas()
-    semana_atual = calcular_semana_atual()
+    calendario = obter_calendario(catalogo)
+    semana_atual = calendario.semana_atual()
 
-    hoje = datetime.now().date()
+    hoje = hoje_lisboa()
     inicio_semana = hoje - timedelta(days=hoje.weekday())
 
     horas_semana = conn.execute(
@@ -665,67 +680,25 @@ def get_dashboard():
         (hoje.isoformat(), proxima_semana.isoformat()),
     ).fetchall()
 
-    proximos_efolios = []
-    for disc in data["disciplinas"]:
-        if "e_folios" in disc:
-            for ef in disc["e_folios"]:
-                if ef["semana"] >= semana_atual:
-                    proximos_efolios.append(
-                        {
-                            "disciplina": disc["nome"],
-                            "tipo": ef["tipo"],
-                            "semana": ef["semana"],
-                            "data": ef.get("data", ""),
-                            "peso": ef.get("peso", 0),
-                        }
-                    )
-
-    proximos_efolios.sort(key=lambda x: x["semana"])
+    proximos_efolios = [
+        {
+            "disciplina": ef["disciplina"],
+            "tipo": ef["titulo"],
+            "semana": ef["semana"],
+            "data": ef["origem"].get("data", ""),
+            "peso": ef["origem"].get("peso", 0),
+        }
+        for ef in calendario.proximos_prazos(
+            5, desde=calendario.inicio_semana(semana_atual), tipos=("e-folio",)
+        )
+    ]
 
+    progresso = calcular_progresso_disciplinas(conn, data["disciplinas"])
     progresso_disciplinas = {}
     for disc in data["disciplinas"]:
-        disc_id = disc["id"]
-
-        # Calcular progresso baseado em tempo de estudo (pomodoros)
-        sessoes = conn.execute(
-            """
-            SELECT COUNT(*) as total
-            FROM sessoes_estudo
-            WHERE disciplina_id = ?
-        """,
-            (disc_id,),
-        ).fetchone()
-
-        total_sessoes = sessoes["total"] or 0
-        total_minutos = total_sessoes * 25
-        creditos = disc.get("creditos", 6)
-
-        # Progresso de tempo: minutos estudados / (créditos * 26 semanas * 60 minutos)
-        progresso_tempo = min((total_minutos / (creditos * 26 * 60)) * 100, 100) if total_minutos > 0 else 0
-
-        # Calcular progresso de AFs (Atividades Formativas)
-        afs = conn.execute(
-            """
-            SELECT COUNT(*) as total, SUM(CASE WHEN concluida = 1 THEN 1 ELSE 0 END) as concluidas
-            FROM tarefas
-            WHERE disciplina_id = ? AND tipo = 'forum'
-        """,
-            (disc_id,),
-        ).fetchone()
-
-        total_afs = afs["total"] or 0
-        afs_concluidas = afs["concluidas"] or 0
-        progresso_afs = (afs_concluidas / total_afs * 100) if total_afs > 0 else 0
-
-        # Progresso final: 70% tempo + 30% AFs (se houver AFs)
-        if total_afs > 0:
-            progresso_final = (progresso_tempo * 0.7) + (progresso_afs * 0.3)
-        else:
-            progresso_final = progresso_tempo
-
         progresso_disciplinas[disc["sigla"]] = {
             "nome": disc["nome"],
-            "progresso": round(progresso_final, 2),
+            "progresso": progresso[disc["id"]]["progresso"],
             "cor": disc["cor"],
         }
 
@@ -739,39 +712,64 @@ def get_dashboard():
             "meta_semanal": data["horas_totais_semana"],
             "meta_diaria": data["meta_diaria"],
             "tarefas_proximas": [dict(t) for t in tarefas_proximas],
-            "proximos_efolios": proximos_efolios[:5],
+            "proximos_efolios": proximos_efolios,
             "progresso_disciplinas": progresso_disciplinas,
         }
     )
 
 
 @app.route("/api/estatisticas", methods=["GET"])
+@com_etag(get_db_connection, tabelas=("sessoes_estudo",), diario=True)
 def get_estatisticas():
-    """Retorna estatísticas detalhadas de estudo"""
-    conn = get_db_connection()
+    """Retorna estatísticas de estudo num período (padrão: últimos 30 dias)
 
-    data_inicio = (datetime.now() - timedelta(days=30)).date()
+    Parâmetros: from e to (AAAA-MM-DD) e granularity=day|week|month. Com week
+    ou month, cada entrada de horas_por_dia tem a data do início do período.
+    """
+    hoje = hoje_lisboa()
 
+    try:
+        data_fim = hoje
+        if request.args.get("to"):
+            data_fim = datetime.strptime(request.args["to"], "%Y-%m-%d").date()
+
+        data_inicio = data_fim - timedelta(days=30)
+        if request.args.get("from"):
+            data_inicio = datetime.strptime(request.args["from"], "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "Datas devem estar no formato AAAA-MM-DD"}), 400
+
+    granularidade = request.args.get("granularity", "day")
+    if granularidade not in AGRUPAMENTO_ESTATISTICAS:
+        return jsonify({"error": "granularity deve ser day, week ou month"}), 400
+    if data_inicio > data_fim:
+        return jsonify({"error": "from deve ser anterior a to"}), 400
+
+    periodo = (data_inicio.isoformat(), data_fim.isoformat())
+    conn = get_db_connection()
+
+    # Totais diários mantidos por triggers (ver contadores.py)
     horas_por_disciplina = conn.execute(
         """
-        SELECT disciplina_id, SUM(duracao_minutos) / 60.0 as total_horas
-        FROM sessoes_estudo
-        WHERE data >= ?
+        SELECT disciplina_id, SUM(minutos) / 60.0 as total_horas
+        FROM estudo_diario
+        WHERE data BETWEEN ? AND ?
         GROUP BY disciplina_id
         ORDER BY total_horas DESC
     """,
-        (data_inicio.isoformat(),),
+        periodo,
     ).fetchall()
 
+    agrupamento = AGRUPAMENTO_ESTATISTICAS[granularidade]
     horas_por_dia = conn.execute(
-        """
-        SELECT data, SUM(duracao_minutos) / 60.0 as total_horas
-        FROM sessoes_estudo
-        WHERE data >= ?
-        GROUP BY data
-        ORDER BY data ASC
+        f"""
+        SELECT {agrupamento} as data, SUM(minutos) / 60.0 as total_horas
+        FROM estudo_diario
+        WHERE data BETWEEN ? AND ?
+        GROUP BY 1
+        ORDER BY 1 ASC
     """,
-        (data_inicio.isoformat(),),
+        periodo,
     ).fetchall()
 
     conn.close()
@@ -780,7 +778,8 @@ def get_estatisticas():
         {
             "horas_por_disciplina": [dict(h) for h in horas_por_disciplina],
             "horas_por_dia": [dict(h) for h in horas_por_dia],
-            "periodo": f"{data_inicio.isoformat()} a {datetime.now().date().isoformat()}",
+            "periodo": f"{periodo[0]} a {periodo[1]}",
+            "granularidade": granularidade,
         }
     )
 
@@ -789,94 +788,62 @@ def get_estatisticas():
 def inicializar_tarefas():
     """Inicializa tarefas baseadas nos e-fólios do calendário"""
     data = load_disciplinas()
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    lisboa_tz = pytz.timezone("Europe/Lisbon")
-    hoje = datetime.now(lisboa_tz).date()
-
-    tarefas_criadas = 0
+    calendario = obter_calendario(catalogo)
+    hoje = hoje_lisboa().isoformat()
 
+    # Uma linha por item do calendário, identificada por (origem, disciplina, chave)
+    tarefas = []
     for disc in data["disciplinas"]:
-        disc_id = disc["id"]
-
-        if "e_folios" in disc:
-            for ef in disc["e_folios"]:
-                existe = cursor.execute(
-                    "SELECT id FROM tarefas WHERE disciplina_id = ? AND titulo LIKE ?",
-                    (disc_id, f"%{ef['tipo']}%"),
-                ).fetchone()
-
-                if not existe:
-                    data_entrega = converter_data_portuguesa(ef.get("data", ""))
-                    if data_entrega and data_entrega != "":
-                        try:
-                            data_tarefa = datetime.strptime(
-                                data_entrega, "%Y-%m-%d"
-                            ).date()
-                            concluida = data_tarefa < hoje
-                        except:
-                            concluida = False
-                    else:
-                        concluida = False
-
-                    cursor.execute(
-                        """
-                        INSERT INTO tarefas
-                        (disciplina_id, titulo, descricao, tipo, data_entrega, prioridade, concluida)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                        (
-                            disc_id,
-                            f"{ef['tipo']} - {disc['sigla']}",
-                            ef.get("descricao", ""),
-                            "e-folio",
-                            data_entrega,
-                            3,
-                            concluida,
-                        ),
-                    )
-                    tarefas_criadas += 1
-
-        if "sessoes_sincronas" in disc:
-            for ss in disc["sessoes_sincronas"]:
-                existe = cursor.execute(
-                    "SELECT id FROM tarefas WHERE disciplina_id = ? AND titulo LIKE ?",
-                    (disc_id, f"%Sessão Síncrona%{ss['data']}%"),
-                ).fetchone()
-
-                if not existe:
-                    data_entrega = converter_data_portuguesa(ss.get("data", ""))
-                    if data_entrega and data_entrega != "":
-                        try:
-                            data_tarefa = datetime.strptime(
-                                data_entrega, "%Y-%m-%d"
-                            ).date()
-                            concluida = data_tarefa < hoje
-                        except:
-                            concluida = False
-                    else:
-                        concluida = False
-
-                    cursor.execute(
-                        """
-                        INSERT INTO tarefas
-                        (disciplina_id, titulo, tipo, data_entrega, prioridade, concluida)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                        (
-                            disc_id,
-                            f"Sessão Síncrona - {disc['sigla']} - {ss['data']}",
-                            "sessao-sincrona",
-                            data_entrega,
-                            2,
-                            concluida,
-                        ),
-                    )
-                    tarefas_criadas += 1
+        for ef in disc.get("e_folios", []):
+            data_entrega = calendario.converter_data(ef.get("data", ""))
+            tarefas.append(
+                (
+                    disc["id"],
+                    f"e-folio:{ef['tipo']}",
+                    f"{ef['tipo']} - {disc['sigla']}",
+                    ef.get("descricao", ""),
+                    "e-folio",
+                    data_entrega,
+                    3,
+                    data_entrega is not None and data_entrega < hoje,
+                )
+            )
 
+        for ss in disc.get("sessoes_sincronas", []):
+            data_entrega = calendario.converter_data(ss.get("data", ""))
+            tarefas.append(
+                (
+                    disc["id"],
+                    f"sessao-sincrona:{ss['data']}",
+                    f"Sessão Síncrona - {disc['sigla']} - {ss['data']}",
+                    None,
+                    "sessao-sincrona",
+                    data_entrega,
+                    2,
+                    data_entrega is not None and data_entrega < hoje,
+                )
+            )
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.executemany(
+        """
+        INSERT INTO tarefas
+        (origem, disciplina_id, chave_origem, titulo, descricao, tipo, data_entrega, prioridade, concluida)
+        VALUES ('calendario', ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(origem, disciplina_id, chave_origem) DO NOTHING
+    """,
+        tarefas,
+    )
+
+    # rowcount do executemany soma só as linhas efetivamente inseridas
+    tarefas_criadas = cursor.rowcount
     conn.commit()
     conn.close()
 
+    if tarefas_criadas:
+        publicar("tarefas_inicializadas", {"tarefas_criadas": tarefas_criadas})
+
     return jsonify(
         {
             "message": f"{tarefas_criadas} tarefas criadas com sucesso",
@@ -885,34 +852,82 @@ def inicializar_tarefas():
     )
 
 
-@app.route("/api/debug/semana", methods=["GET"])
-def debug_semana():
-    """Rota de debug para verificar cálculo de semana"""
-    lisboa_tz = pytz.timezone("Europe/Lisbon")
+@app.route("/api/export", methods=["GET"])
+def export_historico():
+    """Exporta sessões, tarefas e progresso em streaming (ndjson ou csv)"""
+    formato = request.args.get("format", "ndjson")
+    if formato not in ("ndjson", "csv"):
+        return jsonify({"error": "format deve ser ndjson ou csv"}), 400
+
+    try:
+        tabelas = ler_tabelas(request.args.get("tables"), formato)
+    except ErroExportacao as e:
+        return jsonify({"error": str(e)}), 400
+
+    extensao, mimetype = {
+        "ndjson": ("ndjson", "application/x-ndjson"),
+        "csv": ("csv", "text/csv"),
+    }[formato]
+    nome = f"estudos-{datetime.now().strftime('%Y%m%d')}.{extensao}"
+
+    return Response(
+        exportar(lambda: obter_conexao(DB_PATH), tabelas, formato),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{nome}"'},
+    )
+
+
+@app.route("/api/import", methods=["POST"])
+def import_historico():
+    """Importa um ficheiro NDJSON exportado por /api/export, em blocos"""
+    conn = get_db_connection()
+    try:
+        resultado = importar(conn, request.stream)
+    except ErroExportacao as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        conn.close()
+
+    if resultado["importados"]:
+        publicar("historico_importado", resultado["importados"])
+
+    return jsonify(resultado)
+
 
-    data_inicio = lisboa_tz.localize(datetime(2025, 9, 29, 0, 0, 0))
+@app.route("/api/events", methods=["GET"])
+def stream_events():
+    """Stream SSE com notificações de alterações (substitui o polling)"""
+    ultimo_id = request.headers.get("Last-Event-ID", type=int)
+
+    return Response(
+        stream_eventos(ultimo_id),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    hoje = datetime.now(lisboa_tz)
 
-    delta = hoje - data_inicio
-    dias_diferenca = delta.days
-    semana_calculada = dias_diferenca // 7
-    semana_final = max(0, min(semana_calculada, 14))
+@app.route("/api/debug/semana", methods=["GET"])
+def debug_semana():
+    """Rota de debug para verificar cálculo de semana"""
+    calendario = obter_calendario(catalogo)
+    hoje = hoje_lisboa()
+    semana_calculada = calendario.semana_de(hoje)
 
     return jsonify(
         {
-            "data_inicio": data_inicio.strftime("%Y-%m-%d %H:%M:%S %Z"),
-            "hoje": hoje.strftime("%Y-%m-%d %H:%M:%S %Z"),
-            "dias_diferenca": dias_diferenca,
+            "data_inicio": calendario.inicio.isoformat(),
+            "hoje": hoje.isoformat(),
+            "dias_diferenca": (hoje - calendario.inicio).days,
             "semana_calculada": semana_calculada,
-            "semana_final": semana_final,
+            "semana_final": calendario.semana_atual(hoje),
             "explicacao": {
-                "semana_0": "29 setembro - 5 outubro 2025 (apresentação)",
-                "semana_1": "6 outubro - 12 outubro 2025 (primeira semana de aulas)",
+                "semana_0": f"{calendario.inicio_semana(0).isoformat()} (apresentação)",
+                "semana_1": f"{calendario.inicio_semana(1).isoformat()} (primeira semana de aulas)",
                 "hoje_dia": hoje.day,
                 "hoje_mes": hoje.month,
                 "hoje_ano": hoje.year,
             },
+            "itens_semana": calendario.itens_semana(semana_calculada),
         }
     )
 
@@ -935,9 +950,10 @@ def moodle_login():
     if not username or not password:
         return jsonify({"success": False, "error": "Credenciais não fornecidas"}), 400
 
-    moodle_client = MoodleUAB(username, password)
+    moodle_client = create_moodle_client(username, password)
 
-    if moodle_client.login():
+    # As credenciais enviadas têm de ser verificadas: não basta a sessão guardada
+    if moodle_client.login(force=True):
         return jsonify(
             {
                 "success": True,
@@ -985,6 +1001,11 @@ def moodle_get_materials(course_id):
     return jsonify({"success": True, "materials": materials})
 
 
+def moodle_state() -> MoodleState:
+    """Estado da sincronização Moodle guardado em estudos.db"""
+    return MoodleState(lambda: obter_conexao(DB_PATH))
+
+
 @app.route("/api/moodle/forums/<int:course_id>", methods=["GET"])
 def moodle_get_forums(course_id):
     """Buscar posts de fóruns"""
@@ -993,8 +1014,13 @@ def moodle_get_forums(course_id):
     if not MOODLE_AVAILABLE or not moodle_client or not moodle_client.is_logged_in:
         return jsonify({"success": False, "error": "Não conectado ao Moodle"}), 401
 
-    forums = moodle_client.get_forum_posts(course_id)
-    return jsonify({"success": True, "forums": forums})
+    # Só as discussões novas desde o cursor de cada fórum são pedidas ao Moodle
+    state = moodle_state()
+    new, complete = moodle_client.get_forum_updates(course_id, state.forum_cursors())
+    state.record("forum_discussions", new)
+    state.advance_forum_cursors(new, complete=complete)
+
+    return jsonify({"success": True, "forums": state.items("forum_discussions", course_id), "new": new})
 
 
 @app.route("/api/moodle/grades/<int:course_id>", methods=["GET"])
@@ -1006,6 +1032,7 @@ def moodle_get_grades(course_id):
         return jsonify({"success": False, "error": "Não conectado ao Moodle"}), 401
 
     grades = moodle_client.get_grades(course_id)
+    moodle_state().record("grades", grade_items(course_id, grades))
     return jsonify({"success": True, "grades": grades})
 
 
@@ -1033,30 +1060,142 @@ def moodle_get_notifications():
     return jsonify({"success": True, "notifications": notifications})
 
 
+def submeter_sync_moodle(delta: bool = False):
+    """Submete a sincronização Moodle como job (devolve o que já estiver em curso)"""
+    crawler_state = moodle_state()
+
+    def executar(job):
+        results = MoodleCrawler(moodle_client, state=crawler_state, progress=job.progresso).sync(
+            delta=delta
+        )
+
+        resumo_sync = {
+            "courses_count": len(results["courses"]),
+            "calendar_events": len(results["calendar"]),
+            "notifications_count": len(results["notifications"]),
+            "materials_downloaded": len(results["materials"]),
+            "changes": results["changes"],
+            "failed": results["failed"],
+            "mode": "delta" if delta else "full",
+            "elapsed": results["elapsed"],
+        }
+        publicar(
+            "moodle_sincronizado",
+            {
+                "job_id": job.id,
+                "courses_count": resumo_sync["courses_count"],
+                "calendar_events": resumo_sync["calendar_events"],
+                "materials_downloaded": resumo_sync["materials_downloaded"],
+            },
+        )
+        return resumo_sync
+
+    return jobs.submeter("moodle_sync", executar)
+
+
+def sync_moodle_periodica():
+    """Sincronização delta agendada (ignorada se não houver sessão Moodle)"""
+    if MOODLE_AVAILABLE and moodle_client and moodle_client.is_logged_in:
+        submeter_sync_moodle(delta=True)
+
+
+def iniciar_agendamentos():
+    """Agenda as tarefas periódicas (sincronização Moodle)
+
+    Deve ser chamada uma vez pelo ponto de entrada do processo que serve os
+    pedidos (o bloco __main__ ou o servidor que importa app), e não no
+    processo do reloader do modo debug, que só vigia os ficheiros.
+    """
+    if MOODLE_AVAILABLE and MOODLE_SYNC_INTERVAL_MIN > 0:
+        jobs.agendar("moodle_sync", sync_moodle_periodica, MOODLE_SYNC_INTERVAL_MIN)
+        print(f"⏰ Sincronização Moodle a cada {MOODLE_SYNC_INTERVAL_MIN:g} min")
+
+
 @app.route("/api/moodle/sync", methods=["POST"])
 def moodle_full_sync():
-    """Sincronização completa"""
+    """Inicia a sincronização em segundo plano (?mode=delta processa só o que mudou)"""
     global moodle_client
 
     if not MOODLE_AVAILABLE or not moodle_client or not moodle_client.is_logged_in:
         return jsonify({"success": False, "error": "Não conectado ao Moodle"}), 401
 
-    courses = moodle_client.get_enrolled_courses()
-    calendar = moodle_client.sync_calendar()
-    notifications = moodle_client.check_notifications()
-    materials = moodle_client.auto_download_new_materials()
+    job, criado = submeter_sync_moodle(delta=request.args.get("mode") == "delta")
+
+    return (
+        jsonify(
+            {
+                "success": True,
+                "job_id": job.id,
+                "already_running": not criado,
+                "status_url": f"/api/jobs/{job.id}",
+            }
+        ),
+        202,
+    )
+
+
+@app.route("/api/jobs", methods=["GET"])
+def listar_jobs():
+    """Jobs recentes, do mais recente para o mais antigo"""
+    return jsonify([job.para_dict() for job in jobs.listar()])
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def obter_job(job_id):
+    """Estado, progresso por etapa e resultado de um job"""
+    job = jobs.obter(job_id)
+    if job is None:
+        return jsonify({"error": "Job não encontrado"}), 404
+    return jsonify(job.para_dict())
+
+
+def parse_since(value: Optional[str]) -> str:
+    """Data ISO de ?since= em hora local sem fuso (por omissão, há 24 h)"""
+    since = datetime.fromisoformat(value) if value else datetime.now() - timedelta(days=1)
+    if since.tzinfo:
+        # Os registos usam a hora local sem fuso
+        since = since.astimezone().replace(tzinfo=None)
+    return since.isoformat(timespec="seconds")
+
+
+@app.route("/api/moodle/changes", methods=["GET"])
+def moodle_changes():
+    """Itens do Moodle novos ou alterados desde ?since= (por omissão, últimas 24 h)"""
+    try:
+        since = parse_since(request.args.get("since"))
+    except ValueError:
+        return jsonify({"error": "Parâmetro 'since' deve ser uma data ISO"}), 400
+
+    kinds = request.args.get("kinds")
+    kinds = kinds.split(",") if kinds else list(MOODLE_KINDS)
+    invalid = [k for k in kinds if k not in MOODLE_KINDS]
+    if invalid:
+        return jsonify({"error": f"Tipos desconhecidos: {', '.join(invalid)}"}), 400
+
+    changes = moodle_state().changes_since(since, kinds)
 
     return jsonify(
         {
-            "success": True,
-            "courses_count": len(courses),
-            "calendar_events": len(calendar),
-            "notifications_count": len(notifications),
-            "materials_downloaded": len(materials),
+            "since": since,
+            "changes": changes,
+            "total": sum(len(items) for items in changes.values()),
         }
     )
 
 
+def restaurar_sessao_moodle():
+    """Retoma a sessão Moodle guardada após um reinício do servidor (uma tentativa)"""
+    global moodle_client, sessao_moodle_tentada
+
+    if sessao_moodle_tentada or not (DATA_DIR / "moodle" / "session.json").exists():
+        return
+    sessao_moodle_tentada = True
+
+    client = create_moodle_client(moodle_username, moodle_password)
+    if client.restore_session():
+        moodle_client = client
+
+
 @app.route("/api/moodle/status", methods=["GET"])
 def moodle_status():
     """Status da conexão Moodle"""
@@ -1065,6 +1204,8 @@ def moodle_status():
     if not MOODLE_AVAILABLE:
         return jsonify({"available": False, "error": "Módulo não disponível"})
 
+    if not moodle_client:
+        restaurar_sessao_moodle()
     if not moodle_client:
         return jsonify({"available": True, "logged_in": False})
 
@@ -1215,8 +1356,22 @@ def ai_analyze_forums():
     if not ai_assistant:
         ai_assistant = AIAssistant()
 
-    data = request.get_json()
-    posts = data.get("posts", [])
+    data = request.get_json(silent=True) or {}
+    posts = data.get("posts")
+
+    if posts is None:
+        # Sem posts no pedido: só as discussões novas (ou com respostas novas) desde `since`
+        try:
+            since = parse_since(data.get("since"))
+        except ValueError:
+            return jsonify({"error": "Parâmetro 'since' deve ser uma data ISO"}), 400
+
+        posts = moodle_state().changes_since(since, ["forum_discussions"])["forum_discussions"]
+        if data.get("course_id") is not None:
+            posts = [p for p in posts if p.get("course_id") == data["course_id"]]
+
+        if not posts:
+            return jsonify({"success": True, "analysis": None, "posts": 0})
 
     result = ai_assistant.analyze_forum_posts(posts)
     return jsonify(result)
@@ -1397,6 +1552,7 @@ def open_file(file_path):
 
 
 @app.route("/api/folders/stats", methods=["GET"])
+@com_etag(get_db_connection, tabelas=("mapeamento_pastas", "arquivos_disciplinas"))
 def get_folder_stats():
     """Retorna estatísticas de pastas"""
     global folder_sync_manager
@@ -1566,6 +1722,8 @@ def clear_copilot_history(agent_name):
 
 
 if __name__ == "__main__":
+    app.debug = True
+
     print("🚀 Iniciando servidor backend...")
     print(f"📂 Diretório de dados: {DATA_DIR}")
     print(f"🗄️  Banco de dados: {DB_PATH}")
@@ -1589,9 +1747,14 @@ if __name__ == "__main__":
     else:
         print("⚠️  Módulo Folder Sync não disponível")
 
-    semana = calcular_semana_atual()
+    semana = obter_calendario(catalogo).semana_atual()
     print(f"📅 Semana atual do semestre: {semana}")
 
+    # Com debug, o reloader executa este bloco também no processo que só vigia
+    # os ficheiros; o agendamento fica apenas no processo que serve pedidos
+    if not app.debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        iniciar_agendamentos()
+
     # Abrir navegador automaticamente
     import threading
     import webbrowser
@@ -1605,4 +1768,4 @@ if __name__ == "__main__":
     browser_thread = threading.Thread(target=open_browser, daemon=True)
     browser_thread.start()
 
-    app.run(debug=True, host="0.0.0.0", port=5000)
+    app.run(debug=app.debug, host="0.0.0.0", port=5000)
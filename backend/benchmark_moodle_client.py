@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do cliente Moodle sobre as páginas gravadas (sem rede)
+
+Cada método do MoodleUAB corre contra o ReplayAdapter de moodle_replay
+(fixtures/moodle). Para cada um mede-se o tempo total (melhor de N), os
+pedidos feitos, os bytes recebidos e o tempo de análise (CPU do processo
+em todas as threads; a latência simulada não conta). A página da
+disciplina é pedida de novo em cada repetição. --latencia simula o tempo
+de resposta do servidor, o que mostra o ganho das chamadas em paralelo
+(fóruns, MoodleCrawler.sync). --json guarda os resultados para comparar
+execuções.
+
+Uso:
+    python benchmark_moodle_client.py [--repeticoes N] [--latencia MS] [--json FICHEIRO]
+"""
+
+import json
+import sys
+import tempfile
+import time
+
+from moodle_crawler import MoodleCrawler
+from moodle_replay import replay_client
+
+DISCIPLINA = 21053
+
+
+def _arg(nome: str, omissao):
+    return type(omissao)(sys.argv[sys.argv.index(nome) + 1]) if nome in sys.argv else omissao
+
+
+def metodos(client):
+    """(nome, função) de cada operação medida"""
+
+    def com_pagina_nova(funcao):
+        def medir():
+            client.course_pages.invalidate()
+            return funcao(DISCIPLINA)
+        return medir
+
+    return [
+        ("login", lambda: client.login(force=True)),
+        ("restore_session", client.restore_session),
+        ("get_enrolled_courses", client.get_enrolled_courses),
+        ("get_course_assignments", com_pagina_nova(client.get_course_assignments)),
+        ("get_course_materials", com_pagina_nova(client.get_course_materials)),
+        ("get_forum_posts", com_pagina_nova(client.get_forum_posts)),
+        ("get_grades", lambda: client.get_grades(DISCIPLINA)),
+        ("sync_calendar", client.sync_calendar),
+        ("check_notifications", client.check_notifications),
+        ("MoodleCrawler.sync", lambda: MoodleCrawler(client).sync(download_materials=False)),
+    ]
+
+
+def medir(funcao, adapter, repeticoes: int) -> dict:
+    """Melhor execução de funcao: ms totais, ms de análise, pedidos e bytes"""
+    melhor = None
+
+    for _ in range(repeticoes):
+        antes = adapter.totals()
+        inicio, cpu = time.perf_counter(), time.process_time()
+        funcao()
+        total, cpu = time.perf_counter() - inicio, time.process_time() - cpu
+        depois = adapter.totals()
+
+        if melhor is None or total < melhor["total_ms"] / 1000:
+            melhor = {
+                "total_ms": round(total * 1000, 2),
+                "parse_ms": round(cpu * 1000, 2),
+                "requests": depois["requests"] - antes["requests"],
+                "bytes": depois["bytes"] - antes["bytes"],
+            }
+
+    return melhor
+
+
+def main():
+    repeticoes = _arg("--repeticoes", 10)
+    latencia = _arg("--latencia", 0.0)
+    destino = _arg("--json", "")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client, adapter = replay_client(latency=latencia / 1000, data_dir=tmp)
+        client.login()
+
+        print(f"Cliente Moodle sobre fixtures ({repeticoes} repetições, melhor tempo, latência {latencia:.0f}ms)")
+        print()
+        print(f"{'método':<24} {'total':>10} {'análise':>10} {'pedidos':>8} {'KB':>8}")
+
+        resultados = {}
+        # Uma execução prévia aquece imports e caches de ficheiros
+        for nome, funcao in metodos(client):
+            funcao()
+            resultados[nome] = r = medir(funcao, adapter, repeticoes)
+            print(
+                f"{nome:<24} {r['total_ms']:>8.1f}ms {r['parse_ms']:>8.1f}ms "
+                f"{r['requests']:>8} {r['bytes'] / 1024:>8.1f}"
+            )
+
+    if destino:
+        with open(destino, "w", encoding="utf-8") as f:
+            json.dump({"repeticoes": repeticoes, "latencia_ms": latencia, "metodos": resultados}, f, indent=2)
+        print(f"\n💾 Resultados guardados em {destino}")
+
+
+if __name__ == "__main__":
+    main()
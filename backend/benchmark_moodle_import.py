@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do custo de importação do cliente Moodle no arranque da API
+
+Cada medição corre num processo Python novo (sem módulos em cache) e guarda
+o melhor tempo. "antes" acrescenta ao import atual o selenium e o
+webdriver_manager, que moodle_integration importava no topo do ficheiro.
+
+Uso:
+    python benchmark_moodle_import.py [--repeticoes N]
+"""
+
+import os
+import subprocess
+import sys
+
+CASOS = [
+    ("moodle_integration (antes)", "import moodle_integration, selenium.webdriver, webdriver_manager.chrome"),
+    ("moodle_integration (agora)", "import moodle_integration"),
+    ("só selenium + webdriver_manager", "import selenium.webdriver, webdriver_manager.chrome"),
+]
+
+MEDIR = """
+import sys, time
+inicio = time.perf_counter()
+{importar}
+print(time.perf_counter() - inicio, 'selenium' in sys.modules)
+"""
+
+
+def medir(importar: str, repeticoes: int):
+    """Melhor tempo (ms) e se o selenium ficou carregado"""
+    melhor, selenium = float("inf"), False
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", MEDIR.format(importar=importar)],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        melhor = min(melhor, float(saida[-2]))
+        selenium = saida[-1] == "True"
+    return melhor * 1000, selenium
+
+
+def main():
+    repeticoes = int(sys.argv[sys.argv.index("--repeticoes") + 1]) if "--repeticoes" in sys.argv else 5
+
+    print(f"Melhor de {repeticoes} processos novos\n")
+    print(f"{'import':<34} {'tempo':>9}  selenium carregado")
+    for nome, importar in CASOS:
+        try:
+            tempo, selenium = medir(importar, repeticoes)
+        except subprocess.CalledProcessError:
+            print(f"{nome:<34} {'-':>9}  (módulo não instalado)")
+            continue
+        print(f"{nome:<34} {tempo:>7.1f}ms  {'sim' if selenium else 'não'}")
+
+    # A API inteira não pode voltar a carregar o selenium
+    _, selenium = medir("import app", 1)
+    print(f"\napp.py carrega o selenium: {'sim ❌' if selenium else 'não ✅'}")
+
+
+if __name__ == "__main__":
+    main()
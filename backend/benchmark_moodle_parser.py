@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da análise de HTML do Moodle sobre as páginas em fixtures/moodle
+
+Compara a árvore completa com html.parser (o método anterior, só a
+construção da árvore e o find_all) com as funções parse_* de moodle_parser
+em cada backend: html.parser com SoupStrainer e, se estiver instalado, lxml.
+A página de disciplina é também ampliada (secções repetidas) para simular
+disciplinas com muitos tópicos.
+
+Uso:
+    python benchmark_moodle_parser.py [--repeticoes N]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from moodle_course import CoursePage
+from moodle_parser import (
+    LXML_AVAILABLE,
+    parse,
+    parse_activities,
+    parse_courses,
+    parse_discussions,
+    parse_events,
+    parse_grades,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "moodle"
+
+PAGINAS = [
+    ("course_view.html", parse_activities, ("li", "activity")),
+    ("forum_view.html", parse_discussions, ("tr", "discussion")),
+    ("grade_report.html", parse_grades, ("table", "generaltable")),
+    ("calendar_month.html", parse_events, ("div", "event")),
+    ("dashboard.html", parse_courses, ("div", "card-deck")),
+]
+
+# Fator de ampliação da página de disciplina grande
+AMPLIACAO = 20
+
+
+def pagina_grande(html: str) -> str:
+    """Página de disciplina com as secções repetidas AMPLIACAO vezes"""
+    inicio = html.index('<ul class="topics">\n') + len('<ul class="topics">\n')
+    fim = html.index("</ul>\n                    </div>", inicio)
+    return html[:inicio] + html[inicio:fim] * AMPLIACAO + html[fim:]
+
+
+def medir(funcao, repeticoes: int) -> float:
+    """Melhor tempo (ms) de várias execuções"""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000
+
+
+def main():
+    repeticoes = int(sys.argv[sys.argv.index("--repeticoes") + 1]) if "--repeticoes" in sys.argv else 10
+
+    parsers = ["html.parser"] + (["lxml"] if LXML_AVAILABLE else [])
+    casos = []
+    for nome, funcao, (tag, classe) in PAGINAS:
+        html = (FIXTURES / nome).read_text(encoding="utf-8")
+        casos.append((nome, html, funcao, tag, classe))
+        if nome == "course_view.html":
+            casos.append((f"course_view.html x{AMPLIACAO}", pagina_grande(html), funcao, tag, classe))
+
+    print(f"Parsers disponíveis: {', '.join(parsers)} ({repeticoes} repetições, melhor tempo)")
+    if not LXML_AVAILABLE:
+        print("💡 Instale lxml (pip install lxml) para comparar também esse backend")
+    print()
+    print(f"{'página':<26} {'KB':>6} {'anterior':>10}" + "".join(f" {p:>13}" for p in parsers) + f" {'ganho':>7}")
+
+    for nome, html, funcao, tag, classe in casos:
+        completo = medir(lambda: parse(html).find_all(tag, class_=classe), repeticoes)
+        parciais = [medir(lambda: funcao(html, p), repeticoes) for p in parsers]
+
+        # Todos os backends têm de extrair o mesmo
+        assert all(funcao(html, p) == funcao(html, "html.parser") for p in parsers)
+
+        print(
+            f"{nome:<26} {len(html.encode('utf-8')) / 1024:>6.0f} {completo:>8.1f}ms"
+            + "".join(f" {t:>11.1f}ms" for t in parciais)
+            + f" {completo / min(parciais):>6.1f}x"
+        )
+
+    html = pagina_grande((FIXTURES / "course_view.html").read_text(encoding="utf-8"))
+    pagina = CoursePage(21053, html)
+    print(
+        f"\nCoursePage (página x{AMPLIACAO}): {len(pagina.assignments)} tarefas, "
+        f"{len(pagina.materials)} materiais, {len(pagina.forums)} fóruns em "
+        f"{medir(lambda: CoursePage(21053, html), repeticoes):.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Calendário do semestre pré-calculado a partir de disciplinas.json
+
+O início do semestre vem de "inicio_semestre" (AAAA-MM-DD) ou é deduzido de
+ano_letivo/semestre. Ao carregar, os limites das semanas e as datas de
+e-fólios, sessões síncronas e semanas do plano de trabalho são convertidos
+para datas ISO e ordenados, e as consultas ("semana atual", "itens da
+semana N", "próximos prazos") fazem-se por bisect sobre esses arrays.
+"""
+
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import pytz
+
+LISBOA = pytz.timezone("Europe/Lisbon")
+
+# Semana máxima devolvida como "semana atual" (a semana 0 é a de apresentação)
+SEMANA_MAXIMA = 14
+
+MESES = {
+    "janeiro": 1,
+    "fevereiro": 2,
+    "março": 3,
+    "abril": 4,
+    "maio": 5,
+    "junho": 6,
+    "julho": 7,
+    "agosto": 8,
+    "setembro": 9,
+    "outubro": 10,
+    "novembro": 11,
+    "dezembro": 12,
+}
+
+TIPOS_PRAZO = ("e-folio", "sessao-sincrona")
+
+
+def hoje_lisboa() -> date:
+    """Data de hoje em Lisboa"""
+    return datetime.now(LISBOA).date()
+
+
+def _ultima_segunda(ano: int, mes: int) -> date:
+    """Última segunda-feira de um mês"""
+    seguinte = date(ano + (mes == 12), mes % 12 + 1, 1)
+    ultimo_dia = seguinte - timedelta(days=1)
+    return ultimo_dia - timedelta(days=ultimo_dia.weekday())
+
+
+def calcular_inicio_semestre(dados: Dict) -> date:
+    """Segunda-feira da semana 0 do semestre
+
+    Usa "inicio_semestre" se existir; senão a última segunda de setembro
+    (1º semestre) ou de fevereiro (2º semestre) do ano letivo.
+    """
+    if dados.get("inicio_semestre"):
+        return date.fromisoformat(dados["inicio_semestre"])
+
+    try:
+        ano = int(str(dados.get("ano_letivo", "")).split("/")[0])
+    except ValueError:
+        ano = hoje_lisboa().year
+
+    if "2º semestre" in str(dados.get("semestre", "")):
+        return _ultima_segunda(ano + 1, 2)
+    return _ultima_segunda(ano, 9)
+
+
+def converter_data(texto: str, inicio: date) -> Optional[date]:
+    """Converte 'DD mês', 'DD de mês de AAAA', 'AAAA-MM-DD' ou 'DD-MM-AAAA'
+
+    Sem ano explícito, meses anteriores ao início do semestre pertencem
+    ao ano seguinte.
+    """
+    if not texto:
+        return None
+
+    texto = str(texto).strip().lower()
+
+    for formato in ("%Y-%m-%d", "%d-%m-%Y"):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            pass
+
+    partes = [p for p in re.split(r"\s+", texto) if p != "de"]
+    if len(partes) not in (2, 3) or partes[1] not in MESES or not partes[0].isdigit():
+        return None
+
+    mes = MESES[partes[1]]
+    if len(partes) == 3 and partes[2].isdigit():
+        ano = int(partes[2])
+    else:
+        ano = inicio.year if mes >= inicio.month else inicio.year + 1
+
+    try:
+        return date(ano, mes, int(partes[0]))
+    except ValueError:
+        return None
+
+
+class CalendarioSemestre:
+    """Índice de datas do semestre, construído uma vez por versão do catálogo"""
+
+    def __init__(self, dados: Dict):
+        self.inicio = calcular_inicio_semestre(dados)
+        self.itens: List[Dict] = []
+
+        for disc in dados.get("disciplinas", []):
+            for ef in disc.get("e_folios", []):
+                self._adicionar(disc, "e-folio", ef["tipo"], ef.get("semana"),
+                                ef.get("data") or ef.get("data_inicio"), ef)
+            for ss in disc.get("sessoes_sincronas", []):
+                self._adicionar(disc, "sessao-sincrona", f"Sessão Síncrona - {ss.get('data', '')}",
+                                ss.get("semana"), ss.get("data"), ss)
+            for semana in disc.get("plano_trabalho", {}).get("semanas", []):
+                self._adicionar(disc, "plano", semana.get("topico", ""), semana.get("numero"),
+                                semana.get("data"), semana)
+
+        # Arrays ordenados por data (ISO) para as consultas por bisect
+        self.itens.sort(key=lambda i: (i["data"], i["disciplina_id"]))
+        self._datas = [i["data"] for i in self.itens]
+
+        self.prazos = [i for i in self.itens if i["tipo"] in TIPOS_PRAZO]
+        self._datas_prazos = [i["data"] for i in self.prazos]
+
+        ultima = date.fromisoformat(self._datas[-1]) if self._datas else self.inicio
+        total = max(SEMANA_MAXIMA, (ultima - self.inicio).days // 7) + 2
+        self.limites = [(self.inicio + timedelta(weeks=n)).isoformat() for n in range(total)]
+
+    def _adicionar(self, disc: Dict, tipo: str, titulo: str, semana: Optional[int],
+                   texto_data: Optional[str], origem: Dict):
+        data = converter_data(texto_data, self.inicio)
+        if data is None and isinstance(semana, int):
+            data = self.inicio + timedelta(weeks=semana)
+        if data is None:
+            return
+
+        self.itens.append(
+            {
+                "tipo": tipo,
+                "titulo": titulo,
+                "disciplina_id": disc["id"],
+                "sigla": disc["sigla"],
+                "disciplina": disc["nome"],
+                "semana": semana,
+                "data": data.isoformat(),
+                "origem": origem,
+            }
+        )
+
+    def converter_data(self, texto: str) -> Optional[str]:
+        """Data em formato ISO (ou None) relativa a este semestre"""
+        data = converter_data(texto, self.inicio)
+        return data.isoformat() if data else None
+
+    def semana_de(self, dia: date) -> int:
+        """Número da semana do semestre que contém `dia` (negativo se antes do início)"""
+        if dia < self.inicio:
+            return (dia - self.inicio).days // 7
+        return bisect_right(self.limites, dia.isoformat()) - 1
+
+    def semana_atual(self, hoje: Optional[date] = None) -> int:
+        """Semana atual (hora de Lisboa), limitada a 0..SEMANA_MAXIMA"""
+        semana = self.semana_de(hoje or hoje_lisboa())
+        return max(0, min(semana, SEMANA_MAXIMA))
+
+    def inicio_semana(self, semana: int) -> date:
+        """Segunda-feira da semana indicada"""
+        return self.inicio + timedelta(weeks=semana)
+
+    def itens_semana(self, semana: int, tipos: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Itens com data dentro da semana indicada"""
+        de = self.inicio_semana(semana).isoformat()
+        ate = self.inicio_semana(semana + 1).isoformat()
+        itens = self.itens[bisect_left(self._datas, de):bisect_left(self._datas, ate)]
+        return [i for i in itens if tipos is None or i["tipo"] in tipos]
+
+    def proximos_prazos(self, quantidade: int = 5, desde: Optional[date] = None,
+                        tipos: Sequence[str] = TIPOS_PRAZO) -> List[Dict]:
+        """Próximos `quantidade` prazos com data >= `desde` (hoje por omissão)"""
+        desde = (desde or hoje_lisboa()).isoformat()
+        resultado = []
+        for item in self.prazos[bisect_left(self._datas_prazos, desde):]:
+            if item["tipo"] in tipos:
+                resultado.append(item)
+                if len(resultado) == quantidade:
+                    break
+        return resultado
+
+
+_lock = threading.Lock()
+# (dados, calendario) trocados de uma só vez
+_cache = (None, None)
+
+
+def obter_calendario(catalogo) -> CalendarioSemestre:
+    """Calendário do catálogo, reconstruído só quando disciplinas.json muda"""
+    global _cache
+
+    dados = catalogo.dados()
+    dados_cache, calendario = _cache
+    if dados_cache is dados:
+        return calendario
+
+    with _lock:
+        if _cache[0] is not dados:
+            _cache = (dados, CalendarioSemestre(dados))
+        return _cache[1]
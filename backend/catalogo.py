@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Catálogo de disciplinas em memória
+Carrega data/disciplinas.json uma única vez e só o volta a ler quando o
+ficheiro muda (mtime ou tamanho), com índices por id, sigla e dia da semana.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Entradas da distribuição diária que não correspondem a uma disciplina
+DISCIPLINAS_ESPECIAIS = ("REVISAO", "E_FOLIOS")
+
+
+class CatalogoDisciplinas:
+    """Cache de disciplinas.json invalidada pela assinatura do ficheiro
+
+    Os dicionários devolvidos são partilhados entre pedidos e devem ser
+    tratados como só de leitura; quem precisar de os alterar deve copiá-los.
+    """
+
+    def __init__(self, json_path: Path):
+        self.json_path = Path(json_path)
+        self._lock = threading.Lock()
+        self._assinatura: Optional[Tuple[int, int]] = None
+        # (dados, por_id, por_sigla, calendario) trocados de uma só vez
+        self._indices: Tuple[Dict, Dict, Dict, Dict] = ({}, {}, {}, {})
+        self.versao = 0
+
+    def _assinatura_atual(self) -> Tuple[int, int]:
+        stat = os.stat(self.json_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _atualizar(self) -> Tuple[Dict, Dict, Dict, Dict]:
+        """Recarrega o ficheiro se a assinatura mudou desde a última leitura"""
+        assinatura = self._assinatura_atual()
+        if assinatura == self._assinatura:
+            return self._indices
+
+        with self._lock:
+            if assinatura == self._assinatura:
+                return self._indices
+
+            with open(self.json_path, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+
+            disciplinas = dados.get("disciplinas", [])
+            por_id = {d["id"]: d for d in disciplinas}
+            por_sigla = {d["sigla"]: d for d in disciplinas}
+
+            calendario = {}
+            for dia, calendario_dia in dados.get("calendario_semanal", {}).items():
+                disciplinas_do_dia = []
+                for item in calendario_dia.get("distribuicao", []):
+                    sigla = item.get("disciplina")
+                    if sigla and sigla not in DISCIPLINAS_ESPECIAIS and sigla in por_sigla:
+                        disciplinas_do_dia.append(
+                            {
+                                "disciplina": por_sigla[sigla],
+                                "horario": f"{item['inicio']} - {item['fim']}",
+                            }
+                        )
+
+                calendario[dia] = {
+                    "horario_geral": calendario_dia.get("horario"),
+                    "distribuicao": calendario_dia.get("distribuicao", []),
+                    "disciplinas": disciplinas_do_dia,
+                }
+
+            self._indices = (dados, por_id, por_sigla, calendario)
+            self._assinatura = assinatura
+            self.versao += 1
+            return self._indices
+
+    @property
+    def assinatura(self) -> Tuple[int, int]:
+        """Assinatura (mtime_ns, tamanho) dos dados atualmente carregados"""
+        self._atualizar()
+        return self._assinatura
+
+    def dados(self) -> Dict:
+        """Conteúdo completo de disciplinas.json"""
+        return self._atualizar()[0]
+
+    def por_id(self, disciplina_id: str) -> Optional[Dict]:
+        """Procura uma disciplina pelo id"""
+        return self._atualizar()[1].get(disciplina_id)
+
+    def por_sigla(self, sigla: str) -> Optional[Dict]:
+        """Procura uma disciplina pela sigla"""
+        return self._atualizar()[2].get(sigla)
+
+    def calendario_dia(self, dia_semana: str) -> Optional[Dict]:
+        """Calendário de um dia com as disciplinas já resolvidas"""
+        return self._atualizar()[3].get(dia_semana.lower())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Contadores de estudo por disciplina e totais diários (estudo_diario)
+Mantidos por triggers SQLite a cada escrita em sessoes_estudo
+
+Uso:
+    python contadores.py              # reconstrói os contadores a partir das sessões
+    python contadores.py --verificar  # compara contadores com as sessões sem alterar nada
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+DB_PATH = Path(__file__).parent.parent / "data" / "estudos.db"
+
+ULTIMO_ESTUDO_SQL = """
+    (SELECT MAX(data || ' ' || hora_inicio) FROM sessoes_estudo
+     WHERE disciplina_id = {alias}.disciplina_id)
+"""
+
+SCHEMA_CONTADORES = f"""
+    CREATE TABLE IF NOT EXISTS contadores_estudo (
+        disciplina_id TEXT PRIMARY KEY,
+        total_sessoes INTEGER NOT NULL DEFAULT 0,
+        total_minutos INTEGER NOT NULL DEFAULT 0,
+        ultimo_estudo TEXT
+    );
+
+    CREATE TRIGGER IF NOT EXISTS contadores_sessao_insert
+    AFTER INSERT ON sessoes_estudo
+    BEGIN
+        INSERT INTO contadores_estudo
+            (disciplina_id, total_sessoes, total_minutos, ultimo_estudo)
+        VALUES (NEW.disciplina_id, 1, COALESCE(NEW.duracao_minutos, 0),
+                NEW.data || ' ' || NEW.hora_inicio)
+        ON CONFLICT(disciplina_id) DO UPDATE SET
+            total_sessoes = total_sessoes + 1,
+            total_minutos = total_minutos + excluded.total_minutos,
+            ultimo_estudo = MAX(COALESCE(ultimo_estudo, ''), excluded.ultimo_estudo);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS contadores_sessao_update
+    AFTER UPDATE OF disciplina_id, data, hora_inicio, duracao_minutos ON sessoes_estudo
+    BEGIN
+        UPDATE contadores_estudo
+        SET total_sessoes = total_sessoes - 1,
+            total_minutos = total_minutos - COALESCE(OLD.duracao_minutos, 0),
+            ultimo_estudo = {ULTIMO_ESTUDO_SQL.format(alias="OLD")}
+        WHERE disciplina_id = OLD.disciplina_id;
+
+        INSERT INTO contadores_estudo
+            (disciplina_id, total_sessoes, total_minutos, ultimo_estudo)
+        VALUES (NEW.disciplina_id, 1, COALESCE(NEW.duracao_minutos, 0),
+                NEW.data || ' ' || NEW.hora_inicio)
+        ON CONFLICT(disciplina_id) DO UPDATE SET
+            total_sessoes = total_sessoes + 1,
+            total_minutos = total_minutos + excluded.total_minutos,
+            ultimo_estudo = MAX(COALESCE(ultimo_estudo, ''), excluded.ultimo_estudo);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS contadores_sessao_delete
+    AFTER DELETE ON sessoes_estudo
+    BEGIN
+        UPDATE contadores_estudo
+        SET total_sessoes = total_sessoes - 1,
+            total_minutos = total_minutos - COALESCE(OLD.duracao_minutos, 0),
+            ultimo_estudo = {ULTIMO_ESTUDO_SQL.format(alias="OLD")}
+        WHERE disciplina_id = OLD.disciplina_id;
+    END;
+"""
+
+SCHEMA_ESTUDO_DIARIO = """
+    CREATE TABLE IF NOT EXISTS estudo_diario (
+        data TEXT NOT NULL,
+        disciplina_id TEXT NOT NULL,
+        minutos INTEGER NOT NULL DEFAULT 0,
+        sessoes INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (data, disciplina_id)
+    ) WITHOUT ROWID;
+
+    CREATE TRIGGER IF NOT EXISTS estudo_diario_sessao_insert
+    AFTER INSERT ON sessoes_estudo
+    BEGIN
+        INSERT INTO estudo_diario (data, disciplina_id, minutos, sessoes)
+        VALUES (NEW.data, NEW.disciplina_id, COALESCE(NEW.duracao_minutos, 0), 1)
+        ON CONFLICT(data, disciplina_id) DO UPDATE SET
+            minutos = minutos + excluded.minutos,
+            sessoes = sessoes + 1;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS estudo_diario_sessao_update
+    AFTER UPDATE OF disciplina_id, data, duracao_minutos ON sessoes_estudo
+    BEGIN
+        UPDATE estudo_diario
+        SET minutos = minutos - COALESCE(OLD.duracao_minutos, 0),
+            sessoes = sessoes - 1
+        WHERE data = OLD.data AND disciplina_id = OLD.disciplina_id;
+
+        INSERT INTO estudo_diario (data, disciplina_id, minutos, sessoes)
+        VALUES (NEW.data, NEW.disciplina_id, COALESCE(NEW.duracao_minutos, 0), 1)
+        ON CONFLICT(data, disciplina_id) DO UPDATE SET
+            minutos = minutos + excluded.minutos,
+            sessoes = sessoes + 1;
+
+        DELETE FROM estudo_diario
+        WHERE data = OLD.data AND disciplina_id = OLD.disciplina_id AND sessoes <= 0;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS estudo_diario_sessao_delete
+    AFTER DELETE ON sessoes_estudo
+    BEGIN
+        UPDATE estudo_diario
+        SET minutos = minutos - COALESCE(OLD.duracao_minutos, 0),
+            sessoes = sessoes - 1
+        WHERE data = OLD.data AND disciplina_id = OLD.disciplina_id;
+
+        DELETE FROM estudo_diario
+        WHERE data = OLD.data AND disciplina_id = OLD.disciplina_id AND sessoes <= 0;
+    END;
+"""
+
+RECALCULO_DIARIO_SQL = """
+    SELECT data, disciplina_id,
+           COALESCE(SUM(duracao_minutos), 0) as minutos,
+           COUNT(*) as sessoes
+    FROM sessoes_estudo
+    GROUP BY data, disciplina_id
+"""
+
+RECALCULO_SQL = """
+    SELECT disciplina_id,
+           COUNT(*) as total_sessoes,
+           COALESCE(SUM(duracao_minutos), 0) as total_minutos,
+           MAX(data || ' ' || hora_inicio) as ultimo_estudo
+    FROM sessoes_estudo
+    GROUP BY disciplina_id
+"""
+
+
+def recalcular_contadores(conn):
+    """Recalcula os contadores dentro da transação atual"""
+    conn.execute("DELETE FROM contadores_estudo")
+    conn.execute(
+        f"""
+        INSERT INTO contadores_estudo
+            (disciplina_id, total_sessoes, total_minutos, ultimo_estudo)
+        {RECALCULO_SQL}
+    """
+    )
+
+
+def recalcular_estudo_diario(conn):
+    """Recalcula os totais diários dentro da transação atual"""
+    conn.execute("DELETE FROM estudo_diario")
+    conn.execute(
+        f"""
+        INSERT INTO estudo_diario (data, disciplina_id, minutos, sessoes)
+        {RECALCULO_DIARIO_SQL}
+    """
+    )
+
+
+def reconstruir_contadores(conn) -> int:
+    """Recalcula todos os contadores a partir das sessões registadas"""
+    with conn:
+        recalcular_contadores(conn)
+        recalcular_estudo_diario(conn)
+
+    return conn.execute("SELECT COUNT(*) FROM contadores_estudo").fetchone()[0]
+
+
+def verificar_contadores(conn) -> List[Dict]:
+    """Lista os contadores e totais diários que divergem das sessões registadas"""
+    conn.row_factory = sqlite3.Row
+
+    esperado = {r["disciplina_id"]: dict(r) for r in conn.execute(RECALCULO_SQL)}
+    atual = {
+        r["disciplina_id"]: dict(r)
+        for r in conn.execute(
+            """
+            SELECT disciplina_id, total_sessoes, total_minutos, ultimo_estudo
+            FROM contadores_estudo
+            WHERE total_sessoes != 0 OR total_minutos != 0
+        """
+        )
+    }
+
+    divergencias = []
+    for disc_id in sorted(set(esperado) | set(atual)):
+        if esperado.get(disc_id) != atual.get(disc_id):
+            divergencias.append(
+                {
+                    "disciplina_id": disc_id,
+                    "esperado": esperado.get(disc_id),
+                    "atual": atual.get(disc_id),
+                }
+            )
+
+    esperado_diario = {
+        (r["data"], r["disciplina_id"]): (r["minutos"], r["sessoes"])
+        for r in conn.execute(RECALCULO_DIARIO_SQL)
+    }
+    atual_diario = {
+        (r["data"], r["disciplina_id"]): (r["minutos"], r["sessoes"])
+        for r in conn.execute("SELECT data, disciplina_id, minutos, sessoes FROM estudo_diario")
+    }
+    for chave in sorted(set(esperado_diario) | set(atual_diario)):
+        if esperado_diario.get(chave) != atual_diario.get(chave):
+            divergencias.append(
+                {
+                    "disciplina_id": f"{chave[1]} em {chave[0]}",
+                    "esperado": esperado_diario.get(chave),
+                    "atual": atual_diario.get(chave),
+                }
+            )
+
+    return divergencias
+
+
+if __name__ == "__main__":
+    from migrations import aplicar_migracoes
+
+    conn = sqlite3.connect(DB_PATH)
+    aplicar_migracoes(conn)
+
+    if "--verificar" in sys.argv:
+        divergencias = verificar_contadores(conn)
+        if divergencias:
+            for d in divergencias:
+                print(f"❌ {d['disciplina_id']}: esperado {d['esperado']}, atual {d['atual']}")
+            conn.close()
+            sys.exit(1)
+        print("✅ Contadores consistentes com as sessões")
+    else:
+        total = reconstruir_contadores(conn)
+        print(f"✅ Contadores reconstruídos para {total} disciplinas")
+
+    conn.close()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pool de conexões SQLite partilhado por app.py e folder_sync.py
+Cada conexão é aberta uma vez em modo WAL com pragmas afinados e volta ao
+pool quando o código chama conn.close().
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict
+
+# Número de conexões livres mantidas abertas por base de dados
+TAMANHO_POOL = int(os.environ.get("SQLITE_POOL_SIZE", "8"))
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",  # ~16 MB de cache de páginas
+    "PRAGMA mmap_size = 67108864",  # 64 MB mapeados em memória
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+class ConexaoPool(sqlite3.Connection):
+    """Conexão SQLite cujo close() a devolve ao pool em vez de a fechar"""
+
+    pool = None
+    em_uso = False
+    # Incrementado a cada obter(): identifica o empréstimo atual
+    emprestimo = 0
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.devolver(self)
+        else:
+            super().close()
+
+    def devolver_emprestimo(self, emprestimo: int):
+        """Devolve a conexão só se ainda estiver no empréstimo indicado
+
+        Um fecho atrasado (ex.: no teardown do pedido) não devolve a conexão
+        que entretanto foi entregue a outro código.
+        """
+        if self.pool is not None:
+            self.pool.devolver(self, emprestimo)
+
+    def fechar_definitivamente(self):
+        """Fecha a conexão de facto"""
+        self.pool = None
+        super().close()
+
+
+class PoolConexoes:
+    """Pool de conexões para um ficheiro de base de dados"""
+
+    def __init__(self, db_path: Path, tamanho: int = TAMANHO_POOL):
+        self.db_path = str(db_path)
+        self.tamanho = tamanho
+        self._livres = queue.LifoQueue(maxsize=tamanho)
+        self._lock = threading.Lock()
+        self._emprestimos = 0
+
+    def _nova_conexao(self) -> ConexaoPool:
+        conn = sqlite3.connect(
+            self.db_path, factory=ConexaoPool, check_same_thread=False
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        conn.pool = self
+        return conn
+
+    def obter(self) -> ConexaoPool:
+        """Obtém uma conexão livre ou abre uma nova"""
+        try:
+            conn = self._livres.get_nowait()
+        except queue.Empty:
+            conn = self._nova_conexao()
+
+        conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._emprestimos += 1
+            conn.emprestimo = self._emprestimos
+            conn.em_uso = True
+        return conn
+
+    def devolver(self, conn: ConexaoPool, emprestimo: int = None):
+        """Devolve uma conexão ao pool, descartando transações pendentes
+
+        Com `emprestimo`, só devolve se a conexão ainda pertencer a esse
+        empréstimo (devolvida e reutilizada entretanto: não faz nada).
+        """
+        with self._lock:
+            if not conn.em_uso or (emprestimo is not None and conn.emprestimo != emprestimo):
+                return
+            conn.em_uso = False
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._livres.put_nowait(conn)
+        except (queue.Full, sqlite3.Error):
+            conn.fechar_definitivamente()
+
+    def fechar(self):
+        """Fecha todas as conexões livres"""
+        while True:
+            try:
+                self._livres.get_nowait().fechar_definitivamente()
+            except queue.Empty:
+                break
+
+
+_pools: Dict[str, PoolConexoes] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_para(db_path) -> PoolConexoes:
+    chave = os.path.abspath(str(db_path))
+    pool = _pools.get(chave)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(chave)
+            if pool is None:
+                pool = _pools[chave] = PoolConexoes(chave)
+    return pool
+
+
+def obter_conexao(db_path) -> ConexaoPool:
+    """Obtém uma conexão do pool da base de dados indicada"""
+    return _pool_para(db_path).obter()
+
+
+def fechar_pool(db_path):
+    """Fecha as conexões livres de uma base de dados e esquece o seu pool"""
+    chave = os.path.abspath(str(db_path))
+    with _pools_lock:
+        pool = _pools.pop(chave, None)
+    if pool:
+        pool.fechar()
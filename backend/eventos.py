@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Notificações de alterações via Server-Sent Events (/api/events)
+
+Os módulos publicam eventos (sessão criada, tarefa concluída, arquivo indexado,
+sincronização Moodle terminada) e cada cliente ligado recebe-os pela sua fila,
+em vez de fazer polling aos endpoints.
+"""
+
+import itertools
+import json
+import queue
+import threading
+from collections import deque
+from typing import Dict, Iterator, Optional
+
+# Eventos guardados para reenviar a clientes que se religam (Last-Event-ID)
+HISTORICO_MAXIMO = 100
+
+# Eventos pendentes por cliente; um cliente parado não bloqueia os outros
+FILA_MAXIMA = 100
+
+# Intervalo dos comentários keep-alive, em segundos
+INTERVALO_HEARTBEAT = 15
+
+
+class Broker:
+    """Distribui eventos publicados pelas filas dos clientes subscritos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._filas = set()
+        self._historico = deque(maxlen=HISTORICO_MAXIMO)
+
+    def publicar(self, tipo: str, dados: Optional[Dict] = None):
+        """Envia um evento a todos os clientes ligados"""
+        with self._lock:
+            evento = {"id": next(self._ids), "tipo": tipo, "dados": dados or {}}
+            self._historico.append(evento)
+            filas = list(self._filas)
+
+        for fila in filas:
+            try:
+                fila.put_nowait(evento)
+            except queue.Full:
+                pass
+
+    def subscrever(self, ultimo_id: Optional[int] = None) -> queue.Queue:
+        """Regista um cliente; reenvia o que perdeu desde ultimo_id"""
+        fila = queue.Queue(maxsize=FILA_MAXIMA)
+
+        with self._lock:
+            if ultimo_id is not None:
+                for evento in self._historico:
+                    if evento["id"] > ultimo_id:
+                        fila.put_nowait(evento)
+            self._filas.add(fila)
+
+        return fila
+
+    def cancelar(self, fila: queue.Queue):
+        """Remove um cliente"""
+        with self._lock:
+            self._filas.discard(fila)
+
+    @property
+    def total_clientes(self) -> int:
+        return len(self._filas)
+
+
+broker = Broker()
+
+
+def publicar(tipo: str, dados: Optional[Dict] = None):
+    """Publica um evento no broker global"""
+    broker.publicar(tipo, dados)
+
+
+def formatar_evento(evento: Dict) -> str:
+    """Formata um evento no protocolo text/event-stream"""
+    dados = json.dumps(evento["dados"], ensure_ascii=False, default=str)
+    return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {dados}\n\n"
+
+
+def stream_eventos(ultimo_id: Optional[int] = None) -> Iterator[str]:
+    """Gerador do corpo da resposta SSE de um cliente"""
+    fila = broker.subscrever(ultimo_id)
+
+    try:
+        # Indica ao EventSource o intervalo de religação
+        yield "retry: 5000\n\n"
+
+        while True:
+            try:
+                evento = fila.get(timeout=INTERVALO_HEARTBEAT)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+
+            yield formatar_evento(evento)
+    finally:
+        broker.cancelar(fila)
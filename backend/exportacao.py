@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Exportação e importação em streaming do histórico de estudo
+
+A exportação lê as tabelas em blocos (fetchmany) dentro de uma transação de
+leitura e vai emitindo NDJSON ou CSV, pelo que a memória usada não depende
+do tamanho do histórico. A importação lê NDJSON linha a linha, valida cada
+registo (colunas e tipos) e insere em blocos com executemany, tudo numa
+única transação: um erro a meio não deixa uma importação parcial.
+
+Formato NDJSON: uma linha por registo, {"tabela": "...", "dados": {...}}
+"""
+
+import csv
+import io
+import json
+import sqlite3
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence
+
+# Colunas exportadas por tabela (a primeira é sempre o id)
+TABELAS_EXPORTACAO = {
+    "sessoes_estudo": [
+        "id", "disciplina_id", "data", "hora_inicio", "hora_fim",
+        "duracao_minutos", "topico", "notas", "concluido", "created_at",
+    ],
+    "tarefas": [
+        "id", "disciplina_id", "titulo", "descricao", "tipo", "data_entrega",
+        "prioridade", "concluida", "created_at", "origem", "chave_origem",
+    ],
+    "progresso_topicos": [
+        "id", "disciplina_id", "topico_numero", "progresso_percentual", "ultima_atualizacao",
+    ],
+}
+
+# Colunas NOT NULL sem valor por omissão
+OBRIGATORIAS = {
+    "sessoes_estudo": ("disciplina_id", "data", "hora_inicio"),
+    "tarefas": ("disciplina_id", "titulo"),
+    "progresso_topicos": ("disciplina_id", "topico_numero"),
+}
+
+# Colunas que não são texto (as restantes aceitam só str ou null)
+INTEIRAS = {"id", "duracao_minutos", "topico_numero", "progresso_percentual", "prioridade"}
+BOOLEANAS = {"concluido", "concluida"}
+
+TAMANHO_BLOCO = 500
+
+# Número máximo de erros de validação devolvidos na resposta da importação
+MAXIMO_ERROS = 20
+
+
+class ErroExportacao(ValueError):
+    """Parâmetros de exportação ou importação inválidos (devolvido ao cliente como 400)"""
+
+
+def ler_tabelas(valor: str, formato: str) -> List[str]:
+    """Lê o parâmetro tables (separado por vírgulas) e valida-o para o formato"""
+    tabelas = [t.strip() for t in (valor or "").split(",") if t.strip()]
+    if not tabelas:
+        tabelas = list(TABELAS_EXPORTACAO)
+
+    invalidas = [t for t in tabelas if t not in TABELAS_EXPORTACAO]
+    if invalidas:
+        raise ErroExportacao(f"Tabelas inválidas: {', '.join(invalidas)}")
+    if formato == "csv" and len(tabelas) != 1:
+        raise ErroExportacao("O formato csv exporta uma tabela de cada vez (parâmetro tables)")
+
+    return tabelas
+
+
+def _ler_blocos(conn, tabela: str) -> Iterator[List]:
+    colunas = TABELAS_EXPORTACAO[tabela]
+    cursor = conn.execute(f"SELECT {', '.join(colunas)} FROM {tabela} ORDER BY id")
+    while True:
+        linhas = cursor.fetchmany(TAMANHO_BLOCO)
+        if not linhas:
+            break
+        yield linhas
+
+
+def exportar(obter_conexao: Callable, tabelas: Sequence[str], formato: str) -> Iterator[str]:
+    """Gerador do corpo da exportação
+
+    A conexão é obtida dentro do gerador (o corpo é enviado depois de o pedido
+    terminar) e todas as tabelas são lidas na mesma transação, para o
+    conjunto exportado ser consistente.
+    """
+    conn = obter_conexao()
+    try:
+        conn.execute("BEGIN")
+
+        for tabela in tabelas:
+            colunas = TABELAS_EXPORTACAO[tabela]
+
+            if formato == "csv":
+                buffer = io.StringIO()
+                escritor = csv.writer(buffer)
+                escritor.writerow(colunas)
+                for linhas in _ler_blocos(conn, tabela):
+                    escritor.writerows(tuple(linha) for linha in linhas)
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                yield buffer.getvalue()
+            else:
+                for linhas in _ler_blocos(conn, tabela):
+                    yield "".join(
+                        json.dumps({"tabela": tabela, "dados": dict(zip(colunas, linha))},
+                                   ensure_ascii=False) + "\n"
+                        for linha in linhas
+                    )
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def _validar(registo) -> str:
+    if not isinstance(registo, dict) or not isinstance(registo.get("dados"), dict):
+        return "Registo deve ser {\"tabela\": ..., \"dados\": {...}}"
+
+    tabela = registo.get("tabela")
+    if tabela not in TABELAS_EXPORTACAO:
+        return f"Tabela inválida: {tabela}"
+
+    dados = registo["dados"]
+    desconhecidas = set(dados) - set(TABELAS_EXPORTACAO[tabela])
+    if desconhecidas:
+        return f"Colunas inválidas: {', '.join(sorted(desconhecidas))}"
+
+    for coluna in OBRIGATORIAS[tabela]:
+        if dados.get(coluna) is None:
+            return f"Campo '{coluna}' obrigatório"
+
+    for coluna, valor in dados.items():
+        if valor is None:
+            continue
+        if coluna in BOOLEANAS:
+            if not isinstance(valor, (bool, int)):
+                return f"Campo '{coluna}' deve ser booleano"
+        elif coluna in INTEIRAS:
+            if not isinstance(valor, int) or isinstance(valor, bool) or not -2**63 <= valor < 2**63:
+                return f"Campo '{coluna}' deve ser inteiro"
+        elif not isinstance(valor, str):
+            return f"Campo '{coluna}' deve ser texto"
+
+    return ""
+
+
+def _conflitos(conn, tabela: str, colunas: Sequence[str], registos: List) -> List[Dict]:
+    """Registos com id que ficaram na base de dados com outros dados
+
+    Chamado depois do INSERT ... ON CONFLICT DO NOTHING: um registo com id cujo
+    conteúdo guardado é diferente do importado não foi importado (o id, ou uma
+    chave única, já pertencia a outro registo).
+    """
+    if "id" not in colunas:
+        return []
+
+    posicao_id = colunas.index("id")
+    guardados = dict(
+        (linha[0], tuple(linha[1:]))
+        for linha in conn.execute(
+            f"SELECT id, {', '.join(colunas)} FROM {tabela} "
+            f"WHERE id IN ({', '.join('?' for _ in registos)})",
+            [valores[posicao_id] for _, valores in registos],
+        )
+    )
+    return [
+        {"linha": numero, "tabela": tabela, "id": valores[posicao_id]}
+        for numero, valores in registos
+        if guardados.get(valores[posicao_id]) != valores
+    ]
+
+
+def importar(conn, linhas: Iterable[bytes]) -> Dict:
+    """Importa registos NDJSON em blocos de TAMANHO_BLOCO, numa só transação
+
+    Registos cujo id (ou chave única) já existe não são importados: se os
+    dados forem iguais contam só em "ignorados" (reimportar o mesmo ficheiro
+    não cria duplicados); se forem diferentes são também listados em
+    "conflitos". Um erro da base de dados desfaz toda a importação
+    (ErroExportacao).
+    """
+    importados = defaultdict(int)
+    ignorados = 0
+    erros = []
+    total_erros = 0
+    conflitos = []
+    total_conflitos = 0
+
+    # (tabela, colunas) -> (linha, valores), para um executemany por forma de registo
+    pendentes = defaultdict(list)
+    total_pendentes = 0
+
+    def gravar():
+        nonlocal ignorados, total_conflitos
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+
+        for (tabela, colunas), registos in pendentes.items():
+            cursor = conn.executemany(
+                f"INSERT INTO {tabela} ({', '.join(colunas)}) "
+                f"VALUES ({', '.join('?' for _ in colunas)}) ON CONFLICT DO NOTHING",
+                [valores for _, valores in registos],
+            )
+            importados[tabela] += cursor.rowcount
+            if cursor.rowcount < len(registos):
+                ignorados += len(registos) - cursor.rowcount
+                diferentes = _conflitos(conn, tabela, colunas, registos)
+                total_conflitos += len(diferentes)
+                conflitos.extend(diferentes[: MAXIMO_ERROS - len(conflitos)])
+        pendentes.clear()
+
+    try:
+        for numero, linha in enumerate(linhas, start=1):
+            if not linha.strip():
+                continue
+
+            try:
+                registo = json.loads(linha)
+                erro = _validar(registo)
+            except ValueError:
+                erro = "JSON inválido"
+
+            if erro:
+                total_erros += 1
+                if len(erros) < MAXIMO_ERROS:
+                    erros.append({"linha": numero, "error": erro})
+                continue
+
+            colunas = tuple(sorted(registo["dados"]))
+            pendentes[(registo["tabela"], colunas)].append(
+                (numero, tuple(registo["dados"][c] for c in colunas))
+            )
+            total_pendentes += 1
+
+            if total_pendentes >= TAMANHO_BLOCO:
+                gravar()
+                total_pendentes = 0
+
+        if pendentes:
+            gravar()
+        conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback()
+        raise ErroExportacao(f"Importação cancelada, nenhum registo importado: {e}")
+    except BaseException:
+        conn.rollback()
+        raise
+
+    return {
+        "importados": {tabela: n for tabela, n in importados.items() if n},
+        "ignorados": ignorados,
+        "total_conflitos": total_conflitos,
+        "conflitos": conflitos,
+        "total_erros": total_erros,
+        "erros": erros,
+    }
@@ -19,6 +19,10 @@ from watchdog.events import FileSystemEventHandler
 import threading
 import time
 
+from database import obter_conexao
+from eventos import publicar
+from versoes import sql_versionamento
+
 class DisciplineFolderHandler(FileSystemEventHandler):
     """Handler para monitorar mudanças nas pastas das disciplinas"""
     
@@ -41,7 +45,7 @@ class DisciplineFolderHandler(FileSystemEventHandler):
     
     def _index_file(self, file_path, action):
         """Indexa um arquivo no banco de dados"""
-        conn = sqlite3.connect(self.db_path)
+        conn = obter_conexao(self.db_path)
         cursor = conn.cursor()
         
         file_path = Path(file_path)
@@ -71,10 +75,15 @@ class DisciplineFolderHandler(FileSystemEventHandler):
         conn.close()
         
         print(f"📁 {action.capitalize()}: {file_path.name} para {self.disciplina_id}")
+        publicar("arquivo_indexado", {
+            "disciplina_id": self.disciplina_id,
+            "arquivo": file_path.name,
+            "acao": action,
+        })
     
     def _remove_file(self, file_path):
         """Remove um arquivo do índice"""
-        conn = sqlite3.connect(self.db_path)
+        conn = obter_conexao(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -86,6 +95,10 @@ class DisciplineFolderHandler(FileSystemEventHandler):
         conn.close()
         
         print(f"🗑️ Removido: {Path(file_path).name}")
+        publicar("arquivo_removido", {
+            "disciplina_id": self.disciplina_id,
+            "arquivo": Path(file_path).name,
+        })
     
     def _calculate_file_hash(self, file_path):
         """Calcula o hash SHA256 de um arquivo"""
@@ -110,7 +123,7 @@ class FolderSyncManager:
         
     def init_db(self):
         """Inicializa as tabelas do banco de dados"""
-        conn = sqlite3.connect(self.db_path)
+        conn = obter_conexao(self.db_path)
         cursor = conn.cursor()
         
         # Tabela de mapeamento disciplina -> pasta
@@ -157,11 +170,15 @@ class FolderSyncManager:
         """)
         
         conn.commit()
+        
+        # Versões para os ETags de /api/folders/stats
+        conn.executescript(sql_versionamento(("mapeamento_pastas", "arquivos_disciplinas")))
+        
         conn.close()
     
     def load_mappings(self):
         """Carrega os mapeamentos do banco de dados"""
-        conn = sqlite3.connect(self.db_path)
+        conn = obter_conexao(self.db_path)
         cursor = conn.cursor()
         
         mappings = cursor.execute("""
@@ -178,13 +195,13 @@ class FolderSyncManager:
     
     def add_mapping(self, disciplina_id, disciplina_nome, folder_path):
         """Adiciona um novo mapeamento disciplina -> pasta"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # Verificar se a pasta existe
         if not os.path.exists(folder_path):
             return {"success": False, "error": "Pasta não encontrada"}
         
+        conn = obter_conexao(self.db_path)
+        cursor = conn.cursor()
+        
         try:
             cursor.execute("""
                 INSERT OR REPLACE INTO mapeamento_pastas 
@@ -207,7 +224,7 @@ class FolderSyncManager:
     
     def remove_mapping(self, disciplina_id):
         """Remove um mapeamento"""
-        conn = sqlite3.connect(self.db_path)
+        conn = obter_conexao(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -228,11 +245,13 @@ class FolderSyncManager:
         # Parar monitoramento
         self.stop_monitoring(disciplina_id)
         
+        publicar("mapeamento_removido", {"disciplina_id": disciplina_id})
+        
         return {"success": True, "message": "Mapeamento removido"}
     
     def get_mappings(self):
         """Retorna todos os mapeamentos ativos"""
-        conn = sqlite3.connect(self.db_path)
+        conn = obter_conexao(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -253,7 +272,7 @@ class FolderSyncManager:
     
     def get_files(self, disciplina_id):
         """Retorna arquivos de uma disciplina"""
-        conn = sqlite3.connect(self.db_path)
+        conn = obter_conexao(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -274,7 +293,7 @@ class FolderSyncManager:
         if not folder_path.exists():
             return {"success": False, "error": "Pasta não encontrada"}
         
-        conn = sqlite3.connect(self.db_path)
+        conn = obter_conexao(self.db_path)
         cursor = conn.cursor()
         
         files_indexed = 0
@@ -321,6 +340,11 @@ class FolderSyncManager:
         conn.commit()
         conn.close()
         
+        publicar("pasta_sincronizada", {
+            "disciplina_id": disciplina_id,
+            "files_indexed": files_indexed,
+        })
+        
         return {"success": True, "files_indexed": files_indexed}
     
     def start_monitoring(self, disciplina_id, folder_path):
@@ -354,7 +378,7 @@ class FolderSyncManager:
     
     def search_files(self, query, disciplina_id=None):
         """Busca arquivos"""
-        conn = sqlite3.connect(self.db_path)
+        conn = obter_conexao(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -379,7 +403,7 @@ class FolderSyncManager:
     
     def get_stats(self):
         """Retorna estatísticas gerais"""
-        conn = sqlite3.connect(self.db_path)
+        conn = obter_conexao(self.db_path)
         cursor = conn.cursor()
         
         stats = {}
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Execução de jobs em segundo plano (sincronização Moodle)
+
+Um job é submetido e corre numa thread própria; a rota que o cria responde
+logo com o id e o cliente acompanha o estado, as etapas (progresso e
+duração) e o resultado em /api/jobs/<id>. Só há um job ativo de cada tipo:
+submeter outro enquanto o primeiro corre devolve o que já está em curso.
+
+Os jobs periódicos usam o BackgroundScheduler do APScheduler quando está
+instalado, e uma thread com temporizador caso contrário.
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+try:
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    APSCHEDULER_AVAILABLE = True
+except ImportError:
+    APSCHEDULER_AVAILABLE = False
+
+# Jobs terminados guardados para consulta
+HISTORICO_JOBS = 50
+
+ESTADOS_ATIVOS = ("pendente", "em_execucao")
+
+
+def _agora() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class Job:
+    """Estado de um job: etapas com progresso e tempos, resultado ou erro"""
+
+    def __init__(self, tipo: str):
+        self.id = uuid.uuid4().hex
+        self.tipo = tipo
+        self.estado = "pendente"
+        self.criado_em = _agora()
+        self.iniciado_em: Optional[str] = None
+        self.terminado_em: Optional[str] = None
+        self.resultado = None
+        self.erro: Optional[str] = None
+        self._etapas: "OrderedDict[str, Dict]" = OrderedDict()
+        self._inicio = None
+        self._duracao = None
+        self._lock = threading.Lock()
+
+    def progresso(self, etapa: str, feitos: int, total: Optional[int] = None):
+        """Regista o avanço de uma etapa (pode ser chamado de várias threads)"""
+        with self._lock:
+            info = self._etapas.get(etapa)
+            if info is None:
+                info = self._etapas[etapa] = {
+                    "nome": etapa,
+                    "feitos": 0,
+                    "total": total,
+                    "inicio": time.perf_counter(),
+                    "duracao": None,
+                }
+
+            # Callbacks de threads diferentes podem chegar fora de ordem
+            info["feitos"] = max(info["feitos"], feitos)
+            if total is not None:
+                info["total"] = total
+            if info["total"] is not None and info["feitos"] >= info["total"] and info["duracao"] is None:
+                info["duracao"] = round(time.perf_counter() - info["inicio"], 3)
+
+    def para_dict(self) -> Dict:
+        with self._lock:
+            etapas = []
+            for info in self._etapas.values():
+                duracao = info["duracao"]
+                etapas.append(
+                    {
+                        "nome": info["nome"],
+                        "feitos": info["feitos"],
+                        "total": info["total"],
+                        "concluida": duracao is not None,
+                        "duracao": duracao if duracao is not None
+                        else round(time.perf_counter() - info["inicio"], 3),
+                    }
+                )
+
+        duracao = self._duracao
+        if duracao is None and self._inicio is not None:
+            duracao = round(time.perf_counter() - self._inicio, 3)
+
+        return {
+            "id": self.id,
+            "tipo": self.tipo,
+            "estado": self.estado,
+            "criado_em": self.criado_em,
+            "iniciado_em": self.iniciado_em,
+            "terminado_em": self.terminado_em,
+            "duracao": duracao,
+            "etapas": etapas,
+            "resultado": self.resultado,
+            "erro": self.erro,
+        }
+
+    def _executar(self, funcao: Callable, ao_terminar: Callable):
+        self.estado = "em_execucao"
+        self.iniciado_em = _agora()
+        self._inicio = time.perf_counter()
+
+        try:
+            self.resultado = funcao(self)
+            self.estado = "concluido"
+        except Exception as e:
+            traceback.print_exc()
+            self.erro = str(e)
+            self.estado = "erro"
+        finally:
+            self._duracao = round(time.perf_counter() - self._inicio, 3)
+            self.terminado_em = _agora()
+            ao_terminar(self)
+
+
+class GestorJobs:
+    """Submete jobs em threads e agenda execuções periódicas"""
+
+    def __init__(self, historico: int = HISTORICO_JOBS):
+        self.historico = historico
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._ativos: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._scheduler = None
+        self._timers: List[threading.Event] = []
+
+    def submeter(self, tipo: str, funcao: Callable[[Job], object]):
+        """Inicia funcao(job) em segundo plano
+
+        Returns:
+            (Job, bool): o job e se foi criado agora (False se já havia um
+            job do mesmo tipo em curso, que é devolvido em vez de outro)
+        """
+        with self._lock:
+            ativo = self._ativos.get(tipo)
+            if ativo is not None:
+                return ativo, False
+
+            job = Job(tipo)
+            self._ativos[tipo] = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.historico:
+                antigo = next(iter(self._jobs))
+                if self._jobs[antigo].estado in ESTADOS_ATIVOS:
+                    break
+                del self._jobs[antigo]
+
+        threading.Thread(
+            target=job._executar, args=(funcao, self._terminou), name=f"job-{tipo}", daemon=True
+        ).start()
+        return job, True
+
+    def _terminou(self, job: Job):
+        with self._lock:
+            if self._ativos.get(job.tipo) is job:
+                del self._ativos[job.tipo]
+
+    def obter(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def listar(self) -> List[Job]:
+        """Jobs conhecidos, do mais recente para o mais antigo"""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def agendar(self, nome: str, funcao: Callable[[], None], minutos: float):
+        """Executa funcao() a cada `minutos` (a funcao normalmente chama submeter)"""
+        if APSCHEDULER_AVAILABLE:
+            if self._scheduler is None:
+                self._scheduler = BackgroundScheduler(daemon=True)
+                self._scheduler.start()
+            self._scheduler.add_job(
+                funcao, "interval", minutes=minutos, id=nome, replace_existing=True,
+                max_instances=1, coalesce=True,
+            )
+            return
+
+        parar = threading.Event()
+        self._timers.append(parar)
+
+        def ciclo():
+            while not parar.wait(minutos * 60):
+                try:
+                    funcao()
+                except Exception:
+                    traceback.print_exc()
+
+        threading.Thread(target=ciclo, name=f"agenda-{nome}", daemon=True).start()
+
+    def parar(self):
+        """Cancela as execuções periódicas"""
+        if self._scheduler is not None:
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+        for parar in self._timers:
+            parar.set()
+        self._timers.clear()
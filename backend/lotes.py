@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Escritas em lote de sessões, tarefas e progresso de tópicos
+
+Cada lote é validado item a item; os itens válidos são gravados com
+executemany numa única transação e o resultado de cada item é devolvido
+pela mesma ordem do pedido.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Número máximo de itens aceites por pedido
+TAMANHO_MAXIMO_LOTE = 5000
+
+# Campos que podem ser alterados via PATCH /api/tarefas/batch
+CAMPOS_TAREFA = ("titulo", "descricao", "tipo", "data_entrega", "prioridade", "concluida")
+
+
+class ErroLote(ValueError):
+    """Corpo do pedido em lote inválido (devolvido ao cliente como 400)"""
+
+
+def ler_lote(dados, chave: str) -> List:
+    """Aceita uma lista ou um objeto {chave: lista} e valida o tamanho"""
+    if isinstance(dados, dict):
+        dados = dados.get(chave)
+
+    if not isinstance(dados, list):
+        raise ErroLote(f"Esperada uma lista de itens (ou {{'{chave}': [...]}})")
+    if len(dados) > TAMANHO_MAXIMO_LOTE:
+        raise ErroLote(f"Lote excede o máximo de {TAMANHO_MAXIMO_LOTE} itens")
+
+    return dados
+
+
+def _validar_formato(valor, formato: str, campo: str) -> Optional[str]:
+    if valor is None:
+        return None
+    try:
+        datetime.strptime(str(valor), formato)
+    except ValueError:
+        return f"Campo '{campo}' inválido"
+    return None
+
+
+def _erro(indice: int, mensagem: str) -> Dict:
+    return {"index": indice, "success": False, "error": mensagem}
+
+
+def _validar_sessao(item) -> Optional[str]:
+    if not isinstance(item, dict):
+        return "Item deve ser um objeto"
+    for campo in ("disciplina_id", "data", "hora_inicio"):
+        if not item.get(campo):
+            return f"Campo '{campo}' obrigatório"
+
+    duracao = item.get("duracao_minutos")
+    if duracao is not None and (not isinstance(duracao, int) or duracao < 0):
+        return "Campo 'duracao_minutos' inválido"
+
+    return (
+        _validar_formato(item.get("data"), "%Y-%m-%d", "data")
+        or _validar_formato(item.get("hora_inicio"), "%H:%M", "hora_inicio")
+        or _validar_formato(item.get("hora_fim"), "%H:%M", "hora_fim")
+    )
+
+
+def inserir_sessoes(conn, itens: List) -> List[Dict]:
+    """Insere sessões de estudo em lote; devolve o id de cada sessão criada"""
+    resultados: List[Optional[Dict]] = [None] * len(itens)
+    validos: List[Tuple[int, tuple]] = []
+
+    for i, item in enumerate(itens):
+        erro = _validar_sessao(item)
+        if erro:
+            resultados[i] = _erro(i, erro)
+            continue
+
+        validos.append(
+            (
+                i,
+                (
+                    item["disciplina_id"],
+                    item["data"],
+                    item["hora_inicio"],
+                    item.get("hora_fim"),
+                    item.get("duracao_minutos"),
+                    item.get("topico"),
+                    item.get("notas"),
+                    item.get("concluido", False),
+                ),
+            )
+        )
+
+    if validos:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                """
+                INSERT INTO sessoes_estudo
+                (disciplina_id, data, hora_inicio, hora_fim, duracao_minutos, topico, notas, concluido)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                [linha for _, linha in validos],
+            )
+            # Com a escrita bloqueada, os ids AUTOINCREMENT do lote são consecutivos
+            ultimo_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        primeiro_id = ultimo_id - len(validos) + 1
+        for n, (i, _) in enumerate(validos):
+            resultados[i] = {"index": i, "success": True, "id": primeiro_id + n}
+
+    return resultados
+
+
+def atualizar_tarefas(conn, itens: List) -> List[Dict]:
+    """Aplica alterações parciais a tarefas em lote (só os campos enviados)"""
+    resultados: List[Optional[Dict]] = [None] * len(itens)
+    candidatos = []
+
+    for i, item in enumerate(itens):
+        if not isinstance(item, dict) or not isinstance(item.get("id"), int):
+            resultados[i] = _erro(i, "Campo 'id' obrigatório")
+            continue
+
+        campos = tuple(c for c in CAMPOS_TAREFA if c in item)
+        desconhecidos = set(item) - set(CAMPOS_TAREFA) - {"id"}
+        if desconhecidos:
+            resultados[i] = _erro(i, f"Campos inválidos: {', '.join(sorted(desconhecidos))}")
+        elif not campos:
+            resultados[i] = _erro(i, "Nenhum campo para atualizar")
+        elif "titulo" in campos and not item["titulo"]:
+            resultados[i] = _erro(i, "Campo 'titulo' não pode ser vazio")
+        elif "data_entrega" in campos and _validar_formato(item["data_entrega"], "%Y-%m-%d", "data_entrega"):
+            resultados[i] = _erro(i, "Campo 'data_entrega' inválido")
+        else:
+            candidatos.append((i, item, campos))
+
+    if not candidatos:
+        return resultados
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        ids = [item["id"] for _, item, _ in candidatos]
+        existentes = set()
+        # Consultar em blocos para respeitar o limite de parâmetros do SQLite
+        for inicio in range(0, len(ids), 500):
+            bloco = ids[inicio:inicio + 500]
+            marcadores = ", ".join("?" for _ in bloco)
+            existentes.update(
+                r[0] for r in conn.execute(f"SELECT id FROM tarefas WHERE id IN ({marcadores})", bloco)
+            )
+
+        # Um executemany por conjunto de campos alterados
+        grupos = defaultdict(list)
+        for i, item, campos in candidatos:
+            if item["id"] not in existentes:
+                resultados[i] = _erro(i, "Tarefa não encontrada")
+                continue
+            grupos[campos].append(tuple(item[c] for c in campos) + (item["id"],))
+            resultados[i] = {"index": i, "success": True, "id": item["id"]}
+
+        for campos, linhas in grupos.items():
+            atribuicoes = ", ".join(f"{c} = ?" for c in campos)
+            conn.executemany(f"UPDATE tarefas SET {atribuicoes} WHERE id = ?", linhas)
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return resultados
+
+
+def atualizar_progresso(conn, itens: List) -> List[Dict]:
+    """Grava o progresso de vários tópicos em lote"""
+    resultados: List[Optional[Dict]] = [None] * len(itens)
+    validos = []
+
+    for i, item in enumerate(itens):
+        if not isinstance(item, dict) or not item.get("disciplina_id"):
+            resultados[i] = _erro(i, "Campo 'disciplina_id' obrigatório")
+            continue
+
+        topico = item.get("topico_numero")
+        progresso = item.get("progresso_percentual", 0)
+        if not isinstance(topico, int):
+            resultados[i] = _erro(i, "Campo 'topico_numero' obrigatório")
+        elif not isinstance(progresso, (int, float)) or not 0 <= progresso <= 100:
+            resultados[i] = _erro(i, "Campo 'progresso_percentual' deve estar entre 0 e 100")
+        else:
+            validos.append((item["disciplina_id"], topico, progresso, progresso))
+            resultados[i] = {"index": i, "success": True}
+
+    if validos:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                """
+                INSERT INTO progresso_topicos (disciplina_id, topico_numero, progresso_percentual)
+                VALUES (?, ?, ?)
+                ON CONFLICT(disciplina_id, topico_numero)
+                DO UPDATE SET progresso_percentual = ?, ultima_atualizacao = CURRENT_TIMESTAMP
+            """,
+                validos,
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    return resultados
+
+
+def resumo(resultados: List[Dict]) -> Dict:
+    """Corpo da resposta de um pedido em lote"""
+    ok = sum(1 for r in resultados if r["success"])
+    return {"results": resultados, "ok": ok, "errors": len(resultados) - ok}
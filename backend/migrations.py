@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Migrações versionadas do esquema de estudos.db
+
+Cada migração tem um número de versão, uma descrição e um passo (SQL ou
+função que recebe a conexão). As migrações pendentes são aplicadas por
+ordem, cada uma numa transação, e registadas em schema_version.
+
+Uso:
+    python migrations.py           # aplica migrações pendentes
+    python migrations.py --estado  # mostra a versão atual e as pendentes
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Union
+
+from contadores import (
+    SCHEMA_CONTADORES,
+    SCHEMA_ESTUDO_DIARIO,
+    recalcular_contadores,
+    recalcular_estudo_diario,
+)
+from moodle_state import sql_forum_cursors, sql_moodle_state
+from versoes import sql_versionamento
+
+DB_PATH = Path(__file__).parent.parent / "data" / "estudos.db"
+
+
+class Migracao(NamedTuple):
+    versao: int
+    descricao: str
+    passo: Union[str, Callable]
+
+
+def executar_script(conn, sql: str):
+    """Executa um script SQL instrução a instrução na transação atual
+
+    Ao contrário de executescript(), não faz COMMIT implícito, pelo que a
+    migração inteira pode ser revertida em caso de erro.
+    """
+    instrucao = ""
+    for linha in sql.splitlines(keepends=True):
+        instrucao += linha
+        if sqlite3.complete_statement(instrucao):
+            conn.execute(instrucao)
+            instrucao = ""
+
+    if instrucao.strip():
+        conn.execute(instrucao)
+
+
+def _v2_contadores(conn):
+    executar_script(conn, SCHEMA_CONTADORES)
+    recalcular_contadores(conn)
+
+
+def _v6_origem_tarefas(conn):
+    """Chave natural das tarefas geradas a partir do calendário
+
+    As tarefas já criadas por /api/inicializar-tarefas são identificadas pelo
+    título que essa rota gerava; se houver duplicados, só a primeira recebe a
+    chave, para o índice único poder ser criado.
+    """
+    conn.execute("ALTER TABLE tarefas ADD COLUMN origem TEXT")
+    conn.execute("ALTER TABLE tarefas ADD COLUMN chave_origem TEXT")
+
+    vistas = set()
+    chaves = []
+    for tarefa_id, disciplina_id, titulo, tipo in conn.execute("""
+        SELECT id, disciplina_id, titulo, tipo FROM tarefas
+        WHERE tipo IN ('e-folio', 'sessao-sincrona') ORDER BY id
+    """).fetchall():
+        partes = titulo.split(" - ")
+        if tipo == "e-folio" and len(partes) >= 2:
+            chave = "e-folio:" + " - ".join(partes[:-1])
+        elif tipo == "sessao-sincrona" and len(partes) >= 3:
+            chave = "sessao-sincrona:" + " - ".join(partes[2:])
+        else:
+            continue
+
+        if (disciplina_id, chave) not in vistas:
+            vistas.add((disciplina_id, chave))
+            chaves.append((chave, tarefa_id))
+
+    conn.executemany(
+        "UPDATE tarefas SET origem = 'calendario', chave_origem = ? WHERE id = ?", chaves
+    )
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_tarefas_origem
+            ON tarefas (origem, disciplina_id, chave_origem)
+    """)
+
+
+def _v7_estudo_diario(conn):
+    executar_script(conn, SCHEMA_ESTUDO_DIARIO)
+    recalcular_estudo_diario(conn)
+
+
+MIGRACOES: List[Migracao] = [
+    Migracao(1, "Tabelas base de estudo", """
+        CREATE TABLE IF NOT EXISTS sessoes_estudo (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            disciplina_id TEXT NOT NULL,
+            data DATE NOT NULL,
+            hora_inicio TIME NOT NULL,
+            hora_fim TIME,
+            duracao_minutos INTEGER,
+            topico TEXT,
+            notas TEXT,
+            concluido BOOLEAN DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS progresso_topicos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            disciplina_id TEXT NOT NULL,
+            topico_numero INTEGER NOT NULL,
+            progresso_percentual INTEGER DEFAULT 0,
+            ultima_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(disciplina_id, topico_numero)
+        );
+
+        CREATE TABLE IF NOT EXISTS tarefas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            disciplina_id TEXT NOT NULL,
+            titulo TEXT NOT NULL,
+            descricao TEXT,
+            tipo TEXT,
+            data_entrega DATE,
+            prioridade INTEGER DEFAULT 2,
+            concluida BOOLEAN DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS metas_diarias (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data DATE NOT NULL UNIQUE,
+            meta_horas REAL DEFAULT 3.0,
+            horas_estudadas REAL DEFAULT 0.0,
+            disciplinas_estudadas TEXT,
+            notas TEXT
+        );
+    """),
+    Migracao(2, "Contadores de estudo por disciplina", _v2_contadores),
+    Migracao(3, "Índices das consultas do dashboard, listagens e paginação por chave", """
+        CREATE INDEX IF NOT EXISTS idx_sessoes_disciplina_data_hora
+            ON sessoes_estudo (disciplina_id, data, hora_inicio);
+
+        CREATE INDEX IF NOT EXISTS idx_sessoes_data_hora
+            ON sessoes_estudo (data, hora_inicio);
+
+        CREATE INDEX IF NOT EXISTS idx_tarefas_concluida_entrega
+            ON tarefas (concluida, data_entrega);
+
+        CREATE INDEX IF NOT EXISTS idx_tarefas_disciplina_tipo
+            ON tarefas (disciplina_id, tipo);
+
+        CREATE INDEX IF NOT EXISTS idx_tarefas_entrega_prioridade
+            ON tarefas (data_entrega, prioridade);
+
+        CREATE INDEX IF NOT EXISTS idx_tarefas_keyset
+            ON tarefas (COALESCE(data_entrega, ''), COALESCE(prioridade, 0) DESC, id);
+    """),
+    # 4: índices de paginação por chave, fundidos na 3 (as versões não são reutilizadas)
+    Migracao(5, "Versões de dados para ETags", sql_versionamento(
+        ("sessoes_estudo", "tarefas", "progresso_topicos")
+    )),
+    Migracao(6, "Chave natural das tarefas geradas do calendário", _v6_origem_tarefas),
+    Migracao(7, "Totais diários de estudo por disciplina", _v7_estudo_diario),
+    Migracao(8, "Estado persistente da sincronização com o Moodle", sql_moodle_state()),
+    Migracao(9, "Cursores incrementais dos fóruns do Moodle", sql_forum_cursors()),
+]
+
+
+def versao_atual(conn) -> int:
+    """Versão do esquema registada na base de dados"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            versao INTEGER PRIMARY KEY,
+            descricao TEXT,
+            aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+    return conn.execute("SELECT COALESCE(MAX(versao), 0) FROM schema_version").fetchone()[0]
+
+
+def migracoes_pendentes(conn) -> List[Migracao]:
+    """Migrações ainda não aplicadas, por ordem de versão"""
+    atual = versao_atual(conn)
+    return [m for m in sorted(MIGRACOES, key=lambda m: m.versao) if m.versao > atual]
+
+
+def aplicar_migracoes(conn) -> List[int]:
+    """Aplica as migrações pendentes e devolve as versões aplicadas"""
+    aplicadas = []
+
+    for migracao in migracoes_pendentes(conn):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+
+            # Outro processo pode ter aplicado a migração entretanto
+            if conn.execute(
+                "SELECT 1 FROM schema_version WHERE versao = ?", (migracao.versao,)
+            ).fetchone():
+                conn.rollback()
+                continue
+
+            if callable(migracao.passo):
+                migracao.passo(conn)
+            else:
+                executar_script(conn, migracao.passo)
+            conn.execute(
+                "INSERT INTO schema_version (versao, descricao) VALUES (?, ?)",
+                (migracao.versao, migracao.descricao),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            print(f"❌ Falha na migração {migracao.versao}: {migracao.descricao}")
+            raise
+
+        aplicadas.append(migracao.versao)
+        print(f"🗄️  Migração {migracao.versao} aplicada: {migracao.descricao}")
+
+    return aplicadas
+
+
+if __name__ == "__main__":
+    conn = sqlite3.connect(DB_PATH)
+
+    if "--estado" in sys.argv:
+        print(f"Versão atual do esquema: {versao_atual(conn)}")
+        for m in migracoes_pendentes(conn):
+            print(f"  pendente {m.versao}: {m.descricao}")
+    else:
+        aplicadas = aplicar_migracoes(conn)
+        if not aplicadas:
+            print("✅ Esquema já está atualizado")
+
+    conn.close()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Backend opcional de automação do navegador (Selenium) para o Moodle UAB
+O selenium e o webdriver_manager só são importados quando este caminho é
+usado: o MoodleUAB (requests) e a API não dependem deles. O login pelo CAS
+corre num Chrome headless e os cookies passam para a sessão requests, pelo
+que o scraping continua a usar o mesmo caminho rápido do MoodleUAB.
+
+Os navegadores ficam num DriverPool limitado: são reutilizados entre
+logins (sem novo arranque do Chrome), verificados antes de cada uso e
+fechados depois de BROWSER_IDLE_TIMEOUT segundos sem uso. O caminho do
+chromedriver é resolvido uma única vez por processo.
+"""
+
+import importlib.util
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from moodle_integration import MoodleUAB
+
+MOODLE_URL = "https://elearning.uab.pt"
+CAS_LOGIN_URL = os.getenv(
+    "MOODLE_CAS_LOGIN_URL",
+    "https://cas2.uab.pt/cas/login?service=https%3A%2F%2Felearning.uab.pt%2Flogin%2Findex.php",
+)
+
+# Espera máxima (segundos) por cada elemento da página
+WAIT_SECONDS = 10
+
+# Navegadores abertos em simultâneo e segundos sem uso até serem fechados
+BROWSER_POOL_SIZE = int(os.getenv("MOODLE_BROWSER_POOL_SIZE", "2"))
+BROWSER_IDLE_TIMEOUT = float(os.getenv("MOODLE_BROWSER_IDLE_TIMEOUT", "300"))
+
+
+class BrowserUnavailable(RuntimeError):
+    """Selenium ou webdriver_manager não estão instalados"""
+
+
+def selenium_available() -> bool:
+    """Indica se o backend pode ser usado, sem importar o selenium"""
+    return all(importlib.util.find_spec(name) is not None for name in ("selenium", "webdriver_manager"))
+
+
+_driver_path: Optional[str] = None
+_driver_path_lock = threading.Lock()
+
+
+def chromedriver_path() -> str:
+    """Caminho do chromedriver (CHROMEDRIVER_PATH ou webdriver_manager, resolvido uma vez)"""
+    global _driver_path
+
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = os.getenv("CHROMEDRIVER_PATH")
+            if not _driver_path:
+                from webdriver_manager.chrome import ChromeDriverManager
+
+                _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+
+def setup_browser(headless: bool = True):
+    """Abre um Chrome controlado pelo Selenium"""
+    try:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
+        driver_path = chromedriver_path()
+    except ImportError as e:
+        raise BrowserUnavailable("Instale selenium e webdriver-manager para usar o navegador") from e
+
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    return webdriver.Chrome(service=Service(driver_path), options=options)
+
+
+class DriverPool:
+    """Conjunto limitado de navegadores reutilizáveis
+
+    acquire() devolve um navegador livre que responda à verificação de saúde
+    (ou abre um novo, até max_size); release() limpa os cookies e devolve-o.
+    Navegadores sem uso há mais de idle_timeout segundos são fechados.
+    """
+
+    def __init__(
+        self,
+        factory: Callable = None,
+        max_size: int = BROWSER_POOL_SIZE,
+        idle_timeout: float = BROWSER_IDLE_TIMEOUT,
+        acquire_timeout: float = 120,
+    ):
+        self.factory = factory or setup_browser
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.created = 0
+        self._idle: List = []  # (driver, último uso), o mais recente no fim
+        self._size = 0  # navegadores abertos (livres e em uso)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+    def _healthy(self, driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self):
+        """Navegador pronto a usar (espera se todos estiverem ocupados)"""
+        deadline = time.monotonic() + self.acquire_timeout
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    driver, _ = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    driver = None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Nenhum navegador livre")
+                self._cond.wait(remaining)
+
+        # Navegador que deixou de responder: substituir no mesmo lugar
+        if driver is not None:
+            if self._healthy(driver):
+                return driver
+            self._quit(driver)
+
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        self.created += 1
+        self._start_reaper()
+        return driver
+
+    def release(self, driver, healthy: bool = True):
+        """Devolve um navegador ao conjunto (ou fecha-o se estiver avariado)"""
+        if healthy:
+            try:
+                # Nenhum cookie (nem o do CAS) passa para o login seguinte
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            except AttributeError:
+                try:
+                    driver.delete_all_cookies()
+                except Exception:
+                    healthy = False
+            except Exception:
+                healthy = False
+
+        with self._cond:
+            if healthy and not self._stop.is_set():
+                self._idle.append((driver, time.monotonic()))
+                driver = None
+            else:
+                self._size -= 1
+            self._cond.notify()
+
+        if driver is not None:
+            self._quit(driver)
+
+    @contextmanager
+    def driver(self):
+        """with pool.driver() as driver: ... (descartado se houver exceção)"""
+        driver = self.acquire()
+        try:
+            yield driver
+        except BaseException:
+            self.release(driver, healthy=False)
+            raise
+        self.release(driver)
+
+    def reap(self) -> int:
+        """Fecha os navegadores livres há mais de idle_timeout segundos"""
+        now = time.monotonic()
+        with self._cond:
+            expired = [d for d, last_used in self._idle if now - last_used >= self.idle_timeout]
+            self._idle = [(d, t) for d, t in self._idle if now - t < self.idle_timeout]
+            self._size -= len(expired)
+            self._cond.notify_all()
+
+        for driver in expired:
+            self._quit(driver)
+        return len(expired)
+
+    def _start_reaper(self):
+        with self._cond:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reap_loop, name="driver-pool", daemon=True)
+        self._reaper.start()
+
+    def _reap_loop(self):
+        while not self._stop.wait(max(self.idle_timeout / 2, 1)):
+            self.reap()
+
+    def idle_count(self) -> int:
+        with self._cond:
+            return len(self._idle)
+
+    def close(self):
+        """Fecha todos os navegadores livres; os que estão em uso fecham ao serem devolvidos"""
+        self._stop.set()
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for driver, _ in idle:
+            self._quit(driver)
+
+
+driver_pool: Optional[DriverPool] = None
+_driver_pool_lock = threading.Lock()
+
+
+def get_driver_pool() -> DriverPool:
+    """DriverPool partilhado pelo processo (criado no primeiro uso)"""
+    global driver_pool
+
+    with _driver_pool_lock:
+        if driver_pool is None:
+            driver_pool = DriverPool()
+        return driver_pool
+
+
+def browser_login(driver, username: str, password: str, login_url: str = None):
+    """Preenche e submete o formulário do CAS da UAb"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    driver.get(login_url or CAS_LOGIN_URL)
+    print("✅ Navegou para a página de login")
+
+    username_field = WebDriverWait(driver, WAIT_SECONDS).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "input[name='username']"))
+    )
+    username_field.send_keys(username)
+
+    password_field = WebDriverWait(driver, WAIT_SECONDS).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "input[name='password']"))
+    )
+    password_field.send_keys(password)
+
+    login_button = WebDriverWait(driver, WAIT_SECONDS).until(
+        EC.element_to_be_clickable((By.CSS_SELECTOR, "input[type='submit']"))
+    )
+    login_button.click()
+    print("✅ Clicou no botão de login")
+
+
+def extract_tasks(driver) -> List[Dict]:
+    """Extrai os eventos próximos (tarefas) da página /my/"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    driver.get(f"{MOODLE_URL}/my/")
+    try:
+        WebDriverWait(driver, WAIT_SECONDS).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, ".event"))
+        )
+        tasks = []
+        for task_element in driver.find_elements(By.CSS_SELECTOR, ".event"):
+            task_name = task_element.find_element(By.CSS_SELECTOR, ".event-title").text
+            task_date = task_element.find_element(By.CSS_SELECTOR, ".event-time").text
+            tasks.append({"name": task_name, "due_date": task_date})
+        print(f"✅ Encontrou {len(tasks)} tarefas")
+        return tasks
+    except Exception as e:
+        print(f"❌ Erro ao extrair tarefas: {e}")
+        return []
+
+
+def save_tasks(tasks: List[Dict], filename: str = "tasks.json"):
+    """Salva tarefas em JSON"""
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(tasks, f, indent=2, ensure_ascii=False)
+
+
+def login_with_browser(client: MoodleUAB, pool: DriverPool = None, login_url: str = None) -> bool:
+    """
+    Login pelo CAS num navegador do pool; os cookies passam para client.session
+
+    Returns:
+        bool: True se o Moodle aceitou a sessão
+    """
+    try:
+        with (pool or get_driver_pool()).driver() as driver:
+            browser_login(driver, client.username, client.password, login_url)
+
+            driver.get(f"{client.base_url}/my/")
+            html = driver.page_source
+            if "sesskey" not in html:
+                print("❌ Falha no login - Credenciais inválidas")
+                return False
+
+            # O Moodle pode ter redirecionado para outro host (ex.: elearning.uab.pt)
+            parts = urlsplit(driver.current_url)
+            client.base_url = f"{parts.scheme}://{parts.netloc}"
+
+            for cookie in driver.get_cookies():
+                client.session.cookies.set(
+                    cookie["name"],
+                    cookie["value"],
+                    domain=cookie.get("domain", ""),
+                    path=cookie.get("path", "/"),
+                )
+
+    except Exception as e:
+        print(f"❌ Erro durante login no navegador: {e}")
+        return False
+
+    client.is_logged_in = True
+    client._login_generation += 1
+    print("✅ Login realizado com sucesso (navegador)!")
+
+    client._extract_session_info(html)
+    client._save_session()
+    return True
+
+
+class BrowserMoodleUAB(MoodleUAB):
+    """MoodleUAB cujo login completo é feito sempre pelo navegador (CAS)
+
+    A sessão guardada continua a ser tentada primeiro (exceto com force=True
+    ou uma password nova, que tem de ser verificada); só o login completo
+    usa um navegador do pool.
+    """
+
+    def __init__(self, username: str = None, password: str = None, data_dir: str = None):
+        super().__init__(username, password, data_dir)
+        self.base_url = MOODLE_URL
+
+    def login(self, username: str = None, password: str = None, force: bool = False) -> bool:
+        if username:
+            self.username = username
+        if password:
+            self.password = password
+
+        if not force and not password and self.restore_session():
+            return True
+
+        if not self.username or not self.password:
+            print("❌ Credenciais não fornecidas")
+            return False
+
+        return login_with_browser(self)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Página de disciplina do Moodle descarregada e analisada uma única vez
+Tarefas, materiais, links e fóruns são extraídos numa só passagem pelos
+li.activity e a página fica em cache por disciplina durante COURSE_PAGE_TTL
+segundos, partilhada por get_course_assignments, get_course_materials e
+get_forum_posts. A sincronização invalida a cache.
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from moodle_parser import parse_activities
+
+# Validade (segundos) de uma página de disciplina em cache
+COURSE_PAGE_TTL = float(os.getenv("MOODLE_COURSE_PAGE_TTL", "300"))
+
+DEADLINE_PATTERNS = [
+    r"(\d{1,2})\s+de\s+(\w+)\s+de\s+(\d{4})",
+    r"(\d{1,2})/(\d{1,2})/(\d{4})",
+    r"(\d{4})-(\d{2})-(\d{2})",
+]
+
+# Rótulos da data de entrega (a atividade também mostra a data de abertura)
+DEADLINE_LABELS = ("Data limite", "Data de entrega", "Fecha", "Due")
+
+
+def extract_deadline(element) -> Optional[str]:
+    """Extrai prazo de entrega (texto da data) de um elemento ou do seu texto"""
+    try:
+        text = element if isinstance(element, str) else element.get_text()
+
+        for label in DEADLINE_LABELS:
+            if label in text:
+                text = text[text.index(label):]
+                break
+
+        for pattern in DEADLINE_PATTERNS:
+            match = re.search(pattern, text)
+            if match:
+                return match.group(0)
+
+        return None
+
+    except Exception:
+        return None
+
+
+class CoursePage:
+    """Atividades de uma disciplina extraídas do HTML de /course/view.php"""
+
+    def __init__(self, course_id: int, html: str):
+        self.course_id = course_id
+        self.assignments: List[Dict] = []
+        self.materials: List[Dict] = []
+        self.forums: List[Dict] = []
+
+        for activity in parse_activities(html):
+            classes = activity["classes"]
+            name = activity["name"]
+            href = activity["href"]
+
+            if "assign" in classes:
+                if name is not None:
+                    self.assignments.append(
+                        {
+                            "name": name,
+                            "url": href or "",
+                            "deadline": extract_deadline(activity["text"]),
+                            "course_id": course_id,
+                        }
+                    )
+
+            elif "resource" in classes:
+                if name is not None and href:
+                    self.materials.append(
+                        {
+                            "name": name,
+                            "url": href,
+                            "type": "pdf" if ".pdf" in href.lower() else "document",
+                            "course_id": course_id,
+                        }
+                    )
+
+            elif "url" in classes:
+                if name is not None and href:
+                    self.materials.append(
+                        {
+                            "name": name,
+                            "url": href,
+                            "type": "url",
+                            "course_id": course_id,
+                        }
+                    )
+
+            if "forum" in classes and href:
+                forum_id = re.search(r"id=(\d+)", href)
+                if forum_id:
+                    self.forums.append(
+                        {
+                            "id": forum_id.group(1),
+                            "name": name or "",
+                            "url": href,
+                            "course_id": course_id,
+                        }
+                    )
+
+
+class CoursePageCache:
+    """Cache de CoursePage por disciplina, com TTL e um lock por disciplina
+
+    Pedidos simultâneos à mesma disciplina esperam pelo primeiro download em
+    vez de descarregarem a página cada um.
+    """
+
+    def __init__(self, fetch: Callable[[int], Optional[str]], ttl: float = COURSE_PAGE_TTL):
+        self.fetch = fetch
+        self.ttl = ttl
+        self._pages: Dict[int, Tuple[float, CoursePage]] = {}
+        self._locks: Dict[int, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _course_lock(self, course_id: int) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(course_id, threading.Lock())
+
+    def get(self, course_id: int) -> Optional[CoursePage]:
+        """CoursePage da disciplina (None se o download falhar)"""
+        with self._course_lock(course_id):
+            cached = self._pages.get(course_id)
+            if cached and time.monotonic() - cached[0] < self.ttl:
+                return cached[1]
+
+            html = self.fetch(course_id)
+            if html is None:
+                return None
+
+            page = CoursePage(course_id, html)
+            self._pages[course_id] = (time.monotonic(), page)
+            return page
+
+    def invalidate(self, course_id: Optional[int] = None):
+        """Descarta a página de uma disciplina (ou todas)"""
+        with self._lock:
+            if course_id is None:
+                self._pages.clear()
+            else:
+                self._pages.pop(course_id, None)
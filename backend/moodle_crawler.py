@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Crawler concorrente do Moodle UAB
+Distribui os pedidos por disciplina (tarefas, materiais, fóruns, notas), o
+calendário, as notificações e os downloads por um pool limitado de threads sobre a mesma
+sessão do MoodleUAB. O ritmo por host é controlado pelo PoliteAdapter, pelo
+que uma sincronização demora o tempo da disciplina mais lenta e não a soma.
+
+Com um MoodleState, os resultados ficam registados em SQLite e o modo delta
+devolve (e descarrega) apenas os itens novos ou alterados desde a última
+sincronização. Os fóruns são lidos de forma incremental a partir dos
+cursores guardados: só as discussões novas (ou com respostas novas) são
+pedidas e devolvidas.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from moodle_state import grade_items
+
+# Threads do crawler (o limite por host do PoliteAdapter continua a aplicar-se)
+MAX_WORKERS = int(os.getenv("MOODLE_CRAWLER_WORKERS", "6"))
+
+
+class MoodleCrawler:
+    """Sincronização paralela sobre um MoodleUAB já autenticado"""
+
+    def __init__(
+        self,
+        client,
+        max_workers: int = MAX_WORKERS,
+        state=None,
+        progress: Optional[Callable[[str, int, Optional[int]], None]] = None,
+    ):
+        self.client = client
+        self.max_workers = max_workers
+        self.state = state
+        # progress(etapa, feitos, total), ex.: Job.progresso
+        self.progress = progress
+
+    def _track(self, stage: str, futures: List):
+        """Reporta o avanço de uma etapa à medida que os futures terminam"""
+        if self.progress is None:
+            return
+
+        lock = threading.Lock()
+        done = [0]
+        total = len(futures)
+        self.progress(stage, 0, total)
+
+        def advance(_):
+            with lock:
+                done[0] += 1
+                count = done[0]
+            self.progress(stage, count, total)
+
+        for future in futures:
+            future.add_done_callback(advance)
+
+    def _record(self, kind: str, items: List[Dict], changes: Dict, delta: bool) -> List[Dict]:
+        """Regista os itens no estado; em modo delta devolve só os novos/alterados"""
+        if self.state is None:
+            return items
+
+        recorded = self.state.record(kind, items)
+        totals = changes.setdefault(kind, {"new": 0, "changed": 0, "unchanged": 0})
+        totals["new"] += len(recorded["new"])
+        totals["changed"] += len(recorded["changed"])
+        totals["unchanged"] += recorded["unchanged"]
+
+        return recorded["new"] + recorded["changed"] if delta else items
+
+    def _result(self, future, failures: List[Dict], stage: str, course_id=None, default=None):
+        """Resultado de um future; um erro fica em failures e não interrompe a sincronização"""
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"❌ Erro na sincronização ({stage}, disciplina {course_id}): {e}")
+            failures.append({"stage": stage, "course_id": course_id, "error": str(e)})
+            return default
+
+    def _pending(self, kind: str, items: List[Dict], delta: bool) -> List[Dict]:
+        """Itens a processar; em modo delta só os novos/alterados, sem os registar"""
+        if self.state is None or not delta:
+            return items
+
+        pending = self.state.record(kind, items, dry_run=True)
+        return pending["new"] + pending["changed"]
+
+    def sync(self, download_materials: bool = True, delta: bool = False) -> Dict:
+        """Sincronização completa (mesmo formato de quick_sync)
+
+        Args:
+            download_materials: Descarregar materiais PDF novos
+            delta: Devolver e processar só itens novos ou alterados (requer state)
+
+        Returns:
+            Dict: disciplinas, tarefas, materiais baixados, discussões novas
+            dos fóruns, notas, calendário, notificações, alterações por tipo,
+            etapas que falharam (o resto da sincronização continua e é
+            registado) e duração em segundos
+        """
+        started = time.perf_counter()
+        client = self.client
+
+        results = {
+            "success": False,
+            "courses": [],
+            "assignments": [],
+            "materials": [],
+            "forums": [],
+            "grades": [],
+            "calendar": [],
+            "notifications": [],
+            "changes": {},
+            "failed": [],
+        }
+        changes = results["changes"]
+        failed = results["failed"]
+
+        # Páginas de disciplina em cache podem estar desatualizadas
+        client.course_pages.invalidate()
+
+        if self.progress:
+            self.progress("courses", 0, 1)
+        courses = client.get_enrolled_courses()
+        results["courses"] = self._record("courses", courses, changes, delta)
+        if self.progress:
+            self.progress("courses", 1, 1)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            calendar = pool.submit(client.sync_calendar)
+            notifications = pool.submit(client.check_notifications)
+            assignments = {c["id"]: pool.submit(client.get_course_assignments, c["id"]) for c in courses}
+            materials = {}
+            if download_materials:
+                materials = {c["id"]: pool.submit(client.get_course_materials, c["id"]) for c in courses}
+            cursors = self.state.forum_cursors() if self.state is not None else None
+            forums = {c["id"]: pool.submit(client.get_forum_updates, c["id"], cursors) for c in courses}
+            grades = {c["id"]: pool.submit(client.get_grades, c["id"]) for c in courses}
+
+            self._track("calendar", [calendar])
+            self._track("notifications", [notifications])
+            self._track("assignments", list(assignments.values()))
+            self._track("materials", list(materials.values()))
+            self._track("forums", list(forums.values()))
+            self._track("grades", list(grades.values()))
+
+            # O estado é gravado nesta thread, à medida que cada disciplina termina
+            for course in courses:
+                course_assignments = self._result(assignments[course["id"]], failed, "assignments", course["id"])
+                results["assignments"].extend(self._record("activities", course_assignments or [], changes, delta))
+
+            # Downloads começam à medida que cada disciplina termina; os materiais
+            # só são registados no fim, para que um download falhado se repita
+            course_materials = {}
+            for course in courses:
+                if course["id"] in materials:
+                    found = self._result(materials[course["id"]], failed, "materials", course["id"])
+                    if found is not None:
+                        course_materials[course["id"]] = found
+            downloads = {
+                course_id: [
+                    (material, pool.submit(client.download_new_material, course_id, material))
+                    for material in self._pending("activities", found, delta)
+                ]
+                for course_id, found in course_materials.items()
+            }
+            self._track("downloads", [future for pending in downloads.values() for _, future in pending])
+
+            for course in courses:
+                # Fórum que falhou: sem complete, os cursores não avançam
+                discussions, complete = self._result(forums[course["id"]], failed, "forums", course["id"]) or ([], [])
+                results["forums"].extend(self._record("forum_discussions", discussions, changes, delta))
+                if self.state is not None:
+                    self.state.advance_forum_cursors(discussions, complete=complete)
+
+                course_grades = self._result(grades[course["id"]], failed, "grades", course["id"])
+                results["grades"].extend(
+                    self._record("grades", grade_items(course["id"], course_grades or {}), changes, delta)
+                )
+
+            results["calendar"] = self._record("events", self._result(calendar, failed, "calendar") or [], changes, delta)
+            results["notifications"] = self._result(notifications, failed, "notifications") or []
+
+            for course_id, pending in downloads.items():
+                # Download com erro conta como falhado: não é registado e repete-se
+                downloaded = {
+                    id(material): self._result(future, failed, "downloads", course_id, default=False)
+                    for material, future in pending
+                }
+                self._record(
+                    "activities",
+                    [m for m in course_materials[course_id] if downloaded.get(id(m)) is not False],
+                    changes,
+                    delta,
+                )
+                results["materials"].extend(filename for filename in downloaded.values() if filename)
+
+        results["success"] = True
+        results["elapsed"] = round(time.perf_counter() - started, 3)
+
+        return results
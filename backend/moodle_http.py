@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Camada HTTP partilhada pelos pedidos ao Moodle UAB
+Limita pedidos simultâneos por host e garante um intervalo mínimo entre
+o início de pedidos consecutivos, para o crawler paralelo não sobrecarregar
+o servidor da universidade. O CachingAdapter acrescenta uma cache HTTP em
+disco com revalidação condicional (ETag/Last-Modified).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Pedidos simultâneos por host
+MAX_CONCURRENCY_PER_HOST = int(os.getenv("MOODLE_MAX_CONCURRENCY", "4"))
+
+# Intervalo mínimo (segundos) entre o início de dois pedidos ao mesmo host
+MIN_REQUEST_INTERVAL = float(os.getenv("MOODLE_MIN_INTERVAL", "0.1"))
+
+# Tamanho máximo da cache HTTP em disco (MB)
+HTTP_CACHE_MAX_MB = float(os.getenv("MOODLE_HTTP_CACHE_MB", "200"))
+
+
+class _HostSlot:
+    """Estado de limitação de um host"""
+
+    def __init__(self, max_concurrency: int):
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.lock = threading.Lock()
+        self.next_start = 0.0
+
+
+class PoliteAdapter(HTTPAdapter):
+    """HTTPAdapter com limite de concorrência e de ritmo por host"""
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY_PER_HOST,
+        min_interval: float = MIN_REQUEST_INTERVAL,
+        **kwargs,
+    ):
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self._slots: Dict[str, _HostSlot] = {}
+        self._slots_lock = threading.Lock()
+        kwargs.setdefault("pool_maxsize", max_concurrency)
+        super().__init__(**kwargs)
+
+    def _slot(self, host: str) -> _HostSlot:
+        with self._slots_lock:
+            if host not in self._slots:
+                self._slots[host] = _HostSlot(self.max_concurrency)
+            return self._slots[host]
+
+    def send(self, request, **kwargs):
+        slot = self._slot(urlsplit(request.url).netloc)
+
+        with slot.semaphore:
+            # Reservar o próximo instante de início; quem chega depois espera mais
+            with slot.lock:
+                now = time.monotonic()
+                start = max(now, slot.next_start)
+                slot.next_start = start + self.min_interval
+
+            if start > now:
+                time.sleep(start - now)
+
+            return super().send(request, **kwargs)
+
+
+class CachingAdapter(PoliteAdapter):
+    """PoliteAdapter com cache HTTP em disco para pedidos GET
+
+    Guarda corpo e validadores (ETag/Last-Modified) das respostas 200 que os
+    tenham, envia If-None-Match/If-Modified-Since nos pedidos seguintes e
+    responde a partir do disco quando o servidor devolve 304. Respostas com
+    Cache-Control: no-store e pedidos em stream (downloads) não passam pela
+    cache. Acima de max_bytes, as entradas menos usadas são removidas.
+
+    identity() (ex.: o utilizador Moodle) entra na chave de cada entrada:
+    páginas guardadas para um utilizador nunca são servidas a outro, mesmo
+    que o servidor responda 304 ao ETag delas.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = int(HTTP_CACHE_MAX_MB * 1024 * 1024),
+        identity: Optional[Callable[[], Optional[str]]] = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.identity = identity
+        self.hits = 0
+        self._cache_lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # chave -> tamanho, da menos para a mais recentemente usada
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        bodies = []
+        for entry in os.scandir(cache_dir):
+            if entry.name.endswith(".body"):
+                stat = entry.stat()
+                bodies.append((stat.st_mtime, entry.name[:-5], stat.st_size))
+        for _, key, size in sorted(bodies):
+            self._entries[key] = size
+        self._total = sum(self._entries.values())
+
+    def _paths(self, key: str):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".body"
+
+    def _load(self, key: str) -> Optional[Dict]:
+        meta_path, _ = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key: str, response: Response):
+        meta_path, body_path = self._paths(key)
+        meta = {
+            "url": response.url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            # O corpo guardado já vem descomprimido
+            "headers": {
+                k: v for k, v in response.headers.items()
+                if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+            },
+            "encoding": response.encoding,
+        }
+        body = response.content
+
+        # Corpo primeiro e metadados depois, ambos com rename atómico
+        for path, data in ((body_path, body), (meta_path, json.dumps(meta).encode("utf-8"))):
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+        with self._cache_lock:
+            self._total += len(body) - self._entries.pop(key, 0)
+            self._entries[key] = len(body)
+            self._evict()
+
+    def _evict(self):
+        while self._total > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _from_cache(self, key: str, meta: Dict, request) -> Optional[Response]:
+        _, body_path = self._paths(key)
+        try:
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except OSError:
+            return None
+
+        with self._cache_lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+
+        # mtime marca o último uso, para a ordem LRU sobreviver a reinícios
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+
+        response = Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        response.headers["X-Cache"] = "HIT"
+        response._content = body
+        response.encoding = meta.get("encoding")
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def send(self, request, **kwargs):
+        if request.method != "GET" or kwargs.get("stream"):
+            return super().send(request, **kwargs)
+
+        identity = (self.identity() if self.identity else None) or ""
+        key = hashlib.sha256(f"{identity}\n{request.url}".encode("utf-8")).hexdigest()
+        meta = self._load(key)
+
+        if meta:
+            if meta.get("etag"):
+                request.headers.setdefault("If-None-Match", meta["etag"])
+            if meta.get("last_modified"):
+                request.headers.setdefault("If-Modified-Since", meta["last_modified"])
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and meta:
+            cached = self._from_cache(key, meta, request)
+            response.close()
+            if cached is not None:
+                return cached
+
+            # Entrada removida entretanto: repetir sem validadores
+            request.headers.pop("If-None-Match", None)
+            request.headers.pop("If-Modified-Since", None)
+            response = super().send(request, **kwargs)
+
+        if (
+            response.status_code == 200
+            and (response.headers.get("ETag") or response.headers.get("Last-Modified"))
+            and "no-store" not in response.headers.get("Cache-Control", "")
+        ):
+            self._store(key, response)
+
+        return response
+
+
+def mount_polite_adapter(session, adapter: HTTPAdapter = None) -> HTTPAdapter:
+    """Monta o adaptador (por omissão um PoliteAdapter) para http e https"""
+    adapter = adapter or PoliteAdapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return adapter
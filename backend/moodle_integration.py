@@ -6,20 +6,41 @@ Responsável por todas as interações com o portal Moodle
 """
 
 import requests
-from bs4 import BeautifulSoup
 import json
 import os
 import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Union
 import re
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from moodle_course import CoursePageCache, extract_deadline
+from moodle_crawler import MoodleCrawler
+from moodle_http import CachingAdapter, mount_polite_adapter
+from moodle_materials import MaterialStore
+from moodle_parser import (
+    parse_courses,
+    parse_discussions,
+    parse_events,
+    parse_grades,
+    parse_login_token,
+)
+from moodle_state import post_marker
+
+
+# Backend do cliente: "requests" (por omissão) ou "browser" (login pelo Selenium)
+MOODLE_BACKEND = os.getenv("MOODLE_BACKEND", "requests")
+
+# Login pelo navegador (CAS) quando o formulário do Moodle não está disponível
+BROWSER_FALLBACK = os.getenv("MOODLE_BROWSER_FALLBACK", "1") == "1"
+
+# Fóruns de uma disciplina lidos em simultâneo e páginas máximas por fórum
+FORUM_WORKERS = int(os.getenv("MOODLE_FORUM_WORKERS", "4"))
+FORUM_MAX_PAGES = 50
+
+# Sessões guardadas mais antigas do que isto não chegam a ser validadas
+SESSION_MAX_AGE_HOURS = float(os.getenv("MOODLE_SESSION_MAX_AGE_HOURS", "24"))
 
 
 class MoodleUAB:
@@ -27,7 +48,7 @@ class MoodleUAB:
     Classe principal para integração com Moodle UAB
     """
 
-    def __init__(self, username: str = None, password: str = None):
+    def __init__(self, username: str = None, password: str = None, data_dir: str = None):
         self.base_url = "https://moodle.uab.pt"
         self.username = username
         self.password = password
@@ -38,14 +59,35 @@ class MoodleUAB:
         self.is_logged_in = False
         self.token = None
         self.userid = None
+        # Incrementado a cada login, para várias threads não renovarem a sessão ao mesmo tempo
+        self._login_generation = 0
+        self._login_lock = threading.Lock()
         self.courses = []
-        self.data_dir = os.path.join(os.path.dirname(__file__), "..", "data", "moodle")
+        # Página de cada disciplina descarregada uma vez por TTL
+        self.course_pages = CoursePageCache(self._fetch_course_page)
+        # session.json, cache HTTP e materiais ficam todos em data_dir
+        self.data_dir = data_dir or os.path.join(os.path.dirname(__file__), "..", "data", "moodle")
         os.makedirs(self.data_dir, exist_ok=True)
+        # Cache HTTP em disco (separada por utilizador) e limite de ritmo por host
+        # (a sessão é usada pelo crawler)
+        mount_polite_adapter(
+            self.session,
+            CachingAdapter(os.path.join(self.data_dir, "http_cache"), identity=lambda: self.username),
+        )
+        # Materiais endereçados por conteúdo, com downloads retomáveis
+        self.material_store = MaterialStore(os.path.join(self.data_dir, "materials"))
 
-    def login(self, username: str = None, password: str = None) -> bool:
+    def login(self, username: str = None, password: str = None, force: bool = False) -> bool:
         """
         Realiza login automático no Moodle UAB
 
+        Tenta primeiro restaurar a sessão guardada em session.json (um único
+        pedido de validação); só faz o login completo se ela não for válida,
+        se force=True ou se for passada uma password, que tem de ser
+        verificada pelo Moodle. Se o formulário do Moodle não estiver disponível
+        (ex.: redirecionamento para o CAS) e BROWSER_FALLBACK estiver ativo,
+        o login é feito num navegador do pool de moodle_browser.
+
         Returns:
             bool: True se login bem-sucedido, False caso contrário
         """
@@ -54,6 +96,9 @@ class MoodleUAB:
         if password:
             self.password = password
 
+        if not force and not password and self.restore_session():
+            return True
+
         if not self.username or not self.password:
             print("❌ Credenciais não fornecidas")
             return False
@@ -65,17 +110,14 @@ class MoodleUAB:
 
             if response.status_code != 200:
                 print(f"❌ Erro ao acessar página de login: {response.status_code}")
-                return False
+                return self._browser_fallback()
 
             # Passo 2: Extrair logintoken
-            soup = BeautifulSoup(response.text, "html.parser")
-            logintoken_input = soup.find("input", {"name": "logintoken"})
+            logintoken = parse_login_token(response.text)
 
-            if not logintoken_input:
+            if logintoken is None:
                 print("❌ Token de login não encontrado")
-                return False
-
-            logintoken = logintoken_input.get("value")
+                return self._browser_fallback()
 
             # Passo 3: Enviar credenciais
             login_data = {
@@ -92,6 +134,7 @@ class MoodleUAB:
             # Verificar se login foi bem-sucedido
             if "sesskey" in response.text or "logout.php" in response.text:
                 self.is_logged_in = True
+                self._login_generation += 1
                 print("✅ Login realizado com sucesso!")
 
                 # Extrair sesskey e userid
@@ -107,8 +150,22 @@ class MoodleUAB:
 
         except Exception as e:
             print(f"❌ Erro durante login: {e}")
+            return self._browser_fallback()
+
+    def _browser_fallback(self) -> bool:
+        """Login pelo CAS num navegador quando o formulário do Moodle falha"""
+        if not BROWSER_FALLBACK:
+            return False
+
+        # Import tardio: o selenium só é carregado se este caminho for usado
+        from moodle_browser import login_with_browser, selenium_available
+
+        if not selenium_available():
             return False
 
+        print("🌐 A tentar login pelo navegador (CAS)...")
+        return login_with_browser(self)
+
     def _extract_session_info(self, html: str):
         """Extrai informações da sessão (sesskey, userid, token)"""
         try:
@@ -126,24 +183,38 @@ class MoodleUAB:
             print(f"⚠️ Erro ao extrair informações da sessão: {e}")
 
     def _save_session(self):
-        """Salva a sessão atual em arquivo"""
+        """Salva a sessão atual (cookie jar completo) em arquivo só legível pelo utilizador"""
         try:
             session_file = os.path.join(self.data_dir, "session.json")
             session_data = {
-                "cookies": self.session.cookies.get_dict(),
+                "username": self.username,
+                "cookies": [
+                    {
+                        "name": cookie.name,
+                        "value": cookie.value,
+                        "domain": cookie.domain,
+                        "path": cookie.path,
+                        "expires": cookie.expires,
+                        "secure": cookie.secure,
+                    }
+                    for cookie in self.session.cookies
+                ],
+                "base_url": self.base_url,
                 "token": self.token,
                 "userid": self.userid,
                 "timestamp": datetime.now().isoformat(),
             }
 
-            with open(session_file, "w") as f:
+            tmp = f"{session_file}.tmp"
+            with open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
                 json.dump(session_data, f, indent=2)
+            os.replace(tmp, session_file)
 
         except Exception as e:
             print(f"⚠️ Erro ao salvar sessão: {e}")
 
     def _load_session(self) -> bool:
-        """Carrega sessão salva anteriormente"""
+        """Carrega sessão salva anteriormente (sem a validar)"""
         try:
             session_file = os.path.join(self.data_dir, "session.json")
 
@@ -153,18 +224,37 @@ class MoodleUAB:
             with open(session_file, "r") as f:
                 session_data = json.load(f)
 
-            # Verificar se sessão não expirou (24 horas)
+            # Sessão de outro utilizador (ou de formato antigo, sem utilizador)
+            if self.username and session_data.get("username") != self.username:
+                return False
+
+            # Verificar se sessão não expirou
             timestamp = datetime.fromisoformat(session_data["timestamp"])
-            if datetime.now() - timestamp > timedelta(hours=24):
+            if datetime.now() - timestamp > timedelta(hours=SESSION_MAX_AGE_HOURS):
                 return False
 
-            # Restaurar sessão
-            for name, value in session_data["cookies"].items():
-                self.session.cookies.set(name, value)
+            # Restaurar sessão (formato antigo: só nome -> valor)
+            cookies = session_data["cookies"]
+            if isinstance(cookies, dict):
+                cookies = [{"name": name, "value": value} for name, value in cookies.items()]
+
+            for cookie in cookies:
+                self.session.cookies.set(
+                    cookie["name"],
+                    cookie["value"],
+                    domain=cookie.get("domain", ""),
+                    path=cookie.get("path", "/"),
+                    expires=cookie.get("expires"),
+                    secure=cookie.get("secure", False),
+                )
 
             self.token = session_data.get("token")
             self.userid = session_data.get("userid")
-            self.is_logged_in = True
+            # Host onde os cookies valem (o login pelo navegador pode ter sido redirecionado)
+            self.base_url = session_data.get("base_url") or self.base_url
+            # Cliente criado sem credenciais: a sessão diz de quem é (cache HTTP, novo login)
+            if not self.username:
+                self.username = session_data.get("username")
 
             return True
 
@@ -172,6 +262,91 @@ class MoodleUAB:
             print(f"⚠️ Erro ao carregar sessão: {e}")
             return False
 
+    def _validate_session(self) -> bool:
+        """Confirma cookies e sesskey com um único pedido AJAX leve"""
+        if not self.token:
+            return False
+
+        try:
+            response = self.session.post(
+                f"{self.base_url}/lib/ajax/service.php",
+                params={"sesskey": self.token, "info": "core_session_time_remaining"},
+                json=[{"index": 0, "methodname": "core_session_time_remaining", "args": {}}],
+                allow_redirects=False,
+            )
+
+            if response.status_code != 200:
+                return False
+
+            result = response.json()[0]
+            if result.get("error"):
+                return False
+
+            data = result.get("data") or {}
+            if self.userid and data.get("userid") != self.userid:
+                return False
+
+            return data.get("userid", 0) > 0 and data.get("timeremaining", 1) > 0
+
+        except (requests.RequestException, ValueError, LookupError, TypeError, AttributeError):
+            return False
+
+    def restore_session(self) -> bool:
+        """
+        Restaura a sessão de session.json se o Moodle ainda a aceitar
+
+        Returns:
+            bool: True se a sessão restaurada é válida
+        """
+        base_url = self.base_url
+        if not self._load_session():
+            return False
+
+        if not self._validate_session():
+            # Cookies expirados: não os misturar com um login novo nem voltar a tentá-los
+            self.session.cookies.clear()
+            self.base_url = base_url
+            self.token = None
+            self.is_logged_in = False
+            try:
+                os.remove(os.path.join(self.data_dir, "session.json"))
+            except OSError:
+                pass
+            return False
+
+        self.is_logged_in = True
+        self._login_generation += 1
+        print("✅ Sessão Moodle restaurada")
+
+        # Renovar o timestamp (e cookies que o Moodle tenha atualizado)
+        self._save_session()
+        return True
+
+    def _is_login_redirect(self, response: requests.Response) -> bool:
+        """O Moodle redirecionou o pedido para o formulário de login (sessão expirada)"""
+        return bool(response.history) and "/login/index.php" in response.url
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET autenticado: se a sessão tiver expirado, autentica de novo e repete uma vez
+        """
+        generation = self._login_generation
+        response = self.session.get(url, **kwargs)
+
+        if not self._is_login_redirect(response) or not (self.username and self.password):
+            return response
+
+        with self._login_lock:
+            # Outra thread pode já ter renovado a sessão entretanto
+            if self._login_generation == generation:
+                print("🔄 Sessão Moodle expirada, autenticando novamente...")
+                if not self.login(force=True):
+                    self.is_logged_in = False
+                    return response
+
+        response.close()
+        return self.session.get(url, **kwargs)
+
     def get_enrolled_courses(self) -> List[Dict]:
         """
         Busca todas as disciplinas matriculadas
@@ -186,39 +361,22 @@ class MoodleUAB:
         try:
             # Acessar página principal do usuário
             dashboard_url = f"{self.base_url}/my/"
-            response = self.session.get(dashboard_url)
+            response = self._get(dashboard_url)
 
             if response.status_code != 200:
                 return []
 
-            soup = BeautifulSoup(response.text, "html.parser")
-            courses = []
-
-            # Buscar cursos na página
-            course_elements = soup.find_all("div", class_="card-deck")
-
-            for element in course_elements:
-                course_links = element.find_all("a", href=True)
-
-                for link in course_links:
-                    href = link.get("href")
-
-                    if "/course/view.php?id=" in href:
-                        course_id = re.search(r"id=(\d+)", href)
-
-                        if course_id:
-                            course_name = link.get_text(strip=True)
-
-                            if course_name:
-                                courses.append(
-                                    {
-                                        "id": int(course_id.group(1)),
-                                        "name": course_name,
-                                        "url": href
-                                        if href.startswith("http")
-                                        else self.base_url + href,
-                                    }
-                                )
+            # Buscar cursos nos cartões do painel
+            courses = [
+                {
+                    "id": course["id"],
+                    "name": course["name"],
+                    "url": course["href"]
+                    if course["href"].startswith("http")
+                    else self.base_url + course["href"],
+                }
+                for course in parse_courses(response.text)
+            ]
 
             self.courses = courses
 
@@ -232,80 +390,48 @@ class MoodleUAB:
             print(f"❌ Erro ao buscar disciplinas: {e}")
             return []
 
-    def get_course_assignments(self, course_id: int) -> List[Dict]:
-        """
-        Busca tarefas e prazos de uma disciplina
+    def _fetch_course_page(self, course_id: int) -> Optional[str]:
+        """Descarrega o HTML da página de uma disciplina"""
+        course_url = f"{self.base_url}/course/view.php?id={course_id}"
+        response = self._get(course_url)
 
-        Args:
-            course_id: ID da disciplina
+        if response.status_code != 200:
+            return None
+
+        return response.text
+
+    def get_course_page(self, course_id: int):
+        """
+        Página da disciplina já analisada (partilhada entre tarefas, materiais e fóruns)
 
         Returns:
-            List[Dict]: Lista de tarefas com prazos
+            Optional[CoursePage]: Página da disciplina, ou None em caso de erro
         """
         if not self.is_logged_in:
-            return []
+            return None
 
         try:
-            course_url = f"{self.base_url}/course/view.php?id={course_id}"
-            response = self.session.get(course_url)
-
-            if response.status_code != 200:
-                return []
-
-            soup = BeautifulSoup(response.text, "html.parser")
-            assignments = []
-
-            # Buscar atividades do tipo "assign"
-            activities = soup.find_all("li", class_="activity")
-
-            for activity in activities:
-                if "assign" in activity.get("class", []):
-                    name_elem = activity.find("span", class_="instancename")
-
-                    if name_elem:
-                        name = name_elem.get_text(strip=True)
-                        link = activity.find("a", href=True)
-
-                        # Buscar prazo
-                        deadline = self._extract_deadline(activity)
+            return self.course_pages.get(course_id)
+        except Exception as e:
+            print(f"❌ Erro ao carregar disciplina {course_id}: {e}")
+            return None
 
-                        assignments.append(
-                            {
-                                "name": name,
-                                "url": link["href"] if link else "",
-                                "deadline": deadline,
-                                "course_id": course_id,
-                            }
-                        )
+    def get_course_assignments(self, course_id: int) -> List[Dict]:
+        """
+        Busca tarefas e prazos de uma disciplina
 
-            return assignments
+        Args:
+            course_id: ID da disciplina
 
-        except Exception as e:
-            print(f"❌ Erro ao buscar tarefas: {e}")
-            return []
+        Returns:
+            List[Dict]: Lista de tarefas com prazos
+        """
+        page = self.get_course_page(course_id)
+        return list(page.assignments) if page else []
 
     def _extract_deadline(self, element) -> Optional[str]:
         """Extrai prazo de entrega de um elemento"""
-        try:
-            # Buscar texto de prazo
-            text = element.get_text()
-
-            # Padrões de data em português
-            patterns = [
-                r"(\d{1,2})\s+de\s+(\w+)\s+de\s+(\d{4})",
-                r"(\d{1,2})/(\d{1,2})/(\d{4})",
-                r"(\d{4})-(\d{2})-(\d{2})",
-            ]
-
-            for pattern in patterns:
-                match = re.search(pattern, text)
-                if match:
-                    return match.group(0)
-
-            return None
-
-        except:
-            return None
+        return extract_deadline(element)
 
     def get_course_materials(self, course_id: int) -> List[Dict]:
         """
@@ -317,64 +443,12 @@ class MoodleUAB:
         Returns:
             List[Dict]: Lista de materiais (PDFs, vídeos, etc)
         """
-        if not self.is_logged_in:
-            return []
-
-        try:
-            course_url = f"{self.base_url}/course/view.php?id={course_id}"
-            response = self.session.get(course_url)
+        page = self.get_course_page(course_id)
+        return list(page.materials) if page else []
 
-            if response.status_code != 200:
-                return []
-
-            soup = BeautifulSoup(response.text, "html.parser")
-            materials = []
-
-            # Buscar recursos
-            resources = soup.find_all("li", class_="activity")
-
-            for resource in resources:
-                # PDF
-                if "resource" in resource.get("class", []):
-                    name_elem = resource.find("span", class_="instancename")
-                    link = resource.find("a", href=True)
-
-                    if name_elem and link:
-                        materials.append(
-                            {
-                                "name": name_elem.get_text(strip=True),
-                                "url": link["href"],
-                                "type": "pdf"
-                                if ".pdf" in link["href"].lower()
-                                else "document",
-                                "course_id": course_id,
-                            }
-                        )
-
-                # URL/Link
-                elif "url" in resource.get("class", []):
-                    name_elem = resource.find("span", class_="instancename")
-                    link = resource.find("a", href=True)
-
-                    if name_elem and link:
-                        materials.append(
-                            {
-                                "name": name_elem.get_text(strip=True),
-                                "url": link["href"],
-                                "type": "url",
-                                "course_id": course_id,
-                            }
-                        )
-
-            return materials
-
-        except Exception as e:
-            print(f"❌ Erro ao buscar materiais: {e}")
-            return []
-
-    def download_material(self, url: str, filename: str) -> bool:
+    def download_material(self, url: str, filename: str, **metadata) -> bool:
         """
-        Baixa um material do Moodle
+        Baixa um material do Moodle (retoma downloads interrompidos)
 
         Args:
             url: URL do material
@@ -384,18 +458,11 @@ class MoodleUAB:
             bool: True se download bem-sucedido
         """
         try:
-            response = self.session.get(url, stream=True)
+            entry = self.material_store.download(self._get, url, filename, **metadata)
 
-            if response.status_code != 200:
+            if not entry:
                 return False
 
-            filepath = os.path.join(self.data_dir, "materials", filename)
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-
-            with open(filepath, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-
             print(f"✅ Material baixado: {filename}")
             return True
 
@@ -403,78 +470,96 @@ class MoodleUAB:
             print(f"❌ Erro ao baixar material: {e}")
             return False
 
-    def get_forum_posts(self, course_id: int) -> List[Dict]:
+    def get_forum_posts(self, course_id: int, cursors: Optional[Dict[str, int]] = None) -> List[Dict]:
         """
-        Busca posts de fóruns de uma disciplina
+        Busca posts de fóruns de uma disciplina (fóruns em paralelo)
 
         Args:
             course_id: ID da disciplina
+            cursors: Maior id de mensagem já visto por fórum (MoodleState.forum_cursors);
+                com cursor, só são devolvidas as discussões novas ou com respostas novas
 
         Returns:
             List[Dict]: Lista de posts de fóruns
         """
-        if not self.is_logged_in:
-            return []
+        return self.get_forum_updates(course_id, cursors)[0]
 
-        try:
-            course_url = f"{self.base_url}/course/view.php?id={course_id}"
-            response = self.session.get(course_url)
-
-            soup = BeautifulSoup(response.text, "html.parser")
-            forums = []
-
-            # Buscar fóruns
-            forum_activities = soup.find_all("li", class_="activity")
-
-            for activity in forum_activities:
-                if "forum" in activity.get("class", []):
-                    link = activity.find("a", href=True)
-
-                    if link:
-                        forum_id = re.search(r"id=(\d+)", link["href"])
+    def get_forum_updates(
+        self, course_id: int, cursors: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[Dict], List[str]]:
+        """
+        Como get_forum_posts, indicando também os fóruns lidos até ao fim
 
-                        if forum_id:
-                            forum_posts = self._get_forum_discussions(forum_id.group(1))
-                            forums.extend(forum_posts)
+        Um fórum fica completo quando a leitura chega a uma discussão já
+        vista ou à última página sem erros. Só o cursor desses fóruns pode
+        avançar (MoodleState.advance_forum_cursors): num fórum incompleto as
+        páginas em falta são lidas de novo na próxima sincronização.
 
-            return forums
+        Returns:
+            (discussões, ids dos fóruns completos)
+        """
+        page = self.get_course_page(course_id)
+        if not page or not page.forums:
+            return [], []
+
+        cursors = cursors or {}
+        forum_ids = [forum["id"] for forum in page.forums]
+
+        with ThreadPoolExecutor(max_workers=min(len(forum_ids), FORUM_WORKERS)) as pool:
+            results = list(
+                pool.map(
+                    lambda forum_id: self._get_forum_discussions(forum_id, cursors.get(str(forum_id))),
+                    forum_ids,
+                )
+            )
 
-        except Exception as e:
-            print(f"❌ Erro ao buscar posts de fóruns: {e}")
-            return []
+        discussions = [
+            {**discussion, "course_id": course_id}
+            for forum_discussions, _ in results
+            for discussion in forum_discussions
+        ]
+        complete = [str(forum_id) for forum_id, (_, done) in zip(forum_ids, results) if done]
+        return discussions, complete
+
+    def _get_forum_discussions(self, forum_id: str, since_post_id: Optional[int] = None) -> Tuple[List[Dict], bool]:
+        """Busca discussões de um fórum específico
+
+        A listagem vem ordenada pela última mensagem (mais recente primeiro),
+        com as discussões fixadas no topo fora dessa ordem: a paginação pára
+        na primeira página com uma discussão não fixada já vista (id da última
+        mensagem <= since_post_id). Além das discussões, devolve se a leitura
+        terminou (discussão já vista, última página ou FORUM_MAX_PAGES) sem
+        erros nem respostas inválidas.
+        """
+        discussions = []
 
-    def _get_forum_discussions(self, forum_id: str) -> List[Dict]:
-        """Busca discussões de um fórum específico"""
         try:
-            forum_url = f"{self.base_url}/mod/forum/view.php?id={forum_id}"
-            response = self.session.get(forum_url)
-
-            soup = BeautifulSoup(response.text, "html.parser")
-            discussions = []
-
-            # Buscar discussões
-            discussion_elements = soup.find_all("tr", class_="discussion")
-
-            for discussion in discussion_elements:
-                topic = discussion.find("a", class_="discussionname")
-                author = discussion.find("a", href=re.compile(r"/user/view.php"))
-
-                if topic:
-                    discussions.append(
-                        {
-                            "title": topic.get_text(strip=True),
-                            "url": topic["href"] if "href" in topic.attrs else "",
-                            "author": author.get_text(strip=True)
-                            if author
-                            else "Desconhecido",
-                            "forum_id": forum_id,
-                        }
-                    )
+            for page in range(FORUM_MAX_PAGES):
+                forum_url = f"{self.base_url}/mod/forum/view.php?id={forum_id}"
+                if page:
+                    forum_url += f"&page={page}"
+                response = self._get(forum_url)
+
+                if response.status_code != 200:
+                    return discussions, False
+
+                # Buscar discussões
+                found = parse_discussions(response.text)
+                new = [d for d in found if since_post_id is None or post_marker(d) > since_post_id]
+                discussions.extend({**discussion, "forum_id": forum_id} for discussion in new)
+
+                seen = since_post_id is not None and any(
+                    not d["pinned"] and post_marker(d) <= since_post_id for d in found
+                )
+                has_next = re.search(rf"[?&;]page={page + 1}\b", response.text)
+                if not found or seen or not has_next:
+                    break
 
-            return discussions
+        except Exception as e:
+            print(f"❌ Erro ao buscar discussões do fórum {forum_id}: {e}")
+            return discussions, False
 
-        except:
-            return []
+        return discussions, True
 
     def get_grades(self, course_id: int) -> Dict:
         """
@@ -491,30 +576,13 @@ class MoodleUAB:
 
         try:
             grades_url = f"{self.base_url}/grade/report/user/index.php?id={course_id}"
-            response = self.session.get(grades_url)
+            response = self._get(grades_url)
 
             if response.status_code != 200:
                 return {}
 
-            soup = BeautifulSoup(response.text, "html.parser")
-            grades = {}
-
             # Buscar tabela de notas
-            grade_table = soup.find("table", class_="generaltable")
-
-            if grade_table:
-                rows = grade_table.find_all("tr")
-
-                for row in rows:
-                    cells = row.find_all("td")
-
-                    if len(cells) >= 2:
-                        item_name = cells[0].get_text(strip=True)
-                        grade_value = cells[1].get_text(strip=True)
-
-                        grades[item_name] = grade_value
-
-            return grades
+            return parse_grades(response.text)
 
         except Exception as e:
             print(f"❌ Erro ao buscar notas: {e}")
@@ -532,26 +600,10 @@ class MoodleUAB:
 
         try:
             calendar_url = f"{self.base_url}/calendar/view.php?view=month"
-            response = self.session.get(calendar_url)
-
-            soup = BeautifulSoup(response.text, "html.parser")
-            events = []
+            response = self._get(calendar_url)
 
             # Buscar eventos
-            event_elements = soup.find_all("div", class_="event")
-
-            for event in event_elements:
-                title = event.find("a")
-                date_elem = event.find("div", class_="date")
-
-                if title:
-                    events.append(
-                        {
-                            "title": title.get_text(strip=True),
-                            "url": title["href"] if "href" in title.attrs else "",
-                            "date": date_elem.get_text(strip=True) if date_elem else "",
-                        }
-                    )
+            events = parse_events(response.text)
 
             # Salvar eventos
             self._save_calendar_events(events)
@@ -577,7 +629,7 @@ class MoodleUAB:
             notifications_url = (
                 f"{self.base_url}/message/output/popup/notifications.php"
             )
-            response = self.session.get(notifications_url)
+            response = self._get(notifications_url)
 
             if response.status_code == 200:
                 # Tentar parsear como JSON
@@ -606,20 +658,32 @@ class MoodleUAB:
             materials = self.get_course_materials(course["id"])
 
             for material in materials:
-                if material["type"] == "pdf":
-                    filename = f"{course['id']}_{material['name']}.pdf"
-
-                    # Verificar se já foi baixado
-                    if not self._material_exists(filename):
-                        if self.download_material(material["url"], filename):
-                            downloaded.append(filename)
+                filename = self.download_new_material(course["id"], material)
+                if filename:
+                    downloaded.append(filename)
 
         return downloaded
 
-    def _material_exists(self, filename: str) -> bool:
-        """Verifica se material já foi baixado"""
-        filepath = os.path.join(self.data_dir, "materials", filename)
-        return os.path.exists(filepath)
+    def download_new_material(self, course_id: int, material: Dict) -> Union[str, None, bool]:
+        """
+        Baixa um material PDF se o recurso ainda não estiver no armazenamento
+
+        Returns:
+            Nome do arquivo baixado, None se não era preciso baixar ou False
+            se o download falhou
+        """
+        if material["type"] != "pdf":
+            return None
+
+        filename = f"{course_id}_{material['name']}.pdf"
+
+        # Recurso já guardado (mesmo que renomeado no Moodle): só atualizar o nome
+        if self.material_store.ensure_filename(material["url"], filename):
+            return None
+
+        if self.download_material(material["url"], filename, course_id=course_id, name=material["name"]):
+            return filename
+        return False
 
     def _save_courses(self, courses: List[Dict]):
         """Salva lista de cursos em arquivo"""
@@ -674,38 +738,32 @@ class MoodleUAB:
 
     def _count_downloaded_materials(self) -> int:
         """Conta materiais baixados"""
-        try:
-            materials_dir = os.path.join(self.data_dir, "materials")
-
-            if os.path.exists(materials_dir):
-                return len(
-                    [
-                        f
-                        for f in os.listdir(materials_dir)
-                        if os.path.isfile(os.path.join(materials_dir, f))
-                    ]
-                )
-
-            return 0
-
-        except:
-            return 0
+        return len(self.material_store)
 
 
 # Funções auxiliares para facilitar o uso
 
 
-def create_moodle_client(username: str = None, password: str = None) -> MoodleUAB:
+def create_moodle_client(
+    username: str = None, password: str = None, backend: str = None
+) -> MoodleUAB:
     """
     Cria e retorna uma instância do cliente Moodle
 
     Args:
         username: Nome de usuário (opcional)
         password: Senha (opcional)
+        backend: "requests" ou "browser" (por omissão MOODLE_BACKEND)
 
     Returns:
         MoodleUAB: Instância do cliente
     """
+    if (backend or MOODLE_BACKEND) == "browser":
+        # O selenium só é carregado quando este backend é pedido
+        from moodle_browser import BrowserMoodleUAB
+
+        return BrowserMoodleUAB(username, password)
+
     return MoodleUAB(username, password)
 
 
@@ -720,7 +778,7 @@ def quick_sync(username: str, password: str) -> Dict:
     Returns:
         Dict: Resumo da sincronização
     """
-    client = MoodleUAB(username, password)
+    client = create_moodle_client(username, password)
 
     results = {
         "success": False,
@@ -735,26 +793,8 @@ def quick_sync(username: str, password: str) -> Dict:
     if not client.login():
         return results
 
-    # Buscar disciplinas
-    results["courses"] = client.get_enrolled_courses()
-
-    # Buscar tarefas de cada disciplina
-    for course in results["courses"]:
-        assignments = client.get_course_assignments(course["id"])
-        results["assignments"].extend(assignments)
-
-    # Sincronizar calendário
-    results["calendar"] = client.sync_calendar()
-
-    # Verificar notificações
-    results["notifications"] = client.check_notifications()
-
-    # Baixar materiais novos
-    results["materials"] = client.auto_download_new_materials()
-
-    results["success"] = True
-
-    return results
+    # Disciplinas, calendário, notificações e materiais em paralelo
+    return MoodleCrawler(client).sync()
 
 
 if __name__ == "__main__":
@@ -768,7 +808,7 @@ if __name__ == "__main__":
 
     if username and password:
         print(f"Testando login para: {username}")
-        client = MoodleUAB(username, password)
+        client = create_moodle_client(username, password)
 
         if client.login():
             print("\n📚 Buscando disciplinas...")
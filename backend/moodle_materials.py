@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Armazenamento de materiais do Moodle endereçado por conteúdo
+
+Cada ficheiro é guardado uma única vez em .store/<sha256> e o manifest.json
+associa o URL do recurso no Moodle ao hash, tamanho e nome. O nome legível
+({course_id}_{nome}.pdf) é um hardlink para o blob, pelo que mudar o nome
+de um recurso no Moodle não provoca novo download.
+
+Downloads interrompidos ficam em .partial/, junto com o ETag ou
+Last-Modified da resposta, e são retomados com pedidos HTTP Range e
+If-Range: se o recurso mudou entretanto, o servidor envia-o completo. Só
+no fim o ficheiro é movido (os.replace) para o blob. Os downloads
+partilham um limite de débito (MOODLE_DOWNLOAD_RATE_KBPS).
+
+Ficheiros descarregados antes do armazenamento (diretamente em
+materials/) são adotados pelo manifest em vez de descarregados de novo.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+# Débito máximo somado de todos os downloads (KB/s); 0 desativa o limite
+DOWNLOAD_RATE_KBPS = float(os.getenv("MOODLE_DOWNLOAD_RATE_KBPS", "2048"))
+
+CHUNK_SIZE = 64 * 1024
+
+
+def content_range(value: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """(início, tamanho total) de um cabeçalho Content-Range (None se ausentes)"""
+    match = re.match(r"bytes\s+(?:(\d+)-\d+|\*)/(\d+|\*)", value or "")
+    if not match:
+        return None, None
+    start, total = match.groups()
+    return (int(start) if start else None), (int(total) if total != "*" else None)
+
+
+def validator(response) -> Optional[str]:
+    """Validador da resposta para If-Range: ETag forte ou Last-Modified"""
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+class RateLimiter:
+    """Token bucket partilhado entre threads (bytes por segundo)"""
+
+    def __init__(self, bytes_per_second: float):
+        self.rate = bytes_per_second
+        self._lock = threading.Lock()
+        self._tokens = bytes_per_second
+        self._last = time.monotonic()
+
+    def consume(self, amount: int):
+        """Bloqueia até `amount` bytes caberem no débito configurado"""
+        if self.rate <= 0:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait > 0:
+            time.sleep(wait)
+
+
+class MaterialStore:
+    """Materiais descarregados, deduplicados por SHA-256 do conteúdo"""
+
+    def __init__(self, root: str, rate_kbps: float = DOWNLOAD_RATE_KBPS):
+        self.root = root
+        self.blobs_dir = os.path.join(root, ".store")
+        self.partial_dir = os.path.join(root, ".partial")
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self.limiter = RateLimiter(rate_kbps * 1024)
+        self._lock = threading.Lock()
+        self._url_locks: Dict[str, threading.Lock] = {}
+
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        os.makedirs(self.partial_dir, exist_ok=True)
+
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.manifest: Dict[str, Dict] = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    def __len__(self) -> int:
+        return len(self.manifest)
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.blobs_dir, sha256)
+
+    def _save_manifest(self):
+        tmp = f"{self.manifest_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.manifest_path)
+
+    def _link(self, sha256: str, filename: str):
+        """Cria (ou substitui) o nome legível como hardlink para o blob"""
+        path = os.path.join(self.root, filename)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.link(self._blob_path(sha256), tmp)
+        except OSError:
+            # Sistemas de ficheiros sem hardlinks
+            shutil.copyfile(self._blob_path(sha256), tmp)
+        os.replace(tmp, path)
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Entrada do manifest de um recurso, se o blob ainda existir"""
+        entry = self.manifest.get(url)
+        if entry and os.path.exists(self._blob_path(entry["sha256"])):
+            return entry
+        return None
+
+    def ensure_filename(self, url: str, filename: str) -> bool:
+        """Garante o nome legível de um recurso já guardado (ex.: renomeado no Moodle)"""
+        entry = self.get(url) or self._adopt(url, filename)
+        if not entry:
+            return False
+
+        if entry["filename"] != filename or not os.path.exists(os.path.join(self.root, filename)):
+            self._link(entry["sha256"], filename)
+            with self._lock:
+                entry["filename"] = filename
+                self._save_manifest()
+        return True
+
+    def _adopt(self, url: str, filename: str) -> Optional[Dict]:
+        """Regista no manifest um ficheiro já existente em materials/
+
+        Versões anteriores guardavam os PDFs diretamente com o nome legível,
+        sem manifest; o ficheiro passa a blob (hardlink) em vez de ser
+        descarregado de novo. Nomes que já pertencem a outro recurso ficam
+        de fora.
+        """
+        path = os.path.join(self.root, filename)
+        if not os.path.isfile(path):
+            return None
+
+        with self._lock:
+            if any(entry["filename"] == filename for entry in self.manifest.values()):
+                return None
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+
+        if not os.path.exists(self._blob_path(sha256)):
+            try:
+                os.link(path, self._blob_path(sha256))
+            except OSError:
+                shutil.copyfile(path, self._blob_path(sha256))
+
+        entry = {
+            "sha256": sha256,
+            "size": os.path.getsize(path),
+            "filename": filename,
+            "downloaded_at": datetime.fromtimestamp(os.path.getmtime(path)).isoformat(),
+            "adopted": True,
+        }
+        with self._lock:
+            self.manifest[url] = entry
+            self._save_manifest()
+
+        return entry
+
+    def download(self, get, url: str, filename: str, **metadata) -> Optional[Dict]:
+        """Descarrega um recurso, retomando um download parcial anterior
+
+        get é a função de GET a usar (ex.: session.get ou MoodleUAB._get).
+
+        Returns:
+            Optional[Dict]: Entrada do manifest, ou None se falhar
+        """
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+
+        # O mesmo URL nunca é descarregado por duas threads ao mesmo tempo
+        with url_lock:
+            return self._download(get, url, filename, metadata)
+
+    def _download(self, get, url: str, filename: str, metadata: Dict) -> Optional[Dict]:
+        part_path = os.path.join(self.partial_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".part")
+        validator_path = f"{part_path}.validator"
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        part_validator = None
+        if offset and os.path.exists(validator_path):
+            with open(validator_path, "r", encoding="utf-8") as f:
+                part_validator = f.read().strip() or None
+
+        # Sem validador não há como saber se o parcial é da versão atual
+        if not part_validator:
+            offset = 0
+
+        headers = {"Range": f"bytes={offset}-", "If-Range": part_validator} if offset else {}
+        response = get(url, stream=True, headers=headers)
+        restart = False
+
+        try:
+            start, total = content_range(response.headers.get("Content-Range"))
+            if response.status_code == 206 and offset:
+                # Intervalo diferente do pedido: recomeçar do zero
+                restart = start != offset
+                mode = None if restart else "ab"
+            elif response.status_code == 200:
+                # Recurso mudou (If-Range), Range ignorado ou não havia parcial: recomeçar
+                mode, offset = "wb", 0
+                value = validator(response)
+                if value:
+                    with open(validator_path, "w", encoding="utf-8") as f:
+                        f.write(value)
+                elif os.path.exists(validator_path):
+                    os.remove(validator_path)
+            elif response.status_code == 416 and offset:
+                # Parcial já completo, se tiver o tamanho total indicado pelo servidor
+                restart = total != offset
+                mode = None
+            else:
+                return None
+
+            if mode:
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        self.limiter.consume(len(chunk))
+                        f.write(chunk)
+        finally:
+            response.close()
+
+        if restart:
+            os.remove(part_path)
+            return self._download(get, url, filename, metadata)
+
+        if os.path.exists(validator_path):
+            os.remove(validator_path)
+
+        digest = hashlib.sha256()
+        with open(part_path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+        size = os.path.getsize(part_path)
+
+        # Conteúdo já conhecido (outro URL ou nome): descartar a cópia
+        if os.path.exists(self._blob_path(sha256)):
+            os.remove(part_path)
+        else:
+            os.replace(part_path, self._blob_path(sha256))
+
+        self._link(sha256, filename)
+
+        entry = {
+            "sha256": sha256,
+            "size": size,
+            "filename": filename,
+            "downloaded_at": datetime.now().isoformat(),
+            "resumed_from": offset,
+            **metadata,
+        }
+        with self._lock:
+            self.manifest[url] = entry
+            self._save_manifest()
+
+        return entry
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Análise do HTML das páginas do Moodle UAB
+Cada tipo de página (login, painel, disciplina, fórum, notas, calendário)
+tem uma função parse_* que devolve dados simples. Com o lxml instalado a
+árvore é construída em C e os elementos são procurados por XPath, várias
+vezes mais rápido; sem ele usa-se o BeautifulSoup com html.parser,
+construindo apenas as subárvores que interessam (li.activity,
+tr.discussion, table.generaltable, div.event, ...) através de SoupStrainer.
+Os dois caminhos partilham o mesmo código de extração.
+"""
+
+import os
+import re
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Backend de análise (MOODLE_HTML_PARSER força um em particular)
+PARSER = os.getenv("MOODLE_HTML_PARSER") or ("lxml" if LXML_AVAILABLE else "html.parser")
+
+
+def with_class(tag: str, css_class: str) -> SoupStrainer:
+    """SoupStrainer equivalente ao seletor tag.css_class
+
+    Durante a análise o atributo class ainda não foi dividido em lista, pelo
+    que class_="x" só aceitaria elementos com exatamente essa classe.
+    """
+
+    def has_class(value) -> bool:
+        if not value:
+            return False
+        classes = value.split() if isinstance(value, str) else value
+        return css_class in classes
+
+    return SoupStrainer(tag, attrs={"class": has_class})
+
+
+# Subárvores construídas por tipo de página (caminho BeautifulSoup)
+LOGIN_TOKEN = SoupStrainer("input", attrs={"name": "logintoken"})
+COURSE_CARDS = with_class("div", "card-deck")
+ACTIVITIES = with_class("li", "activity")
+DISCUSSIONS = with_class("tr", "discussion")
+GRADE_TABLE = with_class("table", "generaltable")
+EVENTS = with_class("div", "event")
+
+
+def parse(html: str, only: Optional[SoupStrainer] = None, parser: str = "html.parser") -> BeautifulSoup:
+    """Árvore BeautifulSoup com só os elementos aceites por `only`"""
+    return BeautifulSoup(html, parser, parse_only=only)
+
+
+class _SoupBackend:
+    """Procura de elementos numa árvore BeautifulSoup parcial"""
+
+    def root(self, html: str, only: SoupStrainer):
+        return parse(html, only)
+
+    def find_all(self, node, tag: str, css_class: str = None) -> List:
+        return node.find_all(tag, class_=css_class) if css_class else node.find_all(tag)
+
+    def find(self, node, tag: str, css_class: str = None, href: str = None):
+        attrs = {}
+        if css_class:
+            attrs["class_"] = css_class
+        if href is not None:
+            attrs["href"] = lambda value: value is not None and href in value
+        return node.find(tag, **attrs)
+
+    def text(self, node, strip: bool = False) -> str:
+        return node.get_text(strip=strip)
+
+    def classes(self, node) -> List[str]:
+        return node.get("class", [])
+
+
+class _LxmlBackend:
+    """Procura de elementos por XPath numa árvore lxml"""
+
+    def root(self, html: str, only: SoupStrainer):
+        if not html or not html.strip():
+            html = "<html></html>"
+        return lxml.html.document_fromstring(html)
+
+    def _path(self, tag: str, css_class: str = None, href: str = None) -> str:
+        path = f".//{tag}"
+        if css_class:
+            path += f'[contains(concat(" ", normalize-space(@class), " "), " {css_class} ")]'
+        if href is not None:
+            path += f'[contains(@href, "{href}")]' if href else "[@href]"
+        return path
+
+    def find_all(self, node, tag: str, css_class: str = None) -> List:
+        return node.xpath(self._path(tag, css_class))
+
+    def find(self, node, tag: str, css_class: str = None, href: str = None):
+        found = node.xpath(self._path(tag, css_class, href) + "[1]")
+        return found[0] if found else None
+
+    def text(self, node, strip: bool = False) -> str:
+        # Só nós de texto, como o get_text() (sem comentários)
+        parts = node.xpath(".//text()")
+        return "".join(p.strip() for p in parts) if strip else "".join(parts)
+
+    def classes(self, node) -> List[str]:
+        return (node.get("class") or "").split()
+
+
+_BACKENDS = {"html.parser": _SoupBackend()}
+if LXML_AVAILABLE:
+    _BACKENDS["lxml"] = _LxmlBackend()
+
+
+def _backend(parser: str = None):
+    return _BACKENDS.get(parser or PARSER, _BACKENDS["html.parser"])
+
+
+def parse_login_token(html: str, parser: str = None) -> Optional[str]:
+    """Valor do campo logintoken do formulário de login"""
+    b = _backend(parser)
+
+    for field in b.find_all(b.root(html, LOGIN_TOKEN), "input"):
+        if field.get("name") == "logintoken":
+            return field.get("value")
+
+    return None
+
+
+def parse_courses(html: str, parser: str = None) -> List[Dict]:
+    """Disciplinas dos cartões do painel (/my/): id, nome e href"""
+    b = _backend(parser)
+    courses = []
+
+    for deck in b.find_all(b.root(html, COURSE_CARDS), "div", "card-deck"):
+        for link in b.find_all(deck, "a"):
+            href = link.get("href")
+            if not href or "/course/view.php?id=" not in href:
+                continue
+
+            course_id = re.search(r"id=(\d+)", href)
+            name = b.text(link, strip=True)
+            if course_id and name:
+                courses.append({"id": int(course_id.group(1)), "name": name, "href": href})
+
+    return courses
+
+
+def parse_activities(html: str, parser: str = None) -> List[Dict]:
+    """Atividades (li.activity) de uma página de disciplina
+
+    Cada item tem as classes do li, o nome (span.instancename), o primeiro
+    link e o texto completo com espaços normalizados (para procurar prazos).
+    """
+    b = _backend(parser)
+    activities = []
+
+    for activity in b.find_all(b.root(html, ACTIVITIES), "li", "activity"):
+        name = b.find(activity, "span", "instancename")
+        link = b.find(activity, "a", href="")
+        activities.append(
+            {
+                "classes": b.classes(activity),
+                "name": b.text(name, strip=True) if name is not None else None,
+                "href": link.get("href") if link is not None else None,
+                # Espaços normalizados: os backends tratam o texto vazio de forma diferente
+                "text": " ".join(b.text(activity).split()),
+            }
+        )
+
+    return activities
+
+
+def _int_param(href: Optional[str], name: str) -> Optional[int]:
+    match = re.search(rf"[?&;]{name}=(\d+)", href or "")
+    return int(match.group(1)) if match else None
+
+
+def parse_discussions(html: str, parser: str = None) -> List[Dict]:
+    """Discussões (tr.discussion) da página de um fórum
+
+    Além do título, url e autor, cada discussão traz o seu id (d=) e o id
+    da última mensagem (parent= na coluna "Última mensagem"), que cresce
+    com cada resposta e serve de cursor incremental. As discussões fixadas
+    (tr.pinned) ficam no topo da listagem fora da ordem das restantes.
+    """
+    b = _backend(parser)
+    discussions = []
+
+    for discussion in b.find_all(b.root(html, DISCUSSIONS), "tr", "discussion"):
+        topic = b.find(discussion, "a", "discussionname")
+        author = b.find(discussion, "a", href="/user/view.php")
+        lastpost = b.find(discussion, "td", "lastpost")
+        lastpost_link = b.find(lastpost, "a", href="parent=") if lastpost is not None else None
+
+        if topic is not None:
+            url = topic.get("href") or ""
+            discussions.append(
+                {
+                    "id": _int_param(url, "d"),
+                    "title": b.text(topic, strip=True),
+                    "url": url,
+                    "author": b.text(author, strip=True) if author is not None else "Desconhecido",
+                    "last_post_id": _int_param(
+                        lastpost_link.get("href") if lastpost_link is not None else None, "parent"
+                    ),
+                    "pinned": "pinned" in b.classes(discussion),
+                }
+            )
+
+    return discussions
+
+
+def parse_grades(html: str, parser: str = None) -> Dict[str, str]:
+    """Itens e notas da primeira table.generaltable do relatório de notas"""
+    b = _backend(parser)
+    grades = {}
+
+    table = b.find(b.root(html, GRADE_TABLE), "table", "generaltable")
+    if table is None:
+        return grades
+
+    for row in b.find_all(table, "tr"):
+        cells = b.find_all(row, "td")
+        if len(cells) >= 2:
+            grades[b.text(cells[0], strip=True)] = b.text(cells[1], strip=True)
+
+    return grades
+
+
+def parse_events(html: str, parser: str = None) -> List[Dict]:
+    """Eventos (div.event) da vista mensal do calendário"""
+    b = _backend(parser)
+    events = []
+
+    for event in b.find_all(b.root(html, EVENTS), "div", "event"):
+        title = b.find(event, "a")
+        date = b.find(event, "div", "date")
+
+        if title is not None:
+            events.append(
+                {
+                    "title": b.text(title, strip=True),
+                    "url": title.get("href") or "",
+                    "date": b.text(date, strip=True) if date is not None else "",
+                }
+            )
+
+    return events
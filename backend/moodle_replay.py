@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Moodle UAB gravado: reprodução de respostas para testes e benchmarks
+
+O ReplayAdapter é montado na sessão requests do MoodleUAB e responde a
+cada pedido com a página correspondente de um diretório de fixtures
+(fixtures/moodle por omissão), sem acesso à rede. As rotas estão em
+manifest.json (método, caminho, parâmetros opcionais, ficheiro, tipo e
+cabeçalhos como Location e Set-Cookie, para reproduzir redirecionamentos
+e cookies); quando várias rotas servem, ganha a que tem mais parâmetros
+em comum.
+Cada pedido fica registado com o tamanho da resposta e a duração, para
+medir pedidos e bytes transferidos por método.
+
+O RecordingAdapter faz o inverso: usado contra o Moodle real, grava as
+respostas e o manifest.json no mesmo formato. As gravações contêm dados
+pessoais e não devem ser publicadas sem revisão.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import weakref
+from http.client import HTTPMessage
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPHeaderDict, HTTPResponse
+
+from moodle_http import PoliteAdapter, mount_polite_adapter
+from moodle_integration import MoodleUAB
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "moodle"
+MANIFEST = "manifest.json"
+
+# Cabeçalhos gravados com cada rota (redirecionamentos e cookies da sessão)
+RECORDED_HEADERS = ("Location", "Set-Cookie")
+
+
+def _query(url) -> Dict[str, str]:
+    return {name: values[0] for name, values in parse_qs(url.query).items()}
+
+
+def load_manifest(directory) -> List[Dict]:
+    """Rotas gravadas num diretório (lista vazia se não houver manifest.json)"""
+    path = Path(directory) / MANIFEST
+    if not path.exists():
+        return []
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+class _RecordedMessage:
+    """Resposta http.client mínima com os cabeçalhos gravados
+
+    O requests só lê os Set-Cookie (para o cookie jar da sessão) a partir
+    da resposta http.client original.
+    """
+
+    def __init__(self, method: str, headers: List[List[str]]):
+        self._method = method
+        self.msg = HTTPMessage()
+        for name, value in headers:
+            self.msg[name] = value
+
+    def isclosed(self) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+
+class ReplayAdapter(HTTPAdapter):
+    """HTTPAdapter que responde a partir das páginas gravadas
+
+    Pedidos sem rota recebem 404. latency (segundos) é somada a cada
+    resposta para simular a rede, por exemplo ao medir o crawler.
+    """
+
+    def __init__(self, directory=FIXTURES_DIR, latency: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = Path(directory)
+        self.latency = latency
+        self.routes = load_manifest(self.directory)
+        self.log: List[Dict] = []
+        self._bodies: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def match(self, method: str, url: str) -> Optional[Dict]:
+        """Rota mais específica para o pedido (ou None)"""
+        parts = urlsplit(url)
+        query = _query(parts)
+        best, best_score = None, -1
+
+        for route in self.routes:
+            if route["method"] != method or route["path"] != parts.path:
+                continue
+            expected = route.get("query") or {}
+            if any(query.get(name) != str(value) for name, value in expected.items()):
+                continue
+            if len(expected) > best_score:
+                best, best_score = route, len(expected)
+
+        return best
+
+    def _body(self, filename: str) -> bytes:
+        with self._lock:
+            if filename not in self._bodies:
+                self._bodies[filename] = (self.directory / filename).read_bytes()
+            return self._bodies[filename]
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        route = self.match(request.method, request.url)
+
+        if route is None:
+            status, body, content_type, recorded = 404, b"", "text/html; charset=utf-8", []
+        else:
+            status = route.get("status", 200)
+            body = self._body(route["file"])
+            content_type = route.get("content_type", "text/html; charset=utf-8")
+            recorded = route.get("headers", [])
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        headers = HTTPHeaderDict({"Content-Type": content_type, "Content-Length": str(len(body))})
+        for name, value in recorded:
+            headers.add(name, value)
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers=headers,
+            status=status,
+            preload_content=False,
+            original_response=_RecordedMessage(request.method, recorded),
+        )
+        response = self.build_response(request, raw)
+
+        with self._lock:
+            self.log.append(
+                {
+                    "method": request.method,
+                    "path": urlsplit(request.url).path,
+                    "status": status,
+                    "bytes": len(body),
+                    "seconds": time.perf_counter() - started,
+                }
+            )
+        return response
+
+    def totals(self) -> Dict:
+        """Pedidos, bytes recebidos e segundos passados no adaptador até agora"""
+        with self._lock:
+            return {
+                "requests": len(self.log),
+                "bytes": sum(entry["bytes"] for entry in self.log),
+                "seconds": sum(entry["seconds"] for entry in self.log),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.log.clear()
+
+
+class RecordingAdapter(PoliteAdapter):
+    """PoliteAdapter que grava as respostas (e o manifest.json) num diretório"""
+
+    def __init__(self, directory, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.routes = load_manifest(self.directory)
+        self._record_lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if kwargs.get("stream"):
+            # Downloads de materiais não são gravados
+            return response
+
+        url = urlsplit(request.url)
+        query = _query(url)
+        key = f"{request.method} {url.path} {sorted(query.items())}"
+        slug = re.sub(r"[^a-z0-9]+", "_", url.path.lower()).strip("_") or "index"
+        filename = f"{slug}_{hashlib.sha1(key.encode()).hexdigest()[:8]}"
+        content_type = response.headers.get("Content-Type", "text/html; charset=utf-8")
+        filename += ".json" if "json" in content_type else ".html"
+
+        route = {"method": request.method, "path": url.path, "file": filename}
+        if query:
+            route["query"] = query
+        if response.status_code != 200:
+            route["status"] = response.status_code
+        if not content_type.startswith("text/html"):
+            route["content_type"] = content_type
+        headers = [
+            [name, value]
+            for name in RECORDED_HEADERS
+            for value in response.raw.headers.getlist(name)
+        ]
+        if headers:
+            route["headers"] = headers
+
+        with self._record_lock:
+            (self.directory / filename).write_bytes(response.content)
+            self.routes = [
+                r for r in self.routes
+                if (r["method"], r["path"], r.get("query") or {}) != (request.method, url.path, query)
+            ] + [route]
+
+            tmp = self.directory / f"{MANIFEST}.tmp"
+            tmp.write_text(json.dumps(self.routes, indent=2, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.directory / MANIFEST)
+
+        return response
+
+
+def replay_client(directory=FIXTURES_DIR, latency: float = 0.0, data_dir: str = None):
+    """MoodleUAB ligado a um ReplayAdapter (nenhum pedido sai para a rede)
+
+    Sem data_dir, session.json, a cache HTTP e os materiais ficam num
+    diretório temporário apagado com o cliente, nunca em data/moodle.
+
+    Returns:
+        (MoodleUAB, ReplayAdapter)
+    """
+    tmp = None
+    if data_dir is None:
+        tmp = tempfile.TemporaryDirectory(prefix="moodle_replay_")
+        data_dir = tmp.name
+
+    client = MoodleUAB("aluno", "segredo", data_dir=data_dir)
+    if tmp is not None:
+        weakref.finalize(client, tmp.cleanup)
+    adapter = mount_polite_adapter(client.session, ReplayAdapter(directory, latency=latency))
+    return client, adapter
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estado persistente da sincronização com o Moodle UAB
+
+Disciplinas, atividades (tarefas e materiais), eventos do calendário,
+discussões de fóruns e notas ficam em tabelas moodle_* de estudos.db, uma
+linha por item com o JSON do item, o seu hash e as datas first_seen,
+last_seen e changed_at. Cada sincronização compara os hashes com os da
+anterior: itens iguais só atualizam last_seen, pelo que a sincronização
+delta processa apenas o que é novo ou mudou e "o que há de novo desde
+ontem" é uma consulta por changed_at.
+
+Cada fórum tem ainda um cursor (moodle_forum_cursors) com o maior id de
+mensagem já visto: a listagem seguinte só é percorrida até chegar a
+discussões já conhecidas.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Tipo de item -> função que devolve a chave natural do item
+KINDS: Dict[str, Callable[[Dict], str]] = {
+    "courses": lambda item: str(item["id"]),
+    "activities": lambda item: item.get("url") or f"{item.get('course_id')}:{item['name']}",
+    "events": lambda item: item.get("url") or f"{item.get('date')}:{item['title']}",
+    "forum_discussions": lambda item: item.get("url") or f"{item.get('forum_id')}:{item['title']}",
+    "grades": lambda item: f"{item['course_id']}:{item['item']}",
+}
+
+# Lado "IN (...)" de cada consulta de hashes (abaixo do limite do SQLite)
+LOOKUP_CHUNK = 500
+
+
+def sql_moodle_state() -> str:
+    """SQL das tabelas moodle_* (uma por tipo de item)"""
+    parts = []
+
+    for kind in KINDS:
+        parts.append(f"""
+    CREATE TABLE IF NOT EXISTS moodle_{kind} (
+        item_key TEXT PRIMARY KEY,
+        course_id INTEGER,
+        data TEXT NOT NULL,
+        hash TEXT NOT NULL,
+        first_seen TIMESTAMP NOT NULL,
+        last_seen TIMESTAMP NOT NULL,
+        changed_at TIMESTAMP NOT NULL
+    ) WITHOUT ROWID;
+
+    CREATE INDEX IF NOT EXISTS idx_moodle_{kind}_changed
+        ON moodle_{kind} (changed_at);
+""")
+
+    return "".join(parts)
+
+
+def sql_forum_cursors() -> str:
+    """SQL da tabela de cursores incrementais dos fóruns"""
+    return """
+    CREATE TABLE IF NOT EXISTS moodle_forum_cursors (
+        forum_id TEXT PRIMARY KEY,
+        course_id INTEGER,
+        last_post_id INTEGER NOT NULL,
+        last_discussion_id INTEGER,
+        updated_at TIMESTAMP NOT NULL
+    ) WITHOUT ROWID;
+"""
+
+
+def post_marker(discussion: Dict) -> int:
+    """Posição de uma discussão no cursor: id da última mensagem (ou da discussão)"""
+    return discussion.get("last_post_id") or discussion.get("id") or 0
+
+
+def item_hash(item: Dict) -> str:
+    """Hash estável do conteúdo de um item (independente da ordem das chaves)"""
+    data = json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def grade_items(course_id: int, grades: Dict[str, str]) -> List[Dict]:
+    """Converte o dicionário de get_grades em itens com chave própria"""
+    return [{"course_id": course_id, "item": name, "grade": value} for name, value in grades.items()]
+
+
+class MoodleState:
+    """Registo dos itens vistos nas sincronizações, sobre uma conexão SQLite
+
+    connect é chamado para obter uma conexão (ex.: do pool de database.py),
+    que é fechada no fim de cada operação.
+    """
+
+    def __init__(self, connect: Callable):
+        self.connect = connect
+
+    def record(
+        self, kind: str, items: Iterable[Dict], seen_at: Optional[str] = None, dry_run: bool = False
+    ) -> Dict:
+        """Grava os itens de uma sincronização e separa os novos/alterados
+
+        Com dry_run só separa, sem gravar (ex.: materiais que só ficam
+        registados depois de descarregados).
+
+        Returns:
+            Dict: "new" e "changed" (listas de itens) e "unchanged" (contagem)
+        """
+        key_of = KINDS[kind]
+        now = seen_at or datetime.now().isoformat(timespec="seconds")
+
+        # Um item repetido na mesma sincronização conta uma vez
+        incoming: Dict[str, Dict] = {}
+        for item in items:
+            incoming[key_of(item)] = item
+
+        result = {"new": [], "changed": [], "unchanged": 0}
+        if not incoming:
+            return result
+
+        conn = self.connect()
+        try:
+            if not dry_run:
+                conn.execute("BEGIN IMMEDIATE")
+
+            keys = list(incoming)
+            known = {}
+            for i in range(0, len(keys), LOOKUP_CHUNK):
+                chunk = keys[i : i + LOOKUP_CHUNK]
+                known.update(
+                    conn.execute(
+                        f"SELECT item_key, hash FROM moodle_{kind} "
+                        f"WHERE item_key IN ({', '.join('?' for _ in chunk)})",
+                        chunk,
+                    ).fetchall()
+                )
+
+            upserts, seen = [], []
+            for key, item in incoming.items():
+                digest = item_hash(item)
+                if known.get(key) == digest:
+                    seen.append((now, key))
+                    result["unchanged"] += 1
+                    continue
+
+                result["changed" if key in known else "new"].append(item)
+                upserts.append(
+                    (
+                        key,
+                        item.get("course_id", item.get("id") if kind == "courses" else None),
+                        json.dumps(item, ensure_ascii=False, default=str),
+                        digest,
+                        now,
+                        now,
+                        now,
+                    )
+                )
+
+            if dry_run:
+                return result
+
+            conn.executemany(
+                f"""
+                INSERT INTO moodle_{kind}
+                    (item_key, course_id, data, hash, first_seen, last_seen, changed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(item_key) DO UPDATE SET
+                    course_id = excluded.course_id,
+                    data = excluded.data,
+                    hash = excluded.hash,
+                    last_seen = excluded.last_seen,
+                    changed_at = excluded.changed_at
+                """,
+                upserts,
+            )
+            conn.executemany(f"UPDATE moodle_{kind} SET last_seen = ? WHERE item_key = ?", seen)
+            conn.commit()
+        finally:
+            conn.close()
+
+        return result
+
+    def changes_since(self, since: str, kinds: Optional[Iterable[str]] = None) -> Dict[str, List[Dict]]:
+        """Itens novos ou alterados desde `since` (ISO), por tipo
+
+        Cada item traz "status" ("new" ou "changed") e "changed_at".
+        """
+        changes = {}
+
+        conn = self.connect()
+        try:
+            for kind in kinds or KINDS:
+                rows = conn.execute(
+                    f"""
+                    SELECT data, first_seen, changed_at FROM moodle_{kind}
+                    WHERE changed_at >= ?
+                    ORDER BY changed_at DESC
+                    """,
+                    (since,),
+                ).fetchall()
+
+                changes[kind] = [
+                    {
+                        **json.loads(data),
+                        "status": "new" if first_seen >= since else "changed",
+                        "changed_at": changed_at,
+                    }
+                    for data, first_seen, changed_at in rows
+                ]
+        finally:
+            conn.close()
+
+        return changes
+
+    def items(self, kind: str, course_id: Optional[int] = None) -> List[Dict]:
+        """Itens guardados de um tipo (opcionalmente de uma disciplina), mais recentes primeiro"""
+        query = f"SELECT data FROM moodle_{kind}"
+        params = ()
+        if course_id is not None:
+            query += " WHERE course_id = ?"
+            params = (course_id,)
+
+        conn = self.connect()
+        try:
+            rows = conn.execute(query + " ORDER BY changed_at DESC", params).fetchall()
+        finally:
+            conn.close()
+
+        return [json.loads(data) for (data,) in rows]
+
+    def forum_cursors(self, forum_ids: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Maior id de mensagem já visto por fórum"""
+        conn = self.connect()
+        try:
+            rows = conn.execute("SELECT forum_id, last_post_id FROM moodle_forum_cursors").fetchall()
+        finally:
+            conn.close()
+
+        cursors = dict(rows)
+        if forum_ids is not None:
+            cursors = {forum_id: cursors[forum_id] for forum_id in map(str, forum_ids) if forum_id in cursors}
+        return cursors
+
+    def advance_forum_cursors(
+        self,
+        discussions: Iterable[Dict],
+        seen_at: Optional[str] = None,
+        complete: Optional[Iterable[str]] = None,
+    ):
+        """Avança o cursor de cada fórum até à discussão mais recente vista
+
+        Deve ser chamado depois de as discussões terem sido gravadas com
+        record(), para que um erro a meio não salte mensagens. Com complete
+        (MoodleUAB.get_forum_updates), só avançam os fóruns lidos até ao fim.
+        """
+        now = seen_at or datetime.now().isoformat(timespec="seconds")
+        newest: Dict[str, List] = {}
+        complete = None if complete is None else set(map(str, complete))
+
+        for discussion in discussions:
+            forum_id = str(discussion["forum_id"])
+            if complete is not None and forum_id not in complete:
+                continue
+            marker = post_marker(discussion)
+            current = newest.setdefault(forum_id, [discussion.get("course_id"), 0, 0])
+            current[1] = max(current[1], marker)
+            current[2] = max(current[2], discussion.get("id") or 0)
+
+        if not newest:
+            return
+
+        conn = self.connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                """
+                INSERT INTO moodle_forum_cursors
+                    (forum_id, course_id, last_post_id, last_discussion_id, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(forum_id) DO UPDATE SET
+                    course_id = COALESCE(excluded.course_id, course_id),
+                    last_post_id = MAX(last_post_id, excluded.last_post_id),
+                    last_discussion_id = MAX(COALESCE(last_discussion_id, 0), excluded.last_discussion_id),
+                    updated_at = excluded.updated_at
+                """,
+                [
+                    (forum_id, course_id, last_post_id, last_discussion_id, now)
+                    for forum_id, (course_id, last_post_id, last_discussion_id) in newest.items()
+                ],
+            )
+            conn.commit()
+        finally:
+            conn.close()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Paginação por chave (keyset) e projeção de campos para as listagens da API
+
+O cursor é opaco para o cliente: contém os valores da chave de ordenação
+da última linha devolvida, e a página seguinte começa logo a seguir a ela.
+Assim cada página custa o mesmo, independentemente do histórico guardado.
+"""
+
+import base64
+import json
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+
+
+class ErroPaginacao(ValueError):
+    """Parâmetros de paginação inválidos (devolvido ao cliente como 400)"""
+
+
+def codificar_cursor(valores: Sequence) -> str:
+    """Codifica os valores da chave de ordenação num cursor opaco"""
+    texto = json.dumps(list(valores), separators=(",", ":"))
+    return base64.urlsafe_b64encode(texto.encode("utf-8")).decode("ascii")
+
+
+def decodificar_cursor(cursor: str, tamanho: int) -> List:
+    """Decodifica um cursor, validando o número de valores da chave"""
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ErroPaginacao("Cursor inválido")
+
+    if not isinstance(valores, list) or len(valores) != tamanho:
+        raise ErroPaginacao("Cursor inválido")
+
+    return valores
+
+
+def ler_limite(valor: Optional[str]) -> int:
+    """Lê o parâmetro limit, aplicando o padrão e o máximo"""
+    if valor is None or valor == "":
+        return LIMITE_PADRAO
+
+    try:
+        limite = int(valor)
+    except ValueError:
+        raise ErroPaginacao("Parâmetro limit inválido")
+
+    if limite < 1:
+        raise ErroPaginacao("Parâmetro limit inválido")
+
+    return min(limite, LIMITE_MAXIMO)
+
+
+def ler_campos(valor: Optional[str], permitidos: Iterable[str]) -> List[str]:
+    """Lê o parâmetro fields (lista separada por vírgulas) contra as colunas permitidas"""
+    permitidos = list(permitidos)
+    if not valor:
+        return permitidos
+
+    campos = [c.strip() for c in valor.split(",") if c.strip()]
+    invalidos = [c for c in campos if c not in permitidos]
+    if invalidos or not campos:
+        raise ErroPaginacao(f"Campos inválidos: {', '.join(invalidos) or valor}")
+
+    return campos
+
+
+def condicao_keyset(chaves: Sequence[Tuple[str, str]], valores: Sequence) -> Tuple[str, List]:
+    """Condição SQL para as linhas posteriores a `valores` na ordem de `chaves`
+
+    Suporta direções mistas (ASC/DESC) expandindo a comparação de tuplos:
+    (a > ?) OR (a = ? AND b < ?) OR (a = ? AND b = ? AND c > ?) ...
+    """
+    alternativas = []
+    params: List = []
+
+    for i, (expr, direcao) in enumerate(chaves):
+        partes = [f"{chaves[j][0]} = ?" for j in range(i)]
+        partes.append(f"{expr} {'<' if direcao == 'DESC' else '>'} ?")
+        alternativas.append("(" + " AND ".join(partes) + ")")
+        params.extend(valores[: i + 1])
+
+    return "(" + " OR ".join(alternativas) + ")", params
+
+
+def consultar_pagina(
+    conn,
+    tabela: str,
+    where: str,
+    params: List,
+    chaves: Sequence[Tuple[str, str]],
+    campos: List[str],
+    limite: int,
+    cursor: Optional[str] = None,
+) -> Dict:
+    """Executa uma consulta paginada por chave e devolve itens e próximo cursor
+
+    `tabela`, `where`, `chaves` e `campos` são interpolados no SQL e têm de
+    vir do código (os campos pedidos pelo cliente passam por ler_campos).
+    """
+    params = list(params)
+
+    if cursor:
+        condicao, params_cursor = condicao_keyset(
+            chaves, decodificar_cursor(cursor, len(chaves))
+        )
+        where += f" AND {condicao}"
+        params.extend(params_cursor)
+
+    colunas = ", ".join(
+        campos + [f"{expr} AS _chave{i}" for i, (expr, _) in enumerate(chaves)]
+    )
+    ordem = ", ".join(f"{expr} {direcao}" for expr, direcao in chaves)
+
+    linhas = conn.execute(
+        f"SELECT {colunas} FROM {tabela} WHERE {where} ORDER BY {ordem} LIMIT ?",
+        params + [limite + 1],
+    ).fetchall()
+
+    ha_mais = len(linhas) > limite
+    linhas = linhas[:limite]
+
+    proximo = None
+    if ha_mais and linhas:
+        ultima = linhas[-1]
+        proximo = codificar_cursor([ultima[f"_chave{i}"] for i in range(len(chaves))])
+
+    return {
+        "items": [{campo: linha[campo] for campo in campos} for linha in linhas],
+        "next_cursor": proximo,
+        "limit": limite,
+    }
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cálculo de progresso das disciplinas
+Partilhado por /api/dashboard, /api/disciplinas e pelos scripts de teste
+"""
+
+from typing import Dict, List
+
+# Semanas de trabalho consideradas por crédito ECTS
+SEMANAS_POR_CREDITO = 26
+
+# Pesos do progresso final quando a disciplina tem AFs
+PESO_TEMPO = 0.7
+PESO_AFS = 0.3
+
+
+def obter_totais(conn) -> Dict[str, Dict]:
+    """Obtém sessões e AFs de todas as disciplinas numa única consulta agrupada
+
+    Os totais de sessões vêm de contadores_estudo, mantidos por triggers,
+    pelo que a leitura não percorre sessoes_estudo.
+    """
+    linhas = conn.execute("""
+        SELECT disciplina_id,
+               SUM(total_sessoes) as total_sessoes,
+               SUM(total_minutos) as total_minutos,
+               MAX(ultimo_estudo) as ultimo_estudo,
+               SUM(total_afs) as total_afs,
+               SUM(afs_concluidas) as afs_concluidas
+        FROM (
+            SELECT disciplina_id, total_sessoes, total_minutos, ultimo_estudo,
+                   0 as total_afs, 0 as afs_concluidas
+            FROM contadores_estudo
+            UNION ALL
+            SELECT disciplina_id, 0, 0, NULL,
+                   COUNT(*), SUM(CASE WHEN concluida = 1 THEN 1 ELSE 0 END)
+            FROM tarefas
+            WHERE tipo = 'forum'
+            GROUP BY disciplina_id
+        )
+        GROUP BY disciplina_id
+    """).fetchall()
+
+    return {
+        linha["disciplina_id"]: {
+            "total_sessoes": linha["total_sessoes"] or 0,
+            "total_minutos": linha["total_minutos"] or 0,
+            "ultimo_estudo": linha["ultimo_estudo"],
+            "total_afs": linha["total_afs"] or 0,
+            "afs_concluidas": linha["afs_concluidas"] or 0,
+        }
+        for linha in linhas
+    }
+
+
+def calcular_progresso(totais: Dict, creditos: int = 6) -> Dict:
+    """Aplica a fórmula 70% tempo + 30% AFs aos totais de uma disciplina"""
+    total_sessoes = totais.get("total_sessoes", 0)
+    total_minutos = totais.get("total_minutos", 0)
+    total_afs = totais.get("total_afs", 0)
+    afs_concluidas = totais.get("afs_concluidas", 0)
+
+    # Progresso de tempo: minutos estudados / (créditos * 26 semanas * 60 minutos)
+    progresso_tempo = (
+        min((total_minutos / (creditos * SEMANAS_POR_CREDITO * 60)) * 100, 100)
+        if total_minutos > 0
+        else 0
+    )
+
+    # Progresso de AFs (Atividades Formativas)
+    progresso_afs = (afs_concluidas / total_afs * 100) if total_afs > 0 else 0
+
+    # Progresso final: 70% tempo + 30% AFs (se houver AFs)
+    if total_afs > 0:
+        progresso_final = (progresso_tempo * PESO_TEMPO) + (progresso_afs * PESO_AFS)
+    else:
+        progresso_final = progresso_tempo
+
+    return {
+        "total_sessoes": total_sessoes,
+        "total_minutos": total_minutos,
+        "ultimo_estudo": totais.get("ultimo_estudo"),
+        "progresso_tempo": progresso_tempo,
+        "total_afs": total_afs,
+        "afs_concluidas": afs_concluidas,
+        "progresso_afs": progresso_afs,
+        "progresso": round(progresso_final, 2),
+    }
+
+
+def calcular_progresso_disciplinas(conn, disciplinas: List[Dict]) -> Dict[str, Dict]:
+    """Calcula o progresso de todas as disciplinas, indexado por id"""
+    totais = obter_totais(conn)
+
+    return {
+        disc["id"]: calcular_progresso(
+            totais.get(disc["id"], {}), disc.get("creditos", 6)
+        )
+        for disc in disciplinas
+    }
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Script para testar o calendário do semestre (semanas e prazos)
+"""
+import sys
+from datetime import date
+sys.path.insert(0, '.')
+from calendario_semestre import CalendarioSemestre, calcular_inicio_semestre
+
+DADOS = {
+    "semestre": "2º ano - 1º semestre",
+    "ano_letivo": "2025/2026",
+    "disciplinas": [
+        {
+            "id": "21053", "sigla": "FBD", "nome": "Fundamentos de Bases de Dados",
+            "e_folios": [
+                {"tipo": "e-fólio A", "semana": 8, "data": "24 novembro", "peso": 40},
+                {"tipo": "e-fólio B", "semana": 13, "data": "12 janeiro", "peso": 60},
+            ],
+            "sessoes_sincronas": [{"data": "8 outubro", "semana": 1}],
+            "plano_trabalho": {"semanas": [
+                {"numero": 1, "data": "06 de outubro de 2025", "topico": "Introdução"},
+                {"numero": 2, "data": "2025-10-13", "topico": "SQL"},
+            ]},
+        }
+    ],
+}
+
+def test_calendario_semestre():
+    print("=" * 80)
+    print("TESTE DO CALENDÁRIO DO SEMESTRE")
+    print("=" * 80)
+
+    calendario = CalendarioSemestre(DADOS)
+    print(f"\n1. Início do semestre: {calendario.inicio}")
+    assert calendario.inicio == date(2025, 9, 29)
+    assert calcular_inicio_semestre({"inicio_semestre": "2026-02-23"}) == date(2026, 2, 23)
+
+    assert calendario.semana_atual(date(2025, 10, 5)) == 0
+    assert calendario.semana_atual(date(2025, 10, 6)) == 1
+    assert calendario.semana_atual(date(2025, 9, 1)) == 0
+    assert calendario.semana_atual(date(2026, 6, 1)) == 14
+    print("2. Semana atual calculada pelos limites das semanas")
+
+    semana_1 = [(i["tipo"], i["data"]) for i in calendario.itens_semana(1)]
+    print(f"3. Itens da semana 1: {semana_1}")
+    assert semana_1 == [("plano", "2025-10-06"), ("sessao-sincrona", "2025-10-08")]
+
+    prazos = calendario.proximos_prazos(2, desde=date(2025, 10, 9))
+    print(f"4. Próximos prazos: {[(p['titulo'], p['data']) for p in prazos]}")
+    assert [p["data"] for p in prazos] == ["2025-11-24", "2026-01-12"]
+
+    assert calendario.converter_data("12 janeiro") == "2026-01-12"
+    assert calendario.converter_data("02-02-2027") == "2027-02-02"
+    assert calendario.converter_data("") is None
+
+    print("\n✅ TESTE CONCLUÍDO")
+
+if __name__ == "__main__":
+    test_calendario_semestre()
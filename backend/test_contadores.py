@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Script para testar se os contadores de estudo acompanham as escritas de sessões
+"""
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, '.')
+import app as app_module
+from app import app
+from contadores import reconstruir_contadores, verificar_contadores
+from database import fechar_pool
+
+def test_contadores():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_original = app_module.DB_PATH
+        app_module.DB_PATH = Path(tmp) / "estudos.db"
+        app_module.init_db()
+
+        try:
+            with app.test_client() as client:
+                print("=" * 80)
+                print("TESTE DE CONTADORES DE ESTUDO")
+                print("=" * 80)
+
+                # Criar sessões
+                ids = []
+                for dia, minutos in [("2025-10-06", 25), ("2025-10-07", 50)]:
+                    response = client.post('/api/sessoes', json={
+                        "disciplina_id": "21053",
+                        "data": dia,
+                        "hora_inicio": "19:00",
+                        "duracao_minutos": minutos,
+                    })
+                    ids.append(response.get_json()["id"])
+
+                conn = app_module.get_db_connection()
+                contador = conn.execute(
+                    "SELECT * FROM contadores_estudo WHERE disciplina_id = '21053'"
+                ).fetchone()
+                print(f"\n1. Após inserir: {dict(contador)}")
+                assert contador["total_sessoes"] == 2
+                assert contador["total_minutos"] == 75
+                assert contador["ultimo_estudo"] == "2025-10-07 19:00"
+
+                # Atualizar duração
+                client.put(f'/api/sessoes/{ids[0]}', json={"duracao_minutos": 30})
+                contador = conn.execute(
+                    "SELECT * FROM contadores_estudo WHERE disciplina_id = '21053'"
+                ).fetchone()
+                print(f"2. Após atualizar: {dict(contador)}")
+                assert contador["total_minutos"] == 80
+
+                # Apagar a sessão mais recente
+                client.delete(f'/api/sessoes/{ids[1]}')
+                contador = conn.execute(
+                    "SELECT * FROM contadores_estudo WHERE disciplina_id = '21053'"
+                ).fetchone()
+                print(f"3. Após apagar: {dict(contador)}")
+                assert contador["total_sessoes"] == 1
+                assert contador["total_minutos"] == 30
+                assert contador["ultimo_estudo"] == "2025-10-06 19:00"
+
+                # Consistência com as sessões e reconstrução
+                assert verificar_contadores(conn) == []
+                conn.execute("UPDATE contadores_estudo SET total_minutos = 999")
+                conn.commit()
+                assert verificar_contadores(conn) != []
+                reconstruir_contadores(conn)
+                assert verificar_contadores(conn) == []
+                print("4. Reconstrução repõe contadores consistentes")
+
+                # Estatísticas a partir dos totais diários
+                for dia in ("2025-10-08", "2025-10-13", "2025-11-03"):
+                    client.post('/api/sessoes', json={
+                        "disciplina_id": "21111", "data": dia,
+                        "hora_inicio": "20:00", "duracao_minutos": 60,
+                    })
+                assert verificar_contadores(conn) == []
+
+                url = '/api/estatisticas?from=2025-10-01&to=2025-11-30'
+                por_dia = client.get(url).get_json()["horas_por_dia"]
+                por_semana = client.get(url + '&granularity=week').get_json()["horas_por_dia"]
+                por_mes = client.get(url + '&granularity=month').get_json()["horas_por_dia"]
+                print(f"5. Semanas: {por_semana}")
+                assert len(por_dia) == 4
+                assert [p["data"] for p in por_semana] == ["2025-10-06", "2025-10-13", "2025-11-03"]
+                assert por_semana[0]["total_horas"] == 1.5
+                assert [(p["data"], p["total_horas"]) for p in por_mes] == [("2025-10-01", 2.5), ("2025-11-01", 1.0)]
+                assert client.get('/api/estatisticas?granularity=ano').status_code == 400
+
+                conn.close()
+                print("\n✅ TESTE CONCLUÍDO")
+        finally:
+            fechar_pool(app_module.DB_PATH)
+            app_module.DB_PATH = db_original
+
+if __name__ == "__main__":
+    test_contadores()
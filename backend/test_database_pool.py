@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Script para testar que o teardown do pedido não devolve conexões já reutilizadas
+"""
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, '.')
+import app as app_module
+from app import app
+from database import fechar_pool
+
+def test_database_pool():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_original = app_module.DB_PATH
+        app_module.DB_PATH = Path(tmp) / "estudos.db"
+        app_module.init_db()
+
+        try:
+            print("=" * 80)
+            print("TESTE DO POOL DE CONEXÕES NO TEARDOWN DO PEDIDO")
+            print("=" * 80)
+
+            # Pedido A devolve a conexão a meio; B recebe-a e abre uma transação
+            contexto_a = app.app_context()
+            contexto_a.push()
+            conn_a = app_module.get_db_connection()
+            conn_a.close()
+
+            conn_b = app_module.obter_conexao(app_module.DB_PATH)
+            conn_b.execute("BEGIN IMMEDIATE")
+            conn_b.execute("INSERT INTO tarefas (disciplina_id, titulo) VALUES ('FBD', 'Em curso')")
+
+            # Teardown de A: não pode tocar na conexão que agora é de B
+            contexto_a.pop()
+            print(f"\n1. Mesma conexão: {conn_a is conn_b}, transação de B intacta: {conn_b.in_transaction}")
+            assert conn_a is conn_b and conn_b.in_transaction
+
+            conn_c = app_module.obter_conexao(app_module.DB_PATH)
+            print(f"2. C recebeu a conexão de B ainda em uso: {conn_c is conn_b}")
+            assert conn_c is not conn_b
+            conn_c.close()
+
+            conn_b.commit()
+            conn_b.close()
+
+            # Conexão não fechada pelo pedido volta ao pool no teardown
+            with app.app_context():
+                conn_d = app_module.get_db_connection()
+            print(f"3. Conexão esquecida devolvida no teardown: {not conn_d.em_uso}")
+            assert not conn_d.em_uso
+        finally:
+            fechar_pool(app_module.DB_PATH)
+            app_module.DB_PATH = db_original
+
+    print("\n✅ TESTE CONCLUÍDO")
+
+if __name__ == "__main__":
+    test_database_pool()
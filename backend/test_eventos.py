@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Script para testar as notificações SSE (/api/events e eventos.Broker)
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.insert(0, '.')
+import app as app_module
+from app import app
+from database import fechar_pool
+from eventos import FILA_MAXIMA, broker, publicar
+
+def test_eventos():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_original = app_module.DB_PATH
+        app_module.DB_PATH = Path(tmp) / "estudos.db"
+        app_module.init_db()
+
+        try:
+            with app.test_client() as client:
+                print("=" * 80)
+                print("TESTE DAS NOTIFICAÇÕES SSE")
+                print("=" * 80)
+
+                # Uma escrita publica o evento para os clientes ligados
+                fila = broker.subscrever()
+                tarefa = client.post('/api/tarefas', json={"disciplina_id": "21053", "titulo": "Ler capítulo 2"}).get_json()
+                evento = fila.get(timeout=1)
+                print(f"\n1. Evento da escrita: {evento}")
+                assert evento["tipo"] == "tarefa_criada" and evento["dados"]["id"] == tarefa["id"]
+                broker.cancelar(fila)
+
+                # Cliente que se religa recebe o que perdeu desde Last-Event-ID
+                client.put(f'/api/tarefas/{tarefa["id"]}', json={"titulo": "Ler capítulo 2", "concluida": 1})
+                client.delete(f'/api/tarefas/{tarefa["id"]}')
+                clientes = broker.total_clientes
+                resposta = client.get('/api/events', headers={"Last-Event-ID": str(evento["id"])}, buffered=False)
+                corpo = iter(resposta.response)
+                partes = [next(corpo) for _ in range(3)]
+                partes = [p.decode() if isinstance(p, bytes) else p for p in partes]
+                print(f"2. Reenviado após Last-Event-ID {evento['id']}: {[p.splitlines()[1] for p in partes[1:]]}")
+                assert resposta.mimetype == "text/event-stream" and partes[0] == "retry: 5000\n\n"
+                assert partes[1].startswith(f"id: {evento['id'] + 1}\nevent: tarefa_concluida\n")
+                assert partes[2].startswith(f"id: {evento['id'] + 2}\nevent: tarefa_removida\n")
+                assert broker.total_clientes == clientes + 1
+                resposta.close()
+                assert broker.total_clientes == clientes
+
+                # Um cliente parado (fila cheia) não atrasa as escritas nem os outros clientes
+                parado, ativo = broker.subscrever(), broker.subscrever()
+                for n in range(FILA_MAXIMA):
+                    publicar("teste", {"n": n})
+                while not ativo.empty():
+                    ativo.get_nowait()
+
+                inicio = time.perf_counter()
+                client.post('/api/sessoes', json={"disciplina_id": "21053", "data": "2025-10-01",
+                                                  "hora_inicio": "19:00", "duracao_minutos": 25})
+                duracao = time.perf_counter() - inicio
+                evento = ativo.get(timeout=1)
+                print(f"3. Escrita com um cliente parado: {duracao * 1000:.0f}ms, "
+                      f"fila parada {parado.qsize()}/{FILA_MAXIMA}, ativo recebeu {evento['tipo']}")
+                assert duracao < 1 and parado.full() and evento["tipo"] == "sessao_criada"
+                broker.cancelar(parado)
+                broker.cancelar(ativo)
+
+                print("\n✅ TESTE CONCLUÍDO")
+        finally:
+            fechar_pool(app_module.DB_PATH)
+            app_module.DB_PATH = db_original
+
+if __name__ == "__main__":
+    test_eventos()
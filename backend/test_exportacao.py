@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Script para testar a exportação e importação em streaming do histórico
+"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, '.')
+import app as app_module
+from app import app
+from database import fechar_pool
+
+def test_exportacao():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_original = app_module.DB_PATH
+
+        try:
+            with app.test_client() as client:
+                print("=" * 80)
+                print("TESTE DE EXPORTAÇÃO E IMPORTAÇÃO")
+                print("=" * 80)
+
+                app_module.DB_PATH = Path(tmp) / "origem.db"
+                app_module.init_db()
+
+                client.post('/api/sessoes/batch', json=[
+                    {"disciplina_id": "21053", "data": f"2025-10-{dia:02d}",
+                     "hora_inicio": "19:00", "duracao_minutos": 30}
+                    for dia in range(1, 29)
+                ])
+                client.post('/api/tarefas', json={"disciplina_id": "21053", "titulo": "Ler capítulo 1"})
+                client.put('/api/progresso/21053/1', json={"progresso_percentual": 50})
+
+                resposta = client.get('/api/export?format=ndjson')
+                exportado = resposta.get_data()
+                linhas = exportado.decode("utf-8").splitlines()
+                print(f"\n1. Exportadas {len(linhas)} linhas")
+                assert resposta.mimetype == "application/x-ndjson"
+                assert len(linhas) == 30
+                assert {json.loads(l)["tabela"] for l in linhas} == {"sessoes_estudo", "tarefas", "progresso_topicos"}
+
+                csv = client.get('/api/export?format=csv&tables=sessoes_estudo').get_data(as_text=True)
+                assert csv.splitlines()[0].startswith("id,disciplina_id,data")
+                assert len(csv.splitlines()) == 29
+                assert client.get('/api/export?format=csv').status_code == 400
+                print("2. CSV de uma tabela exportado")
+                fechar_pool(app_module.DB_PATH)
+
+                # Importar noutra base de dados, com uma linha inválida
+                app_module.DB_PATH = Path(tmp) / "destino.db"
+                app_module.init_db()
+
+                corpo = exportado + b'{"tabela": "utilizadores", "dados": {}}\n'
+                resultado = client.post('/api/import', data=corpo).get_json()
+                print(f"3. Importação: {resultado}")
+                assert resultado["importados"] == {"sessoes_estudo": 28, "tarefas": 1, "progresso_topicos": 1}
+                assert resultado["total_erros"] == 1
+
+                estatisticas = client.get('/api/estatisticas?from=2025-10-01&to=2025-10-31').get_json()
+                assert estatisticas["horas_por_disciplina"][0]["total_horas"] == 14.0
+
+                # Reimportar não duplica
+                resultado = client.post('/api/import', data=exportado).get_json()
+                assert resultado["importados"] == {} and resultado["ignorados"] == 30
+                assert resultado["total_conflitos"] == 0
+                print("4. Reimportação ignora registos existentes")
+
+                # Tipos inválidos são recusados antes de chegar à base de dados
+                invalidos = b"".join(json.dumps({"tabela": tabela, "dados": dados}).encode() + b"\n" for tabela, dados in [
+                    ("sessoes_estudo", {"disciplina_id": "21053", "data": "2025-11-01", "hora_inicio": "19:00", "duracao_minutos": "30"}),
+                    ("tarefas", {"disciplina_id": ["21053"], "titulo": "Lista"}),
+                    ("progresso_topicos", {"disciplina_id": "21053", "topico_numero": True}),
+                    ("tarefas", {"disciplina_id": "21053", "titulo": "Grande", "prioridade": 2 ** 70}),
+                ])
+                resultado = client.post('/api/import', data=invalidos).get_json()
+                print(f"5. Tipos inválidos: {[e['error'] for e in resultado['erros']]}")
+                assert resultado["importados"] == {} and resultado["total_erros"] == 4
+
+                # Mesmo id com outros dados: não é importado e fica listado
+                tarefa = json.loads(next(l for l in linhas if '"tarefas"' in l))
+                tarefa["dados"]["titulo"] = "Outra tarefa"
+                nova = {"tabela": "tarefas", "dados": {"disciplina_id": "21053", "titulo": "Nova"}}
+                corpo = "".join(json.dumps(r) + "\n" for r in (tarefa, nova)).encode()
+                resultado = client.post('/api/import', data=corpo).get_json()
+                print(f"6. Conflitos: {resultado['conflitos']}")
+                assert resultado["importados"] == {"tarefas": 1} and resultado["ignorados"] == 1
+                assert resultado["conflitos"] == [{"linha": 1, "tabela": "tarefas", "id": tarefa["dados"]["id"]}]
+
+                # Um erro da base de dados desfaz a importação inteira
+                conn = app_module.obter_conexao(app_module.DB_PATH)
+                conn.execute("""
+                    CREATE TRIGGER falhar BEFORE INSERT ON tarefas WHEN NEW.titulo = 'Falha'
+                    BEGIN SELECT RAISE(ABORT, 'falha simulada'); END
+                """)
+                conn.commit()
+                conn.close()
+                sessoes = len(client.get('/api/sessoes').get_json())
+                corpo = "".join(json.dumps(r) + "\n" for r in [
+                    {"tabela": "sessoes_estudo", "dados": {"disciplina_id": "21053", "data": "2025-11-02", "hora_inicio": "19:00"}},
+                    {"tabela": "tarefas", "dados": {"disciplina_id": "21053", "titulo": "Falha"}},
+                ]).encode()
+                resposta = client.post('/api/import', data=corpo)
+                print(f"7. Erro a meio: {resposta.status_code}, sessões antes/depois: {sessoes}/{len(client.get('/api/sessoes').get_json())}")
+                assert resposta.status_code == 400
+                assert len(client.get('/api/sessoes').get_json()) == sessoes
+
+                print("\n✅ TESTE CONCLUÍDO")
+        finally:
+            fechar_pool(app_module.DB_PATH)
+            app_module.DB_PATH = db_original
+
+if __name__ == "__main__":
+    test_exportacao()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Script para testar que inicializar-tarefas é idempotente
+"""
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, '.')
+import app as app_module
+from app import app
+from database import fechar_pool
+
+def test_inicializar_tarefas():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_original = app_module.DB_PATH
+        app_module.DB_PATH = Path(tmp) / "estudos.db"
+        app_module.init_db()
+
+        try:
+            with app.test_client() as client:
+                print("=" * 80)
+                print("TESTE DE INICIALIZAÇÃO DE TAREFAS")
+                print("=" * 80)
+
+                primeira = client.post('/api/inicializar-tarefas').get_json()["tarefas_criadas"]
+                total = len(client.get('/api/tarefas').get_json())
+                print(f"\n1. Primeira execução: {primeira} tarefas criadas")
+                assert primeira > 0 and total == primeira
+
+                # Alterar o título não cria duplicados (a chave é a origem, não o título)
+                tarefa = client.get('/api/tarefas').get_json()[0]
+                client.patch('/api/tarefas/batch', json=[{"id": tarefa["id"], "titulo": "Renomeada"}])
+
+                segunda = client.post('/api/inicializar-tarefas').get_json()["tarefas_criadas"]
+                print(f"2. Segunda execução: {segunda} tarefas criadas")
+                assert segunda == 0
+                assert len(client.get('/api/tarefas').get_json()) == total
+
+                print("\n✅ TESTE CONCLUÍDO")
+        finally:
+            fechar_pool(app_module.DB_PATH)
+            app_module.DB_PATH = db_original
+
+if __name__ == "__main__":
+    test_inicializar_tarefas()
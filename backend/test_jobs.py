@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Script para testar os jobs em segundo plano e a sincronização Moodle assíncrona
+"""
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, '.')
+import app as app_module
+from app import app
+from database import fechar_pool
+from jobs import GestorJobs
+from moodle_course import CoursePageCache
+
+class ClienteFalso:
+    """MoodleUAB simulado; as tarefas esperam até o teste libertar"""
+
+    is_logged_in = True
+    course_pages = CoursePageCache(lambda course_id: None)
+    libertar = threading.Event()
+
+    def get_enrolled_courses(self):
+        return [{"id": i, "name": f"Disciplina {i}"} for i in range(3)]
+
+    def get_course_assignments(self, course_id):
+        self.libertar.wait(5)
+        return [{"name": f"Tarefa {course_id}", "url": f"/assign/{course_id}", "course_id": course_id}]
+
+    def get_course_materials(self, course_id):
+        return []
+
+    def download_new_material(self, course_id, material):
+        return None
+
+    def sync_calendar(self):
+        return []
+
+    def check_notifications(self):
+        return []
+
+    def get_forum_updates(self, course_id, cursors=None):
+        return [], []
+
+    def get_grades(self, course_id):
+        return {}
+
+def esperar(client, job_id):
+    for _ in range(100):
+        job = client.get(f'/api/jobs/{job_id}').get_json()
+        if job["estado"] in ("concluido", "erro"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError("job não terminou")
+
+def test_jobs():
+    print("=" * 80)
+    print("TESTE DE JOBS EM SEGUNDO PLANO")
+    print("=" * 80)
+
+    gestor = GestorJobs()
+    job, _ = gestor.submeter("falha", lambda job: 1 / 0)
+    while job.estado != "erro":
+        time.sleep(0.01)
+    print(f"\n1. Job com exceção: estado={job.estado}, erro={job.erro}")
+    assert "division" in job.erro and gestor.submeter("falha", lambda job: None)[1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_original = app_module.DB_PATH
+        cliente_original = app_module.moodle_client
+        app_module.DB_PATH = Path(tmp) / "estudos.db"
+        app_module.init_db()
+        app_module.moodle_client = ClienteFalso()
+
+        try:
+            with app.test_client() as client:
+                inicio = time.perf_counter()
+                resposta = client.post('/api/moodle/sync')
+                dados = resposta.get_json()
+                print(f"2. POST /api/moodle/sync: {resposta.status_code} em {time.perf_counter() - inicio:.3f}s")
+                assert resposta.status_code == 202 and not dados["already_running"]
+
+                # Segundo pedido durante a sincronização: mesmo job
+                repetido = client.post('/api/moodle/sync?mode=delta').get_json()
+                assert repetido["job_id"] == dados["job_id"] and repetido["already_running"]
+
+                for _ in range(100):
+                    job = client.get(dados["status_url"]).get_json()
+                    if len(job["etapas"]) > 1:
+                        break
+                    time.sleep(0.01)
+                print(f"3. Em curso: {[(e['nome'], e['feitos'], e['total']) for e in job['etapas']]}")
+                assert job["estado"] == "em_execucao"
+                etapas = {e["nome"]: e for e in job["etapas"]}
+                assert etapas["courses"]["concluida"] and not etapas["assignments"]["concluida"]
+
+                ClienteFalso.libertar.set()
+                job = esperar(client, dados["job_id"])
+                print(f"4. Terminado em {job['duracao']}s: {job['resultado']['changes']}")
+                assert job["estado"] == "concluido"
+                assert all(e["concluida"] for e in job["etapas"])
+                assert job["resultado"]["changes"]["activities"]["new"] == 3
+
+                assert client.get('/api/jobs/inexistente').status_code == 404
+                assert client.get('/api/jobs').get_json()[0]["id"] == dados["job_id"]
+        finally:
+            ClienteFalso.libertar.set()
+            app_module.moodle_client = cliente_original
+            fechar_pool(app_module.DB_PATH)
+            app_module.DB_PATH = db_original
+
+    print("\n✅ TESTE CONCLUÍDO")
+
+if __name__ == "__main__":
+    test_jobs()
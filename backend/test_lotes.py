@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Script para testar os endpoints de escrita em lote
+"""
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, '.')
+import app as app_module
+from app import app
+from database import fechar_pool
+
+def test_lotes():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_original = app_module.DB_PATH
+        app_module.DB_PATH = Path(tmp) / "estudos.db"
+        app_module.init_db()
+
+        try:
+            with app.test_client() as client:
+                print("=" * 80)
+                print("TESTE DE ESCRITAS EM LOTE")
+                print("=" * 80)
+
+                # Sessões: uma inválida no meio não impede as restantes
+                resposta = client.post('/api/sessoes/batch', json=[
+                    {"disciplina_id": "21053", "data": "2025-10-06", "hora_inicio": "19:00", "duracao_minutos": 30},
+                    {"disciplina_id": "21053", "data": "06/10/2025", "hora_inicio": "19:00"},
+                    {"disciplina_id": "21111", "data": "2025-10-07", "hora_inicio": "20:30", "duracao_minutos": 45},
+                ]).get_json()
+                print(f"\n1. Sessões: {resposta['ok']} ok, {resposta['errors']} erro(s)")
+                assert resposta["ok"] == 2 and resposta["errors"] == 1
+                assert not resposta["results"][1]["success"]
+
+                sessoes = {s["id"]: s for s in client.get('/api/sessoes').get_json()}
+                assert sessoes[resposta["results"][0]["id"]]["duracao_minutos"] == 30
+                assert sessoes[resposta["results"][2]["id"]]["disciplina_id"] == "21111"
+
+                # Tarefas: alterações parciais com campos diferentes
+                ids = [
+                    client.post('/api/tarefas', json={"disciplina_id": "21053", "titulo": t}).get_json()["id"]
+                    for t in ("A", "B")
+                ]
+                resposta = client.patch('/api/tarefas/batch', json={"tarefas": [
+                    {"id": ids[0], "concluida": True},
+                    {"id": ids[1], "prioridade": 3, "titulo": "B2"},
+                    {"id": 9999, "concluida": True},
+                ]}).get_json()
+                print(f"2. Tarefas: {resposta['ok']} ok, {resposta['errors']} erro(s)")
+                assert [r["success"] for r in resposta["results"]] == [True, True, False]
+
+                tarefas = {t["id"]: t for t in client.get('/api/tarefas').get_json()}
+                assert tarefas[ids[0]]["concluida"] and tarefas[ids[0]]["titulo"] == "A"
+                assert tarefas[ids[1]]["titulo"] == "B2" and tarefas[ids[1]]["prioridade"] == 3
+
+                # Progresso: inserção e atualização do mesmo tópico
+                resposta = client.put('/api/progresso/batch', json=[
+                    {"disciplina_id": "21053", "topico_numero": 1, "progresso_percentual": 40},
+                    {"disciplina_id": "21053", "topico_numero": 1, "progresso_percentual": 80},
+                    {"disciplina_id": "21053", "topico_numero": 2, "progresso_percentual": 150},
+                ]).get_json()
+                progresso = client.get('/api/progresso').get_json()
+                print(f"3. Progresso: {progresso}")
+                assert resposta["ok"] == 2
+                assert [p["progresso_percentual"] for p in progresso] == [80]
+
+                assert client.post('/api/sessoes/batch', json={"x": 1}).status_code == 400
+                print("4. Corpo inválido devolve 400")
+
+                print("\n✅ TESTE CONCLUÍDO")
+        finally:
+            fechar_pool(app_module.DB_PATH)
+            app_module.DB_PATH = db_original
+
+if __name__ == "__main__":
+    test_lotes()
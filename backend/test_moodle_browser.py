@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Script para testar que o Selenium é opcional e só carregado pelo backend do navegador
+"""
+import subprocess
+import sys
+sys.path.insert(0, '.')
+
+# Simula um ambiente sem selenium instalado
+SEM_SELENIUM = """
+import sys
+sys.modules['selenium'] = None
+sys.modules['webdriver_manager'] = None
+import app
+from moodle_integration import create_moodle_client
+from moodle_browser import BrowserMoodleUAB, selenium_available
+client = create_moodle_client('aluno', 'segredo', backend='browser')
+print(app.MOODLE_AVAILABLE, isinstance(client, BrowserMoodleUAB), client.login())
+"""
+
+def test_moodle_browser():
+    print("=" * 80)
+    print("TESTE DO BACKEND OPCIONAL DO NAVEGADOR")
+    print("=" * 80)
+
+    saida = subprocess.run(
+        [sys.executable, "-c", "import sys, app; print('selenium' in sys.modules, 'webdriver_manager' in sys.modules)"],
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    print(f"\n1. selenium/webdriver_manager carregados pela API: {saida[-2:]}")
+    assert saida[-2:] == ["False", "False"]
+
+    saida = subprocess.run(
+        [sys.executable, "-c", SEM_SELENIUM], capture_output=True, text=True, check=True,
+    ).stdout.split()
+    print(f"2. Sem selenium: Moodle disponível, backend criado, login falha sem exceção: {saida[-3:]}")
+    assert saida[-3:] == ["True", "True", "False"]
+
+    print("\n✅ TESTE CONCLUÍDO")
+
+if __name__ == "__main__":
+    test_moodle_browser()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Script para testar o pool de navegadores e o login pelo CAS como alternativa ao formulário do Moodle
+"""
+import json
+import sys
+import tempfile
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+sys.path.insert(0, '.')
+import moodle_browser
+from moodle_browser import BrowserMoodleUAB, DriverPool
+from moodle_integration import MoodleUAB
+
+FIXTURES = Path(__file__).parent / "fixtures" / "moodle"
+
+FORMULARIO_CAS = """<html><body><form method="post" action="/cas/login?service=/login/index.php">
+<input type="text" name="username"><input type="password" name="password">
+<input type="hidden" name="execution" value="e1s1"><input type="submit" value="Entrar">
+</form></body></html>"""
+
+class CasFalso(BaseHTTPRequestHandler):
+    """CAS (formulário + bilhete) e Moodle que só aceita login pelo CAS"""
+
+    bilhetes = set()
+    sessoes = set()
+    pedidos = []
+
+    def _cookie(self, nome):
+        for parte in (self.headers.get("Cookie") or "").split(";"):
+            chave, _, valor = parte.strip().partition("=")
+            if chave == nome:
+                return valor
+        return None
+
+    def _responder(self, corpo, status=200, cabecalhos=()):
+        dados = corpo.encode("utf-8")
+        self.send_response(status)
+        for nome, valor in cabecalhos:
+            self.send_header(nome, valor)
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self.pedidos.append(f"GET {url.path}")
+        bilhete = parse_qs(url.query).get("ticket", [None])[0]
+
+        if url.path == "/cas/login":
+            self._responder(FORMULARIO_CAS)
+        elif url.path == "/login/index.php" and bilhete in self.bilhetes:
+            self.bilhetes.discard(bilhete)
+            sessao = uuid.uuid4().hex
+            self.sessoes.add(sessao)
+            self._responder("", 303, [("Location", "/my/"), ("Set-Cookie", f"MoodleSession={sessao}; path=/")])
+        elif url.path == "/login/index.php":
+            self._responder("", 303, [("Location", "/cas/login?service=/login/index.php")])
+        elif url.path in ("/my/", "/my/courses.php") and self._cookie("MoodleSession") in self.sessoes:
+            self._responder((FIXTURES / "dashboard.html").read_text(encoding="utf-8"))
+        else:
+            self._responder("", 303, [("Location", "/login/index.php")])
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        dados = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+        self.pedidos.append(f"POST {url.path}")
+
+        if url.path == "/cas/login" and dados.get("password") == ["segredo"]:
+            bilhete = f"ST-{uuid.uuid4().hex}"
+            self.bilhetes.add(bilhete)
+            self._responder("", 303, [("Location", f"/login/index.php?ticket={bilhete}")])
+        elif url.path == "/lib/ajax/service.php" and self._cookie("MoodleSession") in self.sessoes:
+            self._responder(json.dumps([{"error": False, "data": {"userid": 7, "timeremaining": 7200}}]))
+        else:
+            self._responder(FORMULARIO_CAS)
+
+    def log_message(self, *args):
+        pass
+
+class NavegadorFalso:
+    """WebDriver mínimo sobre requests: navegação, formulários, cookies e execute_script"""
+
+    def __init__(self):
+        self.http = requests.Session()
+        self.current_url = None
+        self.page_source = ""
+        self.campos = {}
+        self.avariado = False
+        self.fechado = False
+
+    def _carregar(self, resposta):
+        self.current_url = resposta.url
+        self.page_source = resposta.text
+        self.campos = {}
+
+    def get(self, url):
+        self._carregar(self.http.get(url))
+
+    def find_element(self, by, value):
+        from selenium.common.exceptions import NoSuchElementException
+
+        elemento = BeautifulSoup(self.page_source, "html.parser").select_one(value)
+        if elemento is None:
+            raise NoSuchElementException(value)
+        return ElementoFalso(self, elemento)
+
+    def execute_script(self, script):
+        if self.avariado:
+            raise RuntimeError("navegador não responde")
+        return 1
+
+    def get_cookies(self):
+        return [{"name": c.name, "value": c.value, "domain": c.domain, "path": c.path} for c in self.http.cookies]
+
+    def delete_all_cookies(self):
+        self.http.cookies.clear()
+
+    def quit(self):
+        self.fechado = True
+
+class ElementoFalso:
+    def __init__(self, navegador, elemento):
+        self.navegador = navegador
+        self.elemento = elemento
+
+    def send_keys(self, texto):
+        self.navegador.campos[self.elemento["name"]] = texto
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        formulario = self.elemento.find_parent("form")
+        dados = {campo["name"]: campo.get("value", "") for campo in formulario.find_all("input", attrs={"name": True})}
+        dados.update(self.navegador.campos)
+        url = urljoin(self.navegador.current_url, formulario.get("action") or "")
+        self.navegador._carregar(self.navegador.http.post(url, data=dados))
+
+def test_moodle_browser_pool():
+    print("=" * 80)
+    print("TESTE DO POOL DE NAVEGADORES E LOGIN PELO CAS")
+    print("=" * 80)
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), CasFalso)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{servidor.server_port}"
+    navegadores = []
+
+    def abrir():
+        navegadores.append(NavegadorFalso())
+        return navegadores[-1]
+
+    pool = DriverPool(factory=abrir, max_size=1, acquire_timeout=0.2)
+    antigos = moodle_browser.driver_pool, moodle_browser.CAS_LOGIN_URL
+    moodle_browser.driver_pool = pool
+    moodle_browser.CAS_LOGIN_URL = f"{base}/cas/login?service=/login/index.php"
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # O formulário do Moodle não existe (redireciona para o CAS): login pelo navegador
+            client = MoodleUAB("aluno", "segredo", data_dir=tmp)
+            client.base_url = base
+            assert client.login()
+            print(f"\n1. Login pelo CAS: sesskey={client.token}, pedidos={CasFalso.pedidos}")
+            assert client.is_logged_in and client.token == "aB3dE5fG7h"
+
+            # Os cookies passaram para a sessão requests: o scraping não usa o navegador
+            CasFalso.pedidos.clear()
+            cursos = client.get_enrolled_courses()
+            print(f"2. Disciplinas pela sessão requests: {[c['id'] for c in cursos]}, pedidos={CasFalso.pedidos}")
+            assert [c["id"] for c in cursos] == [21053, 21111, 21010]
+            assert not any("/cas/" in p for p in CasFalso.pedidos)
+
+            # Segundo login reutiliza o mesmo navegador, sem os cookies do anterior
+            assert navegadores[0].http.cookies.get("MoodleSession") is None
+            assert client.login(force=True)
+            print(f"3. Navegadores abertos após dois logins: {pool.created}")
+            assert pool.created == 1 and pool.idle_count() == 1
+
+            # Sessão guardada é reutilizada sem navegador (no host onde o login terminou),
+            # mas uma password nova vai ao CAS
+            browser = BrowserMoodleUAB("aluno", data_dir=tmp)
+            CasFalso.pedidos.clear()
+            assert browser.login() and browser.base_url == base
+            assert not any("/cas/" in p for p in CasFalso.pedidos)
+            assert not browser.login(password="errada")
+            print(f"   Sessão restaurada sem CAS; password errada verificada: {CasFalso.pedidos[-3:]}")
+            assert "POST /cas/login" in CasFalso.pedidos
+
+        # Pool limitado: com o único navegador em uso, o seguinte espera e desiste
+        with pool.driver():
+            try:
+                pool.acquire()
+                assert False, "esperava TimeoutError"
+            except TimeoutError:
+                print("4. Pool cheio: acquire esgota o tempo de espera")
+
+        # Navegador que não responde é fechado e substituído
+        navegadores[0].avariado = True
+        with pool.driver() as driver:
+            assert driver is navegadores[1]
+        print(f"5. Navegador avariado substituído: fechado={navegadores[0].fechado}, criados={pool.created}")
+        assert navegadores[0].fechado and pool.created == 2
+
+        # Sem uso além de idle_timeout: fechado pelo reap
+        pool.idle_timeout = 0
+        fechados = pool.reap()
+        print(f"6. Navegadores fechados por inatividade: {fechados}")
+        assert fechados == 1 and navegadores[1].fechado and pool.idle_count() == 0
+    finally:
+        pool.close()
+        moodle_browser.driver_pool, moodle_browser.CAS_LOGIN_URL = antigos
+        servidor.shutdown()
+
+    print("\n✅ TESTE CONCLUÍDO")
+
+if __name__ == "__main__":
+    test_moodle_browser_pool()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Script para testar a página de disciplina partilhada (um download por TTL)
+"""
+import sys
+sys.path.insert(0, '.')
+from moodle_course import CoursePageCache
+from moodle_integration import MoodleUAB
+
+HTML = """
+<ul>
+  <li class="activity assign modtype_assign">
+    <a href="https://moodle.uab.pt/mod/assign/view.php?id=11"><span class="instancename">e-fólio A</span></a>
+    <div>Data limite: 24 de novembro de 2025</div>
+  </li>
+  <li class="activity resource modtype_resource">
+    <a href="https://moodle.uab.pt/pluginfile.php/1/guia.pdf"><span class="instancename">Guia</span></a>
+  </li>
+  <li class="activity url modtype_url">
+    <a href="https://moodle.uab.pt/mod/url/view.php?id=13"><span class="instancename">Vídeo</span></a>
+  </li>
+  <li class="activity forum modtype_forum">
+    <a href="https://moodle.uab.pt/mod/forum/view.php?id=14"><span class="instancename">Notícias</span></a>
+  </li>
+</ul>
+"""
+
+def test_moodle_course():
+    print("=" * 80)
+    print("TESTE DA PÁGINA DE DISCIPLINA EM CACHE")
+    print("=" * 80)
+
+    downloads = []
+
+    def fetch(course_id):
+        downloads.append(course_id)
+        return HTML
+
+    client = MoodleUAB()
+    client.is_logged_in = True
+    client.course_pages = CoursePageCache(fetch)
+    client._get_forum_discussions = lambda forum_id, since_post_id=None: ([{"title": "Boas-vindas", "forum_id": forum_id}], True)
+
+    assignments = client.get_course_assignments(42)
+    materials = client.get_course_materials(42)
+    forums = client.get_forum_posts(42)
+
+    print(f"\n1. Tarefas: {assignments}")
+    assert assignments[0]["name"] == "e-fólio A"
+    assert assignments[0]["deadline"] == "24 de novembro de 2025"
+    print(f"2. Materiais: {[(m['name'], m['type']) for m in materials]}")
+    assert [(m["name"], m["type"]) for m in materials] == [("Guia", "pdf"), ("Vídeo", "url")]
+    assert forums == [{"title": "Boas-vindas", "forum_id": "14", "course_id": 42}]
+
+    print(f"3. Downloads da página: {downloads}")
+    assert downloads == [42]
+
+    client.course_pages.invalidate(42)
+    client.get_course_materials(42)
+    assert downloads == [42, 42]
+    print("4. Invalidação força novo download")
+
+    print("\n✅ TESTE CONCLUÍDO")
+
+if __name__ == "__main__":
+    test_moodle_course()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Script para testar o crawler paralelo do Moodle e o limite por host
+"""
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, '.')
+import requests
+from moodle_course import CoursePageCache
+from moodle_crawler import MoodleCrawler
+from moodle_http import mount_polite_adapter, PoliteAdapter
+
+ATRASO = 0.2
+
+class ClienteFalso:
+    """Simula um MoodleUAB em que cada pedido demora ATRASO segundos"""
+
+    course_pages = CoursePageCache(lambda course_id: None)
+
+    def get_enrolled_courses(self):
+        return [{"id": i, "name": f"Disciplina {i}"} for i in range(7)]
+
+    def get_course_assignments(self, course_id):
+        time.sleep(ATRASO)
+        return [{"name": f"Tarefa {course_id}", "course_id": course_id}]
+
+    def get_course_materials(self, course_id):
+        time.sleep(ATRASO)
+        return [{"name": f"Material {course_id}", "type": "pdf", "url": ""}]
+
+    def get_forum_updates(self, course_id, cursors=None):
+        time.sleep(ATRASO)
+        return [{"title": f"Dúvida {course_id}", "forum_id": 1, "course_id": course_id}], ["1"]
+
+    def get_grades(self, course_id):
+        time.sleep(ATRASO)
+        return {"e-fólio A": "3,5"}
+
+    def download_new_material(self, course_id, material):
+        return f"{course_id}_{material['name']}.pdf"
+
+    def sync_calendar(self):
+        time.sleep(ATRASO)
+        return [{"title": "Evento"}]
+
+    def check_notifications(self):
+        return []
+
+class Servidor(BaseHTTPRequestHandler):
+    ativos = 0
+    maximo = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with Servidor.lock:
+            Servidor.ativos += 1
+            Servidor.maximo = max(Servidor.maximo, Servidor.ativos)
+        time.sleep(0.05)
+        with Servidor.lock:
+            Servidor.ativos -= 1
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+def test_moodle_crawler():
+    print("=" * 80)
+    print("TESTE DO CRAWLER PARALELO DO MOODLE")
+    print("=" * 80)
+
+    resultado = MoodleCrawler(ClienteFalso(), max_workers=16).sync()
+    sequencial = ATRASO * (7 * 4 + 1)
+    print(f"\n1. Sincronização em {resultado['elapsed']}s (sequencial: {sequencial:.1f}s)")
+    assert len(resultado["assignments"]) == 7
+    assert len(resultado["materials"]) == 7
+    assert len(resultado["forums"]) == 7 and len(resultado["grades"]) == 7
+    assert resultado["elapsed"] < sequencial / 3
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Servidor)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    try:
+        sessao = requests.Session()
+        mount_polite_adapter(sessao, PoliteAdapter(max_concurrency=2, min_interval=0))
+        url = f"http://127.0.0.1:{servidor.server_port}/"
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            respostas = list(pool.map(lambda _: sessao.get(url).status_code, range(8)))
+        print(f"2. Máximo de pedidos simultâneos no servidor: {Servidor.maximo}")
+        assert respostas == [200] * 8
+        assert Servidor.maximo <= 2
+    finally:
+        servidor.shutdown()
+
+    print("\n✅ TESTE CONCLUÍDO")
+
+if __name__ == "__main__":
+    test_moodle_crawler()
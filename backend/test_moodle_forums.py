@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Script para testar a leitura paralela e incremental dos fóruns do Moodle
+"""
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+sys.path.insert(0, '.')
+import app as app_module
+from app import app
+from database import fechar_pool, obter_conexao
+from moodle_http import PoliteAdapter, mount_polite_adapter
+from moodle_integration import MoodleUAB
+from moodle_state import MoodleState
+
+FIXTURES = Path(__file__).parent / "fixtures" / "moodle"
+POR_PAGINA = 10
+ATRASO = 0.1
+
+class ForunsFalsos(BaseHTTPRequestHandler):
+    """Página da disciplina e listagens paginadas (última mensagem mais recente primeiro)"""
+
+    discussoes = {}  # fórum -> [[id, id da última mensagem, título]]
+    fixadas = set()  # discussões fixadas no topo da primeira página
+    falhas = set()  # (fórum, página) que respondem 500 uma vez
+    pedidos = []
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == "/course/view.php":
+            corpo = (FIXTURES / "course_view.html").read_text(encoding="utf-8")
+        else:
+            time.sleep(ATRASO)
+            forum, pagina = query["id"][0], int(query.get("page", ["0"])[0])
+            self.pedidos.append((forum, pagina))
+            if (forum, pagina) in self.falhas:
+                self.falhas.discard((forum, pagina))
+                self.send_response(500)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            ordenadas = sorted(self.discussoes.setdefault(forum, []), key=lambda d: (d[0] not in self.fixadas, -d[1]))
+            linhas = "".join(
+                f'<tr class="discussion{" pinned" if d in self.fixadas else ""}"><th class="topic"><a class="discussionname" '
+                f'href="/mod/forum/discuss.php?d={d}">{titulo}</a></th>'
+                f'<td class="lastpost"><a href="/mod/forum/discuss.php?d={d}&amp;parent={ultima}">hoje</a></td></tr>'
+                for d, ultima, titulo in ordenadas[pagina * POR_PAGINA:(pagina + 1) * POR_PAGINA]
+            )
+            seguinte = f'<a href="view.php?id={forum}&amp;page={pagina + 1}">»</a>' if (pagina + 1) * POR_PAGINA < len(ordenadas) else ""
+            corpo = f"<table>{linhas}</table>{seguinte}"
+
+        dados = corpo.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, *args):
+        pass
+
+class AssistenteFalso:
+    def analyze_forum_posts(self, posts):
+        return {"success": True, "titulos": sorted(p["title"] for p in posts)}
+
+def test_moodle_forums():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), ForunsFalsos)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_original = app_module.DB_PATH
+        app_module.DB_PATH = Path(tmp) / "estudos.db"
+        app_module.init_db()
+        ia_original = app_module.AI_AVAILABLE, app_module.ai_assistant
+
+        try:
+            print("=" * 80)
+            print("TESTE DOS FÓRUNS PARALELOS E INCREMENTAIS")
+            print("=" * 80)
+
+            client = MoodleUAB()
+            client.base_url = f"http://127.0.0.1:{servidor.server_port}"
+            client.is_logged_in = True
+            mount_polite_adapter(client.session, PoliteAdapter(min_interval=0))
+            estado = MoodleState(lambda: obter_conexao(app_module.DB_PATH))
+
+            foruns = [f["id"] for f in client.get_course_page(21053).forums]
+            post = 9000
+            for i, forum in enumerate(foruns):
+                ForunsFalsos.discussoes[str(forum)] = [[7000 + i * 100 + n, post + i * 100 + n, f"Dúvida {i}.{n}"] for n in range(25)]
+
+            def sincronizar(seen_at):
+                ForunsFalsos.pedidos.clear()
+                inicio = time.perf_counter()
+                novas, completos = client.get_forum_updates(21053, estado.forum_cursors())
+                duracao = time.perf_counter() - inicio
+                estado.record("forum_discussions", novas, seen_at=seen_at)
+                estado.advance_forum_cursors(novas, seen_at=seen_at, complete=completos)
+                return novas, duracao
+
+            novas, _ = sincronizar("2025-10-01T10:00:00")
+            print(f"\n1. Primeira leitura: {len(novas)} discussões em {len(ForunsFalsos.pedidos)} páginas")
+            assert len(novas) == 25 * len(foruns) and len(ForunsFalsos.pedidos) == 3 * len(foruns)
+            assert all(d["course_id"] == 21053 for d in novas)
+
+            novas, duracao = sincronizar("2025-10-01T11:00:00")
+            sequencial = ATRASO * len(foruns)
+            print(f"2. Sem novidades: {len(novas)} discussões, páginas {sorted(p for _, p in ForunsFalsos.pedidos)}, "
+                  f"{duracao:.2f}s (sequencial: {sequencial:.1f}s)")
+            assert novas == [] and sorted(ForunsFalsos.pedidos) == sorted((str(f), 0) for f in foruns)
+            assert duracao < sequencial * 0.6
+
+            # Uma resposta numa discussão antiga e uma discussão nova
+            ForunsFalsos.discussoes[str(foruns[0])][0][1] = 99001
+            ForunsFalsos.discussoes[str(foruns[1])].append([99100, 99100, "Aviso do docente"])
+            novas, _ = sincronizar("2025-10-02T10:00:00")
+            print(f"3. Após uma resposta e uma discussão nova: {sorted(d['title'] for d in novas)}")
+            assert sorted(d["title"] for d in novas) == ["Aviso do docente", "Dúvida 0.0"]
+            assert len(ForunsFalsos.pedidos) == len(foruns)
+
+            # A análise IA recebe só as discussões novas desde `since`
+            app_module.AI_AVAILABLE, app_module.ai_assistant = True, AssistenteFalso()
+            with app.test_client() as api:
+                resposta = api.post("/api/ai/analyze-forums", json={"since": "2025-10-02T00:00:00", "course_id": 21053})
+                print(f"4. Discussões enviadas para análise: {resposta.get_json()['titulos']}")
+                assert resposta.get_json()["titulos"] == ["Aviso do docente", "Dúvida 0.0"]
+
+                resposta = api.post("/api/ai/analyze-forums", json={"since": "2099-01-01"}).get_json()
+                assert resposta == {"success": True, "analysis": None, "posts": 0}
+
+            # Uma discussão antiga fixada no topo não interrompe a paginação
+            ForunsFalsos.fixadas.add(7200)
+            ForunsFalsos.discussoes[str(foruns[2])] += [[99200 + n, 99200 + n, f"Nova 2.{n}"] for n in range(15)]
+            # Uma página que falha deixa o cursor do fórum onde estava
+            ForunsFalsos.discussoes[str(foruns[1])] += [[99300 + n, 99300 + n, f"Nova 1.{n}"] for n in range(15)]
+            ForunsFalsos.falhas.add((str(foruns[1]), 1))
+            cursor = estado.forum_cursors()[str(foruns[1])]
+
+            novas, _ = sincronizar("2025-10-03T10:00:00")
+            por_forum = {f: sum(d["forum_id"] == f for d in novas) for f in foruns[1:3]}
+            print(f"5. Fixada no topo e página com erro: {por_forum}, cursor com erro mantido: "
+                  f"{estado.forum_cursors()[str(foruns[1])] == cursor}")
+            assert por_forum == {foruns[1]: POR_PAGINA, foruns[2]: 15}
+            assert estado.forum_cursors()[str(foruns[1])] == cursor
+
+            novas, _ = sincronizar("2025-10-03T11:00:00")
+            print(f"6. Nova leitura do fórum com erro: {len(novas)} discussões")
+            assert sorted(d["title"] for d in novas) == sorted(f"Nova 1.{n}" for n in range(15))
+            assert sincronizar("2025-10-03T12:00:00")[0] == []
+        finally:
+            app_module.AI_AVAILABLE, app_module.ai_assistant = ia_original
+            fechar_pool(app_module.DB_PATH)
+            app_module.DB_PATH = db_original
+            servidor.shutdown()
+
+    print("\n✅ TESTE CONCLUÍDO")
+
+if __name__ == "__main__":
+    test_moodle_forums()
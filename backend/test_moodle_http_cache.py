@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Script para testar a cache HTTP condicional do Moodle (ETag e LRU)
+"""
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, '.')
+import requests
+from moodle_http import CachingAdapter, mount_polite_adapter
+
+class Servidor(BaseHTTPRequestHandler):
+    completas = 0
+
+    def do_GET(self):
+        etag = f'"{self.path}-v1"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        Servidor.completas += 1
+        corpo = (self.path * 200).encode("utf-8")
+        if self.path == "/my/":
+            # Mesmo ETag para todos: o painel depende só do cookie
+            corpo = f"Painel de {self.headers.get('Cookie')}".encode("utf-8")
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+def test_moodle_http_cache():
+    print("=" * 80)
+    print("TESTE DA CACHE HTTP DO MOODLE")
+    print("=" * 80)
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Servidor)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{servidor.server_port}"
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            sessao = requests.Session()
+            adaptador = mount_polite_adapter(sessao, CachingAdapter(tmp, max_bytes=2500, min_interval=0))
+
+            primeira = sessao.get(f"{base}/curso")
+            segunda = sessao.get(f"{base}/curso")
+            print(f"\n1. Respostas completas do servidor: {Servidor.completas}")
+            assert segunda.status_code == 200 and segunda.text == primeira.text
+            assert segunda.headers["X-Cache"] == "HIT"
+            assert Servidor.completas == 1
+
+            # Nova instância reaproveita o que está em disco
+            sessao = requests.Session()
+            mount_polite_adapter(sessao, CachingAdapter(tmp, max_bytes=2500, min_interval=0))
+            assert sessao.get(f"{base}/curso").headers.get("X-Cache") == "HIT"
+            print("2. Cache em disco sobrevive a um novo cliente")
+
+            # /aaaaa e /bbbbb (1200 bytes cada) excedem o limite com /curso:
+            # sai /aaaaa, a entrada menos usada, e não /curso, a mais antiga
+            sessao.get(f"{base}/aaaaa")
+            assert sessao.get(f"{base}/curso").headers.get("X-Cache") == "HIT"
+            sessao.get(f"{base}/bbbbb")
+            assert sessao.get(f"{base}/curso").headers.get("X-Cache") == "HIT"
+            assert sessao.get(f"{base}/aaaaa").headers.get("X-Cache") is None
+            print(f"3. LRU removeu a entrada menos usada ({Servidor.completas} respostas completas)")
+            assert adaptador.hits == 1
+
+        # Dois utilizadores com a mesma pasta de cache não partilham páginas
+        with tempfile.TemporaryDirectory() as tmp:
+            paineis = []
+            for utilizador in ("ana", "rui", "ana"):
+                sessao = requests.Session()
+                sessao.headers["Cookie"] = f"user={utilizador}"
+                mount_polite_adapter(sessao, CachingAdapter(tmp, identity=lambda u=utilizador: u, min_interval=0))
+                sessao.get(f"{base}/my/")
+                resposta = sessao.get(f"{base}/my/")
+                paineis.append((resposta.text, resposta.headers.get("X-Cache")))
+            print(f"4. Painéis por utilizador: {paineis}")
+            assert paineis == [("Painel de user=ana", "HIT"), ("Painel de user=rui", "HIT"), ("Painel de user=ana", "HIT")]
+    finally:
+        servidor.shutdown()
+
+    print("\n✅ TESTE CONCLUÍDO")
+
+if __name__ == "__main__":
+    test_moodle_http_cache()
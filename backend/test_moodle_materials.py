@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Script para testar o armazenamento de materiais (dedup, retoma e renomeação)
+"""
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, '.')
+import hashlib
+import requests
+from moodle_materials import MaterialStore
+
+CONTEUDO = bytes(range(256)) * 400  # ~100 KB
+
+class Servidor(BaseHTTPRequestHandler):
+    ranges = []
+    pedidos = 0
+    etag = '"v1"'
+    desvio = 0  # bytes que o 206 recua em relação ao início pedido
+
+    def do_GET(self):
+        Servidor.pedidos += 1
+        inicio = 0
+        intervalo = self.headers.get("Range")
+        if intervalo and self.headers.get("If-Range") == Servidor.etag:
+            Servidor.ranges.append(intervalo)
+            inicio = int(intervalo.split("=")[1].rstrip("-"))
+            if inicio >= len(CONTEUDO):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(CONTEUDO)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            inicio -= Servidor.desvio
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {inicio}-{len(CONTEUDO) - 1}/{len(CONTEUDO)}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", Servidor.etag)
+        self.send_header("Content-Length", str(len(CONTEUDO) - inicio))
+        self.end_headers()
+        self.wfile.write(CONTEUDO[inicio:])
+
+    def log_message(self, *args):
+        pass
+
+def test_moodle_materials():
+    print("=" * 80)
+    print("TESTE DO ARMAZENAMENTO DE MATERIAIS")
+    print("=" * 80)
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Servidor)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{servidor.server_port}"
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = MaterialStore(tmp, rate_kbps=0)
+            sessao = requests.Session()
+
+            def parcial(url, dados, validador=None):
+                caminho = os.path.join(tmp, ".partial", hashlib.sha256(url.encode("utf-8")).hexdigest() + ".part")
+                with open(caminho, "wb") as f:
+                    f.write(dados)
+                if validador:
+                    with open(f"{caminho}.validator", "w", encoding="utf-8") as f:
+                        f.write(validador)
+
+            def conteudo(entrada):
+                with open(os.path.join(tmp, entrada["filename"]), "rb") as f:
+                    return f.read()
+
+            # Download anterior interrompido a meio
+            url = f"{base}/guia.pdf"
+            parcial(url, CONTEUDO[:40000], '"v1"')
+            assert store.get(url) is None
+            print("\n1. Download parcial de 40000 bytes em .partial")
+
+            entrada = store.download(sessao.get, url, "1_Guia.pdf")
+            print(f"2. Retomado a partir do byte {entrada['resumed_from']} ({Servidor.ranges})")
+            assert entrada["resumed_from"] > 0 and Servidor.ranges == ["bytes=40000-"]
+            assert conteudo(entrada) == CONTEUDO
+
+            # Recurso renomeado no Moodle: só muda o nome legível
+            assert store.ensure_filename(url, "1_Guia v2.pdf")
+            assert os.path.samefile(os.path.join(tmp, "1_Guia.pdf"), os.path.join(tmp, "1_Guia v2.pdf"))
+
+            # Mesmo conteúdo noutro URL: um único blob
+            store.download(sessao.get, f"{base}/copia.pdf", "2_Copia.pdf")
+            blobs = os.listdir(os.path.join(tmp, ".store"))
+            print(f"3. Blobs guardados: {len(blobs)} para {len(store)} recursos")
+            assert len(blobs) == 1 and len(store) == 2
+            assert os.listdir(os.path.join(tmp, ".partial")) == []
+
+            # Parciais que não se podem continuar: versão antiga, sem validador,
+            # Content-Range noutro início, 416 com outro tamanho
+            parcial(f"{base}/antigo.pdf", b"x" * 40000, '"v0"')
+            parcial(f"{base}/sem-validador.pdf", b"x" * 40000)
+            parcial(f"{base}/desviado.pdf", b"x" * 40000, '"v1"')
+            parcial(f"{base}/longo.pdf", CONTEUDO + b"x", '"v1"')
+            Servidor.desvio = 1000
+            entradas = [
+                store.download(sessao.get, f"{base}/{nome}.pdf", f"3_{nome}.pdf")
+                for nome in ("antigo", "sem-validador", "desviado", "longo")
+            ]
+            Servidor.desvio = 0
+            print(f"4. Parciais recomeçados do zero: {[e['resumed_from'] for e in entradas]}")
+            assert all(conteudo(e) == CONTEUDO and e["resumed_from"] == 0 for e in entradas)
+
+            # 416 com o tamanho total certo: o parcial já estava completo
+            parcial(f"{base}/completo.pdf", CONTEUDO, '"v1"')
+            pedidos = Servidor.pedidos
+            entrada = store.download(sessao.get, f"{base}/completo.pdf", "4_Completo.pdf")
+            print(f"5. Parcial completo aceite com 416: {entrada['resumed_from']} bytes, {Servidor.pedidos - pedidos} pedido")
+            assert entrada["resumed_from"] == len(CONTEUDO) and Servidor.pedidos - pedidos == 1
+            assert os.listdir(os.path.join(tmp, ".partial")) == []
+
+            # Ficheiro descarregado antes do manifest (materials/<nome>.pdf)
+            with open(os.path.join(tmp, "5_Antigo.pdf"), "wb") as f:
+                f.write(b"PDF antigo")
+            pedidos = Servidor.pedidos
+            assert store.ensure_filename(f"{base}/antigo-plano.pdf", "5_Antigo.pdf")
+            entrada = store.get(f"{base}/antigo-plano.pdf")
+            print(f"6. Ficheiro antigo adotado: {entrada['adopted']}, pedidos: {Servidor.pedidos - pedidos}")
+            assert entrada["adopted"] and entrada["size"] == 10 and Servidor.pedidos == pedidos
+            assert not store.ensure_filename(f"{base}/outro.pdf", "5_Antigo.pdf")
+            assert MaterialStore(tmp).get(f"{base}/antigo-plano.pdf")["sha256"] == hashlib.sha256(b"PDF antigo").hexdigest()
+    finally:
+        servidor.shutdown()
+
+    print("\n✅ TESTE CONCLUÍDO")
+
+if __name__ == "__main__":
+    test_moodle_materials()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Script para testar a análise das páginas do Moodle (fixtures/moodle) nos dois backends
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, '.')
+from moodle_course import CoursePage
+import moodle_parser
+from moodle_parser import (
+    parse_activities,
+    parse_courses,
+    parse_discussions,
+    parse_events,
+    parse_grades,
+    parse_login_token,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "moodle"
+
+def ler(nome):
+    return (FIXTURES / nome).read_text(encoding="utf-8")
+
+def extrair(parser):
+    return {
+        "login": parse_login_token(ler("login.html"), parser),
+        "courses": parse_courses(ler("dashboard.html"), parser),
+        "activities": parse_activities(ler("course_view.html"), parser),
+        "discussions": parse_discussions(ler("forum_view.html"), parser),
+        "grades": parse_grades(ler("grade_report.html"), parser),
+        "events": parse_events(ler("calendar_month.html"), parser),
+    }
+
+def test_moodle_parser():
+    print("=" * 80)
+    print("TESTE DA ANÁLISE DE PÁGINAS DO MOODLE")
+    print("=" * 80)
+
+    dados = extrair("html.parser")
+    print(f"\n1. html.parser: {len(dados['courses'])} disciplinas, {len(dados['activities'])} atividades, "
+          f"{len(dados['discussions'])} discussões, {len(dados['grades'])} notas, {len(dados['events'])} eventos")
+
+    assert dados["login"] == "Zx9YwVu8TsRq7PoNmLk6"
+    assert [(c["id"], c["name"]) for c in dados["courses"]] == [
+        (21053, "Fundamentos de Bases de Dados"),
+        (21111, "Programação por Objetos"),
+        (21010, "Arquitetura de Computadores"),
+    ]
+    assert len(dados["activities"]) == 27
+    assert dados["discussions"][0] == {
+        "id": 7001,
+        "title": "Dúvida sobre o tema 2: pergunta 1",
+        "url": "https://elearning.uab.pt/mod/forum/discuss.php?d=7001",
+        "author": "Ana Silva",
+        "last_post_id": 9001,
+        "pinned": False,
+    }
+    assert dados["grades"] == {"e-fólio A": "3,20", "e-fólio B": "3,60", "p-fólio": "-", "Total da disciplina": "6,80"}
+    assert [e["date"] for e in dados["events"]] == [f"{d} de novembro de 2025" for d in (3, 14, 20, 24)]
+
+    pagina = CoursePage(21053, ler("course_view.html"))
+    prazos = [(a["name"], a["deadline"]) for a in pagina.assignments]
+    print(f"2. CoursePage: {prazos}")
+    assert prazos == [
+        ("e-fólio ATrabalho", "24 de novembro de 2025"),
+        ("e-fólio BTrabalho", "12 de janeiro de 2026"),
+        ("p-fólioTrabalho", "27/01/2026"),
+    ]
+    assert len(pagina.materials) == 12 and len(pagina.forums) == 7
+    assert sum(m["type"] == "pdf" for m in pagina.materials) == 6
+
+    # O lxml (se instalado) tem de extrair exatamente o mesmo
+    if moodle_parser.LXML_AVAILABLE:
+        assert extrair("lxml") == dados
+        print("3. lxml extrai o mesmo que html.parser")
+    else:
+        print("3. lxml não instalado: só html.parser testado")
+
+    print("\n✅ TESTE CONCLUÍDO")
+
+if __name__ == "__main__":
+    test_moodle_parser()
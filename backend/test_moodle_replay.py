@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Script para testar o cliente Moodle sobre as páginas gravadas (ReplayAdapter)
+"""
+import gc
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, '.')
+import requests
+from moodle_crawler import MoodleCrawler
+from moodle_http import mount_polite_adapter
+from moodle_replay import FIXTURES_DIR as FIXTURES, RecordingAdapter, ReplayAdapter, replay_client
+
+class PaginaReal(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/login/index.php":
+            self.send_response(303)
+            self.send_header("Location", "/my/")
+            self.send_header("Set-Cookie", "MoodleSession=abc123; path=/")
+            self.send_header("Set-Cookie", "MOODLEID1_=xyz; path=/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        corpo = f"<p>{self.path}</p>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+def test_moodle_replay():
+    print("=" * 80)
+    print("TESTE DO CLIENTE MOODLE SOBRE PÁGINAS GRAVADAS")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client, adapter = replay_client(data_dir=tmp)
+
+        assert client.login() and client.token == "aB3dE5fG7h"
+        print(f"\n1. Login: {[(e['method'], e['path']) for e in adapter.log]}")
+        assert [(e["method"], e["path"]) for e in adapter.log] == [("GET", "/login/index.php"), ("POST", "/login/index.php")]
+
+        # Mesmos dados que o parser extrai das fixtures, sem rede
+        assert [c["id"] for c in client.get_enrolled_courses()] == [21053, 21111, 21010]
+        assert client.get_grades(21053)["Total da disciplina"] == "6,80"
+        assert len(client.sync_calendar()) == 4
+        assert [n["id"] for n in client.check_notifications()] == [501, 502]
+
+        # Pedidos e bytes por método: base para detetar regressões
+        adapter.reset()
+        forums = client.get_forum_posts(21053)
+        totais = adapter.totals()
+        print(f"2. get_forum_posts: {len(forums)} discussões, {totais['requests']} pedidos, {totais['bytes']} bytes")
+        assert len(forums) == 7 * 12 and totais["requests"] == 1 + 7
+        assert totais["bytes"] == (FIXTURES / "course_view.html").stat().st_size + 7 * (FIXTURES / "forum_view.html").stat().st_size
+
+        adapter.reset()
+        resultado = MoodleCrawler(client).sync(download_materials=False)
+        print(f"3. MoodleCrawler.sync: {adapter.totals()['requests']} pedidos, {len(resultado['assignments'])} tarefas")
+        assert resultado["success"] and len(resultado["forums"]) == 3 * 7 * 12
+        # Painel, página de cada disciplina (uma vez), fóruns, notas, calendário e notificações
+        assert adapter.totals()["requests"] == 1 + 3 + 3 * 7 + 3 + 2
+
+        # Rotas desconhecidas respondem 404
+        assert client.session.get("https://moodle.uab.pt/mod/quiz/view.php?id=1").status_code == 404
+
+        # Gravar um "Moodle real" e reproduzir a gravação
+        servidor = ThreadingHTTPServer(("127.0.0.1", 0), PaginaReal)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{servidor.server_port}"
+        try:
+            sessao = requests.Session()
+            mount_polite_adapter(sessao, RecordingAdapter(f"{tmp}/gravacao", min_interval=0))
+            sessao.get(f"{base}/course/view.php?id=1")
+            sessao.get(f"{base}/course/view.php?id=2")
+            sessao.get(f"{base}/login/index.php")
+        finally:
+            servidor.shutdown()
+
+        sessao = requests.Session()
+        mount_polite_adapter(sessao, ReplayAdapter(f"{tmp}/gravacao"))
+        respostas = [sessao.get(f"{base}/course/view.php?id={i}").text for i in (2, 1)]
+        print(f"4. Gravação reproduzida: {respostas}")
+        assert respostas == ["<p>/course/view.php?id=2</p>", "<p>/course/view.php?id=1</p>"]
+
+        # Redirecionamento e cookies gravados com a rota
+        resposta = sessao.get(f"{base}/login/index.php")
+        print(f"5. Redirecionamento reproduzido: {[r.status_code for r in resposta.history]} -> {resposta.text}, "
+              f"cookies {sorted(sessao.cookies.keys())}")
+        assert [r.status_code for r in resposta.history] == [303] and resposta.text == "<p>/my/</p>"
+        assert sessao.cookies.get("MoodleSession") == "abc123" and sessao.cookies.get("MOODLEID1_") == "xyz"
+
+    # Sem data_dir, nada é escrito em data/moodle
+    client, _ = replay_client()
+    pasta = client.data_dir
+    assert client.login() and os.path.exists(os.path.join(pasta, "session.json"))
+    assert client.material_store.root.startswith(pasta)
+    print(f"6. Dados do cliente num diretório temporário: {pasta}")
+    del client
+    gc.collect()
+    assert not os.path.exists(pasta)
+
+    print("\n✅ TESTE CONCLUÍDO")
+
+if __name__ == "__main__":
+    test_moodle_replay()
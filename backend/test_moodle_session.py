@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Script para testar a reutilização da sessão Moodle guardada e a renovação automática
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+sys.path.insert(0, '.')
+import app as app_module
+from app import app
+from moodle_integration import MoodleUAB
+
+FIXTURES = Path(__file__).parent / "fixtures" / "moodle"
+
+class MoodleFalso(BaseHTTPRequestHandler):
+    """Login (GET + POST), validação AJAX e /my/ que redireciona sem sessão"""
+
+    sessoes = {}  # cookie -> sesskey
+    pedidos = []
+
+    def _sessao(self):
+        for parte in (self.headers.get("Cookie") or "").split(";"):
+            nome, _, valor = parte.strip().partition("=")
+            if nome == "MoodleSession" and valor in self.sessoes:
+                return valor
+        return None
+
+    def _responder(self, corpo, status=200, cabecalhos=()):
+        dados = corpo.encode("utf-8")
+        self.send_response(status)
+        for nome, valor in cabecalhos:
+            self.send_header(nome, valor)
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        caminho = urlsplit(self.path).path
+        self.pedidos.append(f"GET {caminho}")
+        if caminho == "/login/index.php":
+            self._responder((FIXTURES / "login.html").read_text(encoding="utf-8"))
+        elif caminho == "/my/" and self._sessao():
+            self._responder((FIXTURES / "dashboard.html").read_text(encoding="utf-8"))
+        else:
+            self._responder("", 303, [("Location", "/login/index.php")])
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        corpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.pedidos.append(f"POST {url.path}")
+
+        if url.path == "/login/index.php" and parse_qs(corpo.decode("utf-8")).get("password") == ["errada"]:
+            self._responder("<p>Dados de acesso inválidos</p>")
+        elif url.path == "/login/index.php":
+            cookie, sesskey = uuid.uuid4().hex, uuid.uuid4().hex[:10]
+            self.sessoes[cookie] = sesskey
+            self._responder(
+                f'<script>M.cfg = {{"sesskey":"{sesskey}","userid":7}};</script><a href="/login/logout.php">Sair</a>',
+                cabecalhos=[("Set-Cookie", f"MoodleSession={cookie}; path=/")],
+            )
+        elif url.path == "/lib/ajax/service.php":
+            cookie = self._sessao()
+            valido = cookie and parse_qs(url.query).get("sesskey") == [self.sessoes[cookie]]
+            resultado = {"error": False, "data": {"userid": 7, "timeremaining": 7200}} if valido else {
+                "error": True, "exception": {"errorcode": "invalidsesskey"}}
+            self._responder(json.dumps([resultado]))
+
+    def log_message(self, *args):
+        pass
+
+def cliente(base, pasta, username="aluno", password="segredo"):
+    client = MoodleUAB(username, password, data_dir=pasta)
+    client.base_url = base
+    return client
+
+def test_moodle_session():
+    print("=" * 80)
+    print("TESTE DA REUTILIZAÇÃO DA SESSÃO MOODLE")
+    print("=" * 80)
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), MoodleFalso)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{servidor.server_port}"
+    pedidos = MoodleFalso.pedidos
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            assert cliente(base, tmp).login()
+            print(f"\n1. Primeiro login: {pedidos}")
+            assert pedidos == ["GET /login/index.php", "POST /login/index.php"]
+            assert os.stat(os.path.join(tmp, "session.json")).st_mode & 0o077 == 0
+
+            # Novo processo: a sessão guardada é validada com um só pedido
+            pedidos.clear()
+            client = cliente(base, tmp)
+            assert client.login() and client.is_logged_in
+            print(f"2. Login com sessão guardada: {pedidos}")
+            assert pedidos == ["POST /lib/ajax/service.php"]
+
+            # Sessão expira no servidor: o scraping autentica de novo e repete o pedido
+            MoodleFalso.sessoes.clear()
+            pedidos.clear()
+            cursos = client.get_enrolled_courses()
+            print(f"3. Sessão expirada durante o scraping: {pedidos}")
+            assert [c["id"] for c in cursos] == [21053, 21111, 21010]
+            assert pedidos == ["GET /my/", "GET /login/index.php", "GET /login/index.php",
+                               "POST /login/index.php", "GET /my/"]
+
+            # Sessão guardada inválida: um pedido de validação e depois login completo
+            MoodleFalso.sessoes.clear()
+            pedidos.clear()
+            assert cliente(base, tmp).login()
+            print(f"4. Sessão guardada expirada: {pedidos}")
+            assert pedidos == ["POST /lib/ajax/service.php", "GET /login/index.php", "POST /login/index.php"]
+
+            # Outro utilizador não reutiliza a sessão
+            pedidos.clear()
+            outro = cliente(base, tmp)
+            assert outro.login("outro", "senha")
+            assert pedidos == ["GET /login/index.php", "POST /login/index.php"]
+
+            # Password errada (na rota de login ou em login()) com uma sessão guardada válida
+            assert cliente(base, tmp).login()
+            pedidos.clear()
+            original = app_module.create_moodle_client, app_module.moodle_client
+            app_module.create_moodle_client = lambda username, password: cliente(base, tmp, username, password)
+            try:
+                with app.test_client() as api:
+                    resposta = api.post("/api/moodle/login", json={"username": "aluno", "password": "errada"})
+            finally:
+                app_module.create_moodle_client, app_module.moodle_client = original
+            print(f"5. Rota de login com password errada e sessão guardada: {resposta.status_code}, {pedidos}")
+            assert resposta.status_code == 401
+            assert pedidos == ["GET /login/index.php", "POST /login/index.php"]
+            assert not cliente(base, tmp).login("aluno", "errada")
+            assert cliente(base, tmp).restore_session()
+
+            # Cliente sem credenciais (arranque sem MOODLE_USERNAME): o utilizador vem da sessão
+            anonimo = cliente(base, tmp, None, None)
+            assert anonimo.restore_session()
+            print(f"6. Sessão restaurada sem credenciais: utilizador {anonimo.username}")
+            assert anonimo.username == "aluno"
+    finally:
+        servidor.shutdown()
+
+    print("\n✅ TESTE CONCLUÍDO")
+
+if __name__ == "__main__":
+    test_moodle_session()
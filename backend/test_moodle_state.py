@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Script para testar o estado persistente e a sincronização delta do Moodle
+"""
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, '.')
+import app as app_module
+from app import app
+from database import fechar_pool, obter_conexao
+from moodle_course import CoursePageCache
+from moodle_crawler import MoodleCrawler
+from moodle_state import MoodleState
+
+class ClienteFalso:
+    """MoodleUAB simulado cujo conteúdo o teste altera entre sincronizações"""
+
+    course_pages = CoursePageCache(lambda course_id: None)
+
+    def __init__(self):
+        self.prazo = "15 de novembro de 2025"
+        self.materiais = [{"name": "Guia", "url": "/mod/resource/view.php?id=2", "type": "pdf"}]
+        self.falhar = False
+        self.erro = None
+        self.descarregados = []
+
+    def get_enrolled_courses(self):
+        return [{"id": 21053, "name": "Fundamentos de Bases de Dados"}]
+
+    def get_course_assignments(self, course_id):
+        return [{"name": "e-fólio A", "url": "/mod/assign/view.php?id=1", "deadline": self.prazo, "course_id": course_id}]
+
+    def get_course_materials(self, course_id):
+        return [{**material, "course_id": course_id} for material in self.materiais]
+
+    def download_new_material(self, course_id, material):
+        self.descarregados.append(material["name"])
+        if self.erro:
+            raise self.erro
+        return False if self.falhar else material["name"]
+
+    def sync_calendar(self):
+        return [{"title": "Sessão síncrona", "url": "/calendar/1", "date": "20 de outubro"}]
+
+    def check_notifications(self):
+        return []
+
+    def get_forum_updates(self, course_id, cursors=None):
+        if self.erro:
+            raise self.erro
+        return [], []
+
+    def get_grades(self, course_id):
+        return {}
+
+def test_moodle_state():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_original = app_module.DB_PATH
+        app_module.DB_PATH = Path(tmp) / "estudos.db"
+        app_module.init_db()
+
+        try:
+            print("=" * 80)
+            print("TESTE DO ESTADO PERSISTENTE DO MOODLE")
+            print("=" * 80)
+
+            estado = MoodleState(lambda: obter_conexao(app_module.DB_PATH))
+            cliente = ClienteFalso()
+            crawler = MoodleCrawler(cliente, state=estado)
+
+            resultado = crawler.sync()
+            print(f"\n1. Primeira sincronização: {resultado['changes']}")
+            assert resultado["changes"]["activities"] == {"new": 2, "changed": 0, "unchanged": 0}
+            assert cliente.descarregados == ["Guia"]
+
+            # Nada mudou: a sincronização delta não devolve nem descarrega nada
+            resultado = crawler.sync(delta=True)
+            print(f"2. Delta sem alterações: {resultado['changes']['activities']}")
+            assert resultado["assignments"] == [] and resultado["calendar"] == [] and resultado["courses"] == []
+            assert cliente.descarregados == ["Guia"]
+
+            # Prazo alterado no Moodle: só essa tarefa é processada
+            cliente.prazo = "22 de novembro de 2025"
+            resultado = crawler.sync(delta=True)
+            print(f"3. Delta com prazo alterado: {resultado['assignments']}")
+            assert [a["deadline"] for a in resultado["assignments"]] == ["22 de novembro de 2025"]
+            assert resultado["changes"]["activities"] == {"new": 0, "changed": 1, "unchanged": 1}
+
+            with app.test_client() as client:
+                resposta = client.get('/api/moodle/changes?since=2000-01-01&kinds=activities,events').get_json()
+                estados = sorted((i["name"], i["status"]) for i in resposta["changes"]["activities"])
+                print(f"4. Novidades desde 2000-01-01: {resposta['total']} itens")
+                assert resposta["total"] == 3 and estados == [("Guia", "new"), ("e-fólio A", "new")]
+
+                resposta = client.get('/api/moodle/changes').get_json()
+                assert resposta["total"] == 4  # últimas 24 h, incluindo a disciplina
+
+                assert client.get('/api/moodle/changes?since=2099-01-01').get_json()["total"] == 0
+                assert client.get('/api/moodle/changes?since=ontem').status_code == 400
+                assert client.get('/api/moodle/changes?kinds=posts').status_code == 400
+
+            # Download falhado: o material não fica registado e é tentado de novo
+            cliente.materiais.append({"name": "Exercícios", "url": "/mod/resource/view.php?id=3", "type": "pdf"})
+            cliente.falhar = True
+            resultado = crawler.sync(delta=True)
+            assert resultado["materials"] == [] and resultado["changes"]["activities"]["new"] == 0
+            cliente.falhar = False
+            resultado = crawler.sync(delta=True)
+            print(f"5. Após um download falhado: {cliente.descarregados}, {resultado['materials']}")
+            assert cliente.descarregados == ["Guia", "Exercícios", "Exercícios"]
+            assert resultado["materials"] == ["Exercícios"] and resultado["changes"]["activities"]["new"] == 1
+            assert crawler.sync(delta=True)["materials"] == [] and len(cliente.descarregados) == 3
+
+            # Exceção num download e nos fóruns: fica em failed, o resto é registado
+            cliente.materiais.append({"name": "Resolução", "url": "/mod/resource/view.php?id=4", "type": "pdf"})
+            cliente.prazo = "29 de novembro de 2025"
+            cliente.erro = OSError("disco cheio")
+            resultado = crawler.sync(delta=True)
+            etapas = sorted(f["stage"] for f in resultado["failed"])
+            print(f"6. Sincronização com erros: {etapas}, tarefas {[a['deadline'] for a in resultado['assignments']]}")
+            assert resultado["success"] and etapas == ["downloads", "forums"]
+            assert [a["deadline"] for a in resultado["assignments"]] == ["29 de novembro de 2025"]
+            assert resultado["materials"] == [] and resultado["changes"]["activities"]["new"] == 0
+            cliente.erro = None
+            resultado = crawler.sync(delta=True)
+            assert resultado["materials"] == ["Resolução"] and resultado["failed"] == []
+
+            conn = obter_conexao(app_module.DB_PATH)
+            plano = " ".join(r[3] for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT data FROM moodle_events WHERE changed_at >= '2025-01-01'"
+            ).fetchall())
+            conn.close()
+            print(f"7. Plano da consulta de novidades: {plano}")
+            assert "idx_moodle_events_changed" in plano
+        finally:
+            fechar_pool(app_module.DB_PATH)
+            app_module.DB_PATH = db_original
+
+    print("\n✅ TESTE CONCLUÍDO")
+
+if __name__ == "__main__":
+    test_moodle_state()
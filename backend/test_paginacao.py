@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Script para testar a paginação por cursor e a projeção de campos das listagens
+"""
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, '.')
+import app as app_module
+from app import app
+from database import fechar_pool, obter_conexao
+
+def test_paginacao():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_original = app_module.DB_PATH
+        app_module.DB_PATH = Path(tmp) / "estudos.db"
+        app_module.init_db()
+
+        try:
+            with app.test_client() as client:
+                print("=" * 80)
+                print("TESTE DE PAGINAÇÃO DE SESSÕES E TAREFAS")
+                print("=" * 80)
+
+                # 7 sessões, duas delas no mesmo dia e hora (desempate pelo id)
+                for dia, hora in [("2025-10-06", "19:00"), ("2025-10-06", "20:30"),
+                                  ("2025-10-07", "19:00"), ("2025-10-07", "19:00"),
+                                  ("2025-10-08", "21:30"), ("2025-10-09", "19:00"),
+                                  ("2025-10-10", "07:00")]:
+                    client.post('/api/sessoes', json={
+                        "disciplina_id": "21053", "data": dia,
+                        "hora_inicio": hora, "duracao_minutos": 25,
+                    })
+
+                completo = client.get('/api/sessoes').get_json()
+                assert isinstance(completo, list) and len(completo) == 7
+                empate = [s["id"] for s in completo if s["data"] == "2025-10-07"]
+                assert empate == sorted(empate, reverse=True)
+
+                # Percorrer páginas de 3
+                ids, cursor, paginas = [], None, 0
+                while True:
+                    url = '/api/sessoes?limit=3&fields=id,data'
+                    if cursor:
+                        url += f'&cursor={cursor}'
+                    pagina = client.get(url).get_json()
+                    assert all(set(item) == {"id", "data"} for item in pagina["items"])
+                    ids.extend(item["id"] for item in pagina["items"])
+                    paginas += 1
+                    cursor = pagina["next_cursor"]
+                    if not cursor:
+                        break
+
+                print(f"\n1. Sessões em {paginas} páginas: {ids}")
+                assert paginas == 3
+                assert ids == [s["id"] for s in completo]
+
+                # Tarefas com datas nulas e prioridades diferentes
+                for titulo, entrega, prioridade in [("A", None, 2), ("B", "2025-11-24", 3),
+                                                    ("C", "2025-11-24", 1), ("D", "2025-10-20", 2)]:
+                    client.post('/api/tarefas', json={
+                        "disciplina_id": "21053", "titulo": titulo,
+                        "data_entrega": entrega, "prioridade": prioridade,
+                    })
+
+                titulos, cursor = [], None
+                while True:
+                    url = '/api/tarefas?limit=1&fields=titulo'
+                    if cursor:
+                        url += f'&cursor={cursor}'
+                    pagina = client.get(url).get_json()
+                    titulos.extend(item["titulo"] for item in pagina["items"])
+                    cursor = pagina["next_cursor"]
+                    if not cursor:
+                        break
+
+                print(f"2. Tarefas por página: {titulos}")
+                assert titulos == ["A", "D", "B", "C"]
+
+                # Parâmetros inválidos
+                assert client.get('/api/sessoes?limit=abc').status_code == 400
+                assert client.get('/api/sessoes?cursor=xpto').status_code == 400
+                assert client.get('/api/tarefas?fields=id,senha').status_code == 400
+                print("3. Parâmetros inválidos devolvem 400")
+
+                # Índices finais das listagens, criados numa só migração
+                conn = obter_conexao(app_module.DB_PATH)
+                indices = {r[0] for r in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'"
+                ).fetchall()}
+                conn.close()
+                print(f"4. Índices das listagens: {sorted(i for i in indices if 'sessoes' in i or 'tarefas' in i)}")
+                assert {"idx_sessoes_disciplina_data_hora", "idx_sessoes_data_hora", "idx_tarefas_keyset"} <= indices
+                assert "idx_sessoes_disciplina_data" not in indices
+
+                print("\n✅ TESTE CONCLUÍDO")
+        finally:
+            fechar_pool(app_module.DB_PATH)
+            app_module.DB_PATH = db_original
+
+if __name__ == "__main__":
+    test_paginacao()
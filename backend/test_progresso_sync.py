@@ -6,6 +6,7 @@ import json
 import sys
 sys.path.insert(0, '.')
 from app import app, get_db_connection, load_disciplinas
+from progresso import calcular_progresso_disciplinas
 
 def test_progresso_sync():
     with app.app_context():
@@ -21,39 +22,21 @@ def test_progresso_sync():
         print("\n1. CÁLCULO DE PROGRESSO POR DISCIPLINA:")
         print("-" * 80)
         
+        progresso = calcular_progresso_disciplinas(conn, data["disciplinas"])
+
         for disc in data["disciplinas"]:
-            disc_id = disc["id"]
             sigla = disc["sigla"]
             nome = disc["nome"]
-            creditos = disc.get("creditos", 6)
-            
-            # Sessões de estudo
-            sessoes = conn.execute(
-                "SELECT COUNT(*) as total FROM sessoes_estudo WHERE disciplina_id = ?",
-                (disc_id,)
-            ).fetchone()
-            total_sessoes = sessoes["total"] or 0
-            total_minutos = total_sessoes * 25
-            
-            # Progresso de tempo
-            progresso_tempo = min((total_minutos / (creditos * 26 * 60)) * 100, 100) if total_minutos > 0 else 0
-            
-            # AFs
-            afs = conn.execute(
-                """SELECT COUNT(*) as total, SUM(CASE WHEN concluida = 1 THEN 1 ELSE 0 END) as concluidas
-                   FROM tarefas WHERE disciplina_id = ? AND tipo = 'forum'""",
-                (disc_id,)
-            ).fetchone()
-            total_afs = afs["total"] or 0
-            afs_concluidas = afs["concluidas"] or 0
-            progresso_afs = (afs_concluidas / total_afs * 100) if total_afs > 0 else 0
-            
-            # Progresso final
-            if total_afs > 0:
-                progresso_final = (progresso_tempo * 0.7) + (progresso_afs * 0.3)
-            else:
-                progresso_final = progresso_tempo
-            
+            calculo = progresso[disc["id"]]
+
+            total_sessoes = calculo["total_sessoes"]
+            total_minutos = calculo["total_minutos"]
+            progresso_tempo = calculo["progresso_tempo"]
+            total_afs = calculo["total_afs"]
+            afs_concluidas = calculo["afs_concluidas"]
+            progresso_afs = calculo["progresso_afs"]
+            progresso_final = calculo["progresso"]
+
             print(f"\n{sigla} - {nome}")
             print(f"  Sessões: {total_sessoes} ({total_minutos} min)")
             print(f"  Progresso Tempo: {progresso_tempo:.2f}%")
@@ -71,6 +54,11 @@ def test_progresso_sync():
             print("\nProgresso do Dashboard:")
             for sigla, disc_info in dashboard_data["progresso_disciplinas"].items():
                 print(f"  {sigla}: {disc_info['progresso']:.2f}%")
+
+            for disc in data["disciplinas"]:
+                esperado = progresso[disc["id"]]["progresso"]
+                obtido = dashboard_data["progresso_disciplinas"][disc["sigla"]]["progresso"]
+                assert abs(esperado - obtido) < 0.01, f"{disc['sigla']}: {esperado} != {obtido}"
         
         conn.close()
         print("\n" + "=" * 80)
@@ -5,7 +5,8 @@ Script para testar sincronização final de progresso entre Dashboard e Discipli
 import json
 import sys
 sys.path.insert(0, '.')
-from app import app
+from app import app, get_db_connection, load_disciplinas
+from progresso import calcular_progresso_disciplinas
 
 def test_sync_final():
     with app.test_client() as client:
@@ -35,13 +36,22 @@ def test_sync_final():
         print("-" * 80)
         
         todas_sincronizadas = True
+        # Progresso de referência calculado pelo módulo partilhado
+        conn = get_db_connection()
+        referencia = calcular_progresso_disciplinas(conn, load_disciplinas()["disciplinas"])
+        conn.close()
+
         for disc in disciplinas_data:
             sigla = disc["sigla"]
             disc_progresso = disc.get("progresso", 0)
             dashboard_prog = dashboard_progresso.get(sigla, {}).get("progresso", 0)
+            esperado = referencia[disc["id"]]["progresso"]
             
             # Comparar com tolerância de 0.01% (arredondamento)
-            sincronizado = abs(disc_progresso - dashboard_prog) < 0.01
+            sincronizado = (
+                abs(disc_progresso - dashboard_prog) < 0.01
+                and abs(disc_progresso - esperado) < 0.01
+            )
             status = "✅ OK" if sincronizado else "❌ ERRO"
             
             if not sincronizado:
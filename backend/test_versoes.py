@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Script para testar os ETags e os GET condicionais (versoes.com_etag)
+"""
+import sys
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+sys.path.insert(0, '.')
+import app as app_module
+import versoes
+from app import app
+from database import fechar_pool
+
+def test_versoes():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_original = app_module.DB_PATH
+        app_module.DB_PATH = Path(tmp) / "estudos.db"
+        app_module.init_db()
+        hoje_original = versoes.hoje_lisboa, app_module.hoje_lisboa
+
+        try:
+            with app.test_client() as client:
+                print("=" * 80)
+                print("TESTE DOS ETAGS E GET CONDICIONAIS")
+                print("=" * 80)
+
+                resposta = client.get('/api/estatisticas')
+                etag = resposta.headers.get("ETag")
+                print(f"\n1. ETag das estatísticas: {etag}")
+                assert resposta.status_code == 200 and etag
+                assert resposta.headers["Cache-Control"] == "no-cache"
+
+                resposta = client.get('/api/estatisticas', headers={"If-None-Match": etag})
+                print(f"2. Mesmo ETag: {resposta.status_code}, corpo de {len(resposta.get_data())} bytes")
+                assert resposta.status_code == 304 and resposta.get_data() == b""
+                assert resposta.headers["ETag"] == etag
+
+                # Escrita numa tabela não monitorizada por este endpoint: continua 304
+                client.put('/api/progresso/21053/1', json={"progresso_percentual": 40})
+                assert client.get('/api/estatisticas', headers={"If-None-Match": etag}).status_code == 304
+
+                # Escrita em sessoes_estudo: nova versão, novo ETag
+                client.post('/api/sessoes', json={"disciplina_id": "21053", "data": "2025-10-01",
+                                                  "hora_inicio": "19:00", "duracao_minutos": 30})
+                resposta = client.get('/api/estatisticas', headers={"If-None-Match": etag})
+                novo = resposta.headers.get("ETag")
+                print(f"3. Após nova sessão: {resposta.status_code}, ETag {novo}")
+                assert resposta.status_code == 200 and novo and novo != etag
+                assert client.get('/api/estatisticas', headers={"If-None-Match": novo}).status_code == 304
+
+                # Respostas diárias: a mudança de dia em Lisboa invalida o ETag
+                amanha = hoje_original[0]() + timedelta(days=1)
+                versoes.hoje_lisboa = app_module.hoje_lisboa = lambda: amanha
+                resposta = client.get('/api/estatisticas', headers={"If-None-Match": novo})
+                print(f"4. Dia seguinte: {resposta.status_code}, ETag {resposta.headers.get('ETag')}")
+                assert resposta.status_code == 200 and resposta.headers["ETag"] != novo
+
+                # Sem diario, o ETag não depende do dia
+                etag = client.get('/api/disciplinas').headers["ETag"]
+                versoes.hoje_lisboa = app_module.hoje_lisboa = hoje_original[0]
+                assert client.get('/api/disciplinas', headers={"If-None-Match": etag}).status_code == 304
+                print("5. ETag sem diario igual em dias diferentes")
+
+                print("\n✅ TESTE CONCLUÍDO")
+        finally:
+            versoes.hoje_lisboa, app_module.hoje_lisboa = hoje_original
+            fechar_pool(app_module.DB_PATH)
+            app_module.DB_PATH = db_original
+
+if __name__ == "__main__":
+    test_versoes()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Versões de dados e ETags para GET condicionais
+
+Cada tabela monitorizada tem um contador em versoes_dados, incrementado por
+triggers a cada INSERT/UPDATE/DELETE. Os endpoints de leitura derivam um ETag
+forte dessas versões (e da assinatura de disciplinas.json) e respondem 304
+quando o cliente já tem a versão atual, sem recalcular o corpo.
+"""
+
+import hashlib
+from functools import wraps
+from typing import Callable, Iterable, Sequence
+
+from flask import Response, request
+
+from calendario_semestre import hoje_lisboa
+
+SQL_TABELA_VERSOES = """
+    CREATE TABLE IF NOT EXISTS versoes_dados (
+        tabela TEXT PRIMARY KEY,
+        versao INTEGER NOT NULL DEFAULT 0
+    );
+"""
+
+
+def sql_versionamento(tabelas: Iterable[str]) -> str:
+    """SQL que cria versoes_dados e os triggers de incremento das tabelas"""
+    partes = [SQL_TABELA_VERSOES]
+
+    for tabela in tabelas:
+        for operacao in ("INSERT", "UPDATE", "DELETE"):
+            partes.append(f"""
+    CREATE TRIGGER IF NOT EXISTS versao_{tabela}_{operacao.lower()}
+    AFTER {operacao} ON {tabela}
+    BEGIN
+        INSERT INTO versoes_dados (tabela, versao) VALUES ('{tabela}', 1)
+        ON CONFLICT(tabela) DO UPDATE SET versao = versao + 1;
+    END;
+""")
+
+    return "".join(partes)
+
+
+def ler_versoes(conn, tabelas: Sequence[str]) -> tuple:
+    """Versões atuais das tabelas indicadas (0 se nunca foram alteradas)"""
+    if not tabelas:
+        return ()
+
+    marcadores = ", ".join("?" for _ in tabelas)
+    versoes = dict(
+        conn.execute(
+            f"SELECT tabela, versao FROM versoes_dados WHERE tabela IN ({marcadores})",
+            list(tabelas),
+        ).fetchall()
+    )
+    return tuple(versoes.get(t, 0) for t in tabelas)
+
+
+def com_etag(obter_conexao: Callable, tabelas: Sequence[str] = (), catalogo=None, diario: bool = False):
+    """Decorador que acrescenta ETag a um endpoint GET e responde 304 se não mudou
+
+    Args:
+        obter_conexao: função que devolve uma conexão à base de dados
+        tabelas: tabelas de que a resposta depende
+        catalogo: CatalogoDisciplinas, se a resposta depende de disciplinas.json
+        diario: True se a resposta depende da data de hoje (em Lisboa, como os endpoints)
+    """
+
+    def decorador(funcao):
+        @wraps(funcao)
+        def wrapper(*args, **kwargs):
+            conn = obter_conexao()
+            try:
+                versoes = ler_versoes(conn, tabelas)
+            finally:
+                conn.close()
+
+            partes = [request.full_path, versoes]
+            if catalogo is not None:
+                partes.append(catalogo.assinatura)
+            if diario:
+                partes.append(hoje_lisboa().isoformat())
+
+            etag = hashlib.sha1(repr(partes).encode("utf-8")).hexdigest()
+
+            if request.if_none_match.contains(etag):
+                resposta = Response(status=304)
+            else:
+                resposta = funcao(*args, **kwargs)
+                if not isinstance(resposta, Response) or resposta.status_code != 200:
+                    return resposta
+
+            resposta.set_etag(etag)
+            resposta.headers["Cache-Control"] = "no-cache"
+            return resposta
+
+        return wrapper
+
+    return decorador
@@ -37,10 +37,46 @@ document.addEventListener("DOMContentLoaded", () => {
   initializePageVisibility();
   requestNotificationPermission();
 
-  // Atualizar dashboard a cada 5 minutos
-  setInterval(loadDashboard, 300000);
+  // Atualizar dashboard quando o servidor notificar alterações
+  conectarEventos();
 });
 
+// Eventos do servidor (SSE) que afetam o dashboard
+const EVENTOS_DASHBOARD = [
+  "sessao_criada",
+  "sessao_atualizada",
+  "sessao_removida",
+  "sessoes_criadas",
+  "tarefa_criada",
+  "tarefa_atualizada",
+  "tarefa_concluida",
+  "tarefa_removida",
+  "tarefas_atualizadas",
+  "tarefas_inicializadas",
+  "moodle_sincronizado",
+];
+
+function conectarEventos() {
+  // Navegadores sem EventSource continuam com o polling de 5 minutos
+  if (!("EventSource" in window)) {
+    setInterval(loadDashboard, 300000);
+    return;
+  }
+
+  const eventos = new EventSource(`${API_URL}/events`);
+  let pendente = null;
+
+  // Agrupar rajadas de eventos num único recarregamento
+  const agendarDashboard = () => {
+    clearTimeout(pendente);
+    pendente = setTimeout(loadDashboard, 500);
+  };
+
+  EVENTOS_DASHBOARD.forEach((tipo) =>
+    eventos.addEventListener(tipo, agendarDashboard),
+  );
+}
+
 // Solicitar permissão para notificações
 function requestNotificationPermission() {
   if ("Notification" in window && Notification.permission === "default") {
@@ -1979,9 +2015,11 @@ function initializeTimer() {
 // Carregar última disciplina estudada
 async function loadLastStudiedDiscipline() {
   try {
-    const response = await fetch(`${API_URL}/sessoes`);
+    const response = await fetch(
+      `${API_URL}/sessoes?limit=1&fields=disciplina_id`,
+    );
     if (response.ok) {
-      const sessoes = await response.json();
+      const sessoes = (await response.json()).items;
       if (sessoes.length > 0) {
         const ultimaDisciplina = sessoes[0].disciplina_id;
         const selectDisciplina = document.getElementById("timer-disciplina");
@@ -2108,6 +2146,7 @@ function pauseTimer() {
   document.getElementById("timer-start").style.display = "inline-flex";
   document.getElementById("timer-pause").style.display = "none";
 
+  notificarTimerPopup();
   showToast("Timer pausado", "info");
 }
 
@@ -2239,6 +2278,16 @@ function updateTimerDisplay() {
   }
   const dashOffset = 880 - 880 * progress;
   progressCircle.style.strokeDashoffset = dashOffset;
+
+  notificarTimerPopup();
+}
+
+// Enviar o estado do timer ao popup (substitui o polling do popup)
+function notificarTimerPopup() {
+  if (window.timerPopup && !window.timerPopup.closed) {
+    const { interval, ...timer } = currentState.timer;
+    window.timerPopup.postMessage({ tipo: "timer", timer }, "*");
+  }
 }
 
 async function salvarSessaoEstudo() {
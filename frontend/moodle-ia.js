@@ -306,12 +306,20 @@ const MoodleModule = {
 
             const data = await response.json();
 
-            if (data.success) {
-                showToast('Sincronização concluída!', 'success');
+            if (!data.success) {
+                showToast('Erro na sincronização', 'error');
+                return;
+            }
+
+            // A sincronização corre em segundo plano; acompanhar o job
+            const job = await this.waitForJob(data.job_id);
+
+            if (job.estado === 'concluido') {
+                showToast(`Sincronização concluída em ${job.duracao}s!`, 'success');
                 await this.loadAllData();
                 this.updateSyncStatus();
             } else {
-                showToast('Erro na sincronização', 'error');
+                showToast('Erro na sincronização: ' + (job.erro || ''), 'error');
             }
         } catch (error) {
             showToast('Erro ao sincronizar', 'error');
@@ -321,6 +329,29 @@ const MoodleModule = {
         }
     },
 
+    async waitForJob(jobId) {
+        while (true) {
+            const response = await fetch(`http://localhost:5000/api/jobs/${jobId}`);
+            const job = await response.json();
+
+            if (!response.ok) {
+                return { estado: 'erro', erro: job.error };
+            }
+
+            if (job.estado === 'concluido' || job.estado === 'erro') {
+                return job;
+            }
+
+            const etapa = job.etapas.find(e => !e.concluida);
+            const syncStatusEl = document.getElementById('last-sync-time');
+            if (etapa && syncStatusEl) {
+                syncStatusEl.textContent = `${etapa.nome} ${etapa.feitos}/${etapa.total ?? '?'}`;
+            }
+
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    },
+
     updateSyncStatus() {
         const now = new Date();
         const timeStr = now.toLocaleTimeString('pt-BR', {